@@ -1,5 +1,7 @@
 # /backend/auth.py
 
+import logging
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
@@ -7,11 +9,14 @@ from fastapi import HTTPException, Depends, APIRouter
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import uuid
 from schemas import UserLogin, UserCreate
-from database import get_db_connection
-import psycopg2
-from psycopg2.extras import DictCursor
+from database import async_db_connection
+import psycopg
 from core.config import (SECRET_KEY, ALGORITHM,
                          ACCESS_TOKEN_EXPIRE_MINUTES, pwd_context)
+from core.passwords import password_hasher, PasswordHasherBusy
+from core.cache import token_cache
+
+logger = logging.getLogger(__name__)
 
 # --- Create Router Instance ---
 router = APIRouter(
@@ -22,9 +27,16 @@ router = APIRouter(
 
 # --- HELPER FUNCTIONS ---
 def verify_password(plain_password, hashed_password):
+    """Blocking; request handlers use password_hasher.verify() instead."""
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def _busy_exception():
+    return HTTPException(status_code=503,
+                         detail="Server is busy, please try again shortly.",
+                         headers={"Retry-After": "1"})
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -32,7 +44,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(
                               minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    # jti keeps tokens issued in the same second distinct, so revoking one
+    # never revokes another
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -40,165 +54,171 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 oauth2_scheme = HTTPBearer()
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials =
-                           Depends(oauth2_scheme)):
-    token = credentials.credentials
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=401,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+async def _is_revoked(token_key):
+    async with async_db_connection() as conn, conn.cursor() as cur:
+        await cur.execute("SELECT 1 FROM revoked_tokens \
+                          WHERE token_hash = %s;", (token_key,))
+        return await cur.fetchone() is not None
+
+
+async def verify_token(token):
+    """
+    Returns (user_id, exp) for a valid, unrevoked token; raises 401
+    otherwise. Tokens that passed recently are served from token_cache
+    without checking the signature again.
+    """
+    token_key = token_cache.key(token)
+    cached = token_cache.get(token_key)
+    if cached is not None:
+        return cached
+
+    started = time.perf_counter()
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
-        return uuid.UUID(user_id)
-    except JWTError:
-        raise credentials_exception
-    except ValueError:
-        raise credentials_exception
+            raise _credentials_exception()
+        user_id = uuid.UUID(user_id)
+        exp = payload["exp"]
+    except (JWTError, ValueError, KeyError):
+        raise _credentials_exception()
 
+    try:
+        if await _is_revoked(token_key):
+            raise _credentials_exception()
+    except psycopg.Error:
+        logger.exception("Database error checking token revocation")
+        raise HTTPException(status_code=500,
+                            detail="Database error validating credentials.")
 
-# --- User login endpoint ---
-@router.post("/login")
-def login_user(credentials: UserLogin):
-    print("\n--- 1. login_user endpoint called ---")
-    print(f"    - Attempting login for email: {credentials.email}")
+    token_cache.set(token_key, user_id, exp,
+                    time.perf_counter() - started)
+    return user_id, exp
 
-    conn = None
-    cur = None
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=DictCursor)
 
-        sql = "SELECT user_id, email, \
-               password_hash, onboarding_complete \
-               FROM users WHERE email = %s;"
-        print(f"--- 2. Executing SQL: \
-               {sql} with param: {credentials.email} ---")
+async def get_current_user(credentials: HTTPAuthorizationCredentials =
+                           Depends(oauth2_scheme)):
+    user_id, _ = await verify_token(credentials.credentials)
+    return user_id
 
-        cur.execute(sql, (credentials.email,))
-        user = cur.fetchone()
 
-        if not user:
-            print("--- 3. SQL RESULT: User not found in database ---")
-            if cur:
-                cur.close()
-            if conn:
-                conn.close()
-            raise HTTPException(status_code=404, detail="User not found")
+@router.post("/logout")
+async def logout_user(credentials: HTTPAuthorizationCredentials =
+                      Depends(oauth2_scheme)):
+    """Revokes the bearer token; it is rejected from then on."""
+    token = credentials.credentials
+    user_id, exp = await verify_token(token)
+    token_key = token_cache.key(token)
+    try:
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(
+                """
+                INSERT INTO revoked_tokens (token_hash, user_id, expires_at)
+                VALUES (%s, %s, to_timestamp(%s))
+                ON CONFLICT (token_hash) DO NOTHING;
+                """,
+                (token_key, user_id, exp))
+            # Revocations are only needed until the token expires
+            await cur.execute("DELETE FROM revoked_tokens \
+                              WHERE expires_at < NOW();")
+    except psycopg.Error:
+        logger.exception("Database error revoking token",
+                         extra={"user_id": str(user_id)})
+        raise HTTPException(status_code=500,
+                            detail="Database error during logout.")
 
-        print(f"--- 3. SQL RESULT: Found user record: {dict(user)} ---")
+    token_cache.revoke(token_key, exp)
+    return {"status": "success", "message": "Logged out."}
 
-        # Verify the password
-        if not verify_password(credentials.password, user["password_hash"]):
-            print("--- 4. Password verification FAILED ---")
-            if cur:
-                cur.close()
-            if conn:
-                conn.close()
-            raise HTTPException(status_code=400, detail="Invalid credentials")
 
-        print("--- 4. Password verification SUCCESSFUL ---")
+# --- User login endpoint ---
+@router.post("/login")
+async def login_user(credentials: UserLogin):
+    try:
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            sql = "SELECT user_id, email, \
+                   password_hash, onboarding_complete \
+                   FROM users WHERE email = %s;"
+            await cur.execute(sql, (credentials.email,))
+            user = await cur.fetchone()
 
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
+        if not user:
+            logger.debug("Login for unknown email")
+            raise HTTPException(status_code=404, detail="User not found")
 
-        print("--- 5. Connection closed ---")
+        # Verify the password on the bcrypt pool, off the event loop and
+        # without holding a DB connection
+        if not await password_hasher.verify(credentials.password,
+                                            user["password_hash"]):
+            logger.info("Login failed: wrong password",
+                        extra={"user_id": str(user["user_id"])})
+            raise HTTPException(status_code=400, detail="Invalid credentials")
 
         # --- Create JWT Token ---
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         token_data = {"sub": str(user["user_id"])}
 
-        print(f"--- 6. Creating token with user_id: {user['user_id']} ---")
-
         access_token = create_access_token(
             data=token_data, expires_delta=access_token_expires
         )
 
-        print(f"--- 7. Returning access token: {access_token} ---")
+        logger.debug("Login succeeded",
+                     extra={"user_id": str(user["user_id"])})
         return {"access_token": access_token,
                 "token_type": "bearer",
                 "onboarding_complete": user["onboarding_complete"]}
 
-    except psycopg2.Error as e:
-        print(f"\n--- !!! DATABASE ERROR: {e} !!! ---")
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
+    except PasswordHasherBusy as e:
+        logger.warning("Shedding login: %s", e)
+        raise _busy_exception()
+
+    except psycopg.Error:
+        logger.exception("Database error during login")
         raise HTTPException(status_code=500,
                             detail="Database connection error.")
 
     except HTTPException as e:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
         raise e
 
-    except Exception as e:
-        print(f"\n--- !!! UNEXPECTED ERROR: {e} !!! ---")
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
+    except Exception:
+        logger.exception("Unexpected error during login")
         raise HTTPException(status_code=500,
                             detail="An unexpected server error occurred.")
 
 
 @router.post("/users")
-def create_user(user_data: UserCreate):
-    print("\n--- 1. create_user endpoint called ---")
-    print(f"   - Received data: name='{user_data.display_name}', \
-           email='{user_data.email}'")
-
-    conn = None
-    cur = None
+async def create_user(user_data: UserCreate):
     try:
         password_to_hash = user_data.password[:72]
-        print(f"--- Password length before hashing: \
-              {len(password_to_hash)} bytes ---")
-        password_hash = pwd_context.hash(password_to_hash)
-        print("--- Password hashed ---")
-
-        print("--- 2. Attempting to get DB connection ---")
-        conn = get_db_connection()
-        cur = conn.cursor()
-        print("--- 3. DB connection successful ---")
-
-        sql_query = """
-            INSERT INTO users (user_id, display_name, email, password_hash)
-            VALUES (%s, %s, %s, %s)
-            RETURNING user_id;
-        """
-
-        new_user_id_py = str(uuid.uuid4())
-        values_to_insert = (new_user_id_py,
-                            user_data.display_name,
-                            user_data.email,
-                            password_hash)
-
-        print("--- 4. Executing SQL ---")
-        cur.execute(sql_query, values_to_insert)
-        print("--- SQL Executed ---")
-
-        result = cur.fetchone()
-        new_user_id = result[0]
-
-        print("--- 6. Attempting to commit transaction ---")
-        conn.commit()
-        print("--- Transaction Committed ---")
-
-        print("--- 7. Closing cursor and connection ---")
-        cur.close()
-        conn.close()
-        print("--- Connection closed. Request successful. ---")
-
-        print("--- 7. Creating access token for new user ---")
+        password_hash = await password_hasher.hash(password_to_hash)
+
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            sql_query = """
+                INSERT INTO users (user_id, display_name, email, password_hash)
+                VALUES (%s, %s, %s, %s)
+                RETURNING user_id;
+            """
+
+            new_user_id_py = str(uuid.uuid4())
+            values_to_insert = (new_user_id_py,
+                                user_data.display_name,
+                                user_data.email,
+                                password_hash)
+
+            await cur.execute(sql_query, values_to_insert)
+
+            result = await cur.fetchone()
+            new_user_id = result["user_id"]
+        logger.info("User created", extra={"user_id": str(new_user_id)})
+
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         token_data = {"sub": str(new_user_id)}
         access_token = create_access_token(
@@ -211,31 +231,19 @@ def create_user(user_data: UserCreate):
             "onboarding_complete": False
         }
 
-    except psycopg2.Error as db_error:
-        print("\n--- !!! DATABASE ERROR !!! ---")
-        print(f"DB Error Code: {db_error.pgcode}")
-        print(f"DB Error Message: {db_error.pgerror}")
-        if conn:
-            print("--- Rolling back transaction due to DB error ---")
-            conn.rollback()
+    except PasswordHasherBusy as e:
+        logger.warning("Shedding signup: %s", e)
+        raise _busy_exception()
+
+    except psycopg.Error as db_error:
+        logger.error("Database error creating user: %s",
+                     db_error.diag.message_primary,
+                     extra={"sqlstate": db_error.sqlstate})
         raise HTTPException(status_code=500,
                             detail=f"Database error occurred: \
-                            {db_error.pgerror}")
-
-    except Exception as e:
-        print("\n--- !!! UNEXPECTED ERROR !!! ---")
-        print(f"Error Type: {type(e).__name__}")
-        print(f"Error Details: {e}")
-        if conn:
-            print("--- Rolling back transaction due to unexpected error ---")
-            conn.rollback()
+                            {db_error.diag.message_primary}")
+
+    except Exception:
+        logger.exception("Unexpected error creating user")
         raise HTTPException(status_code=500,
                             detail="An unexpected server error occurred.")
-
-    finally:
-        if cur:
-            cur.close()
-            print("--- Cursor closed in finally block ---")
-        if conn:
-            conn.close()
-            print("--- Connection closed in finally block ---")
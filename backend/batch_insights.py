@@ -0,0 +1,207 @@
+# /backend/batch_insights.py
+"""
+Nightly insight generation for every user.
+
+Users are processed in chunks. Each chunk's inputs are fetched with a
+handful of set-based queries (not per user), the engine runs across a
+process pool, and the results go back with one multi-row INSERT per
+chunk. Each chunk commits on its own, and users who already received
+today's nightly insight are skipped, so an interrupted run can simply
+be started again.
+
+    python batch_insights.py [--chunk-size 500] [--workers 4]
+"""
+import argparse
+import os
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from psycopg2.extras import DictCursor, execute_values
+from database import get_db_connection
+from insights_engine import (generate_insights, build_history_frame,
+                             HISTORY_WINDOW_DAYS)
+
+NIGHTLY_INSIGHT_TYPE = 'Nightly Digest'
+
+# Users with check-ins who have not had today's nightly insight yet
+PENDING_USERS_SQL = """
+    SELECT u.user_id
+    FROM users u
+    WHERE EXISTS (SELECT 1 FROM daily_checkins dc
+                  WHERE dc.user_id = u.user_id)
+      AND NOT EXISTS (SELECT 1 FROM insight i
+                      WHERE i.user_id = u.user_id
+                        AND i.insight_type = %s
+                        AND i.generated_at >= CURRENT_DATE)
+    ORDER BY u.user_id;
+"""
+
+LATEST_CHECKINS_SQL = """
+    SELECT DISTINCT ON (user_id)
+           user_id, checkin_id, checkin_date, gratitude_entry,
+           principle_alignment, principle_alignment_note
+    FROM daily_checkins
+    WHERE user_id = ANY(%s)
+    ORDER BY user_id, checkin_date DESC;
+"""
+
+METRICS_SQL = """
+    SELECT checkin_id, metric_type, metric_name, value
+    FROM daily_metrics
+    WHERE checkin_id = ANY(%s);
+"""
+
+PERSONALITY_SQL = """
+    SELECT user_id, trait_name, value
+    FROM personality_traits
+    WHERE user_id = ANY(%s);
+"""
+
+PRINCIPLES_SQL = """
+    SELECT up.user_id, p.name
+    FROM user_principles up
+    JOIN principles p ON up.principle_id = p.principle_id
+    WHERE up.user_id = ANY(%s);
+"""
+
+# Same shape as the insights router's history query, for many users
+HISTORY_SQL = """
+    WITH latest AS (
+        SELECT user_id, MAX(checkin_date) AS latest_date
+        FROM daily_checkins
+        WHERE user_id = ANY(%s)
+        GROUP BY user_id
+    )
+    SELECT dc.user_id, dc.checkin_date, dc.principle_alignment,
+           (dc.gratitude_entry IS NOT NULL
+            AND dc.gratitude_entry <> '') AS has_gratitude,
+           COALESCE(json_object_agg(
+               dm.metric_type || ':' || dm.metric_name, dm.value
+           ) FILTER (WHERE dm.metric_id IS NOT NULL), '{}') AS metrics
+    FROM latest l
+    JOIN daily_checkins dc
+      ON dc.user_id = l.user_id
+     AND dc.checkin_date > l.latest_date - %s::int
+    LEFT JOIN daily_metrics dm ON dm.checkin_id = dc.checkin_id
+    GROUP BY dc.user_id, dc.checkin_id
+    ORDER BY dc.user_id, dc.checkin_date;
+"""
+
+INSERT_INSIGHTS_SQL = """
+    INSERT INTO insight (insight_id, user_id, insight_type, content)
+    VALUES %s;
+"""
+
+
+def fetch_inputs(cur, user_ids):
+    """
+    Loads the engine inputs for a chunk of users in five queries.
+    Returns a list of (user_id, personality, principles, latest, history).
+    """
+    cur.execute(LATEST_CHECKINS_SQL, (user_ids,))
+    latest = {row['user_id']: dict(row) for row in cur.fetchall()}
+
+    checkin_to_user = {row['checkin_id']: user_id
+                       for user_id, row in latest.items()}
+    for row in latest.values():
+        row['metrics'] = []
+    cur.execute(METRICS_SQL, (list(checkin_to_user),))
+    for row in cur.fetchall():
+        latest[checkin_to_user[row['checkin_id']]]['metrics'].append(
+            {'metric_type': row['metric_type'],
+             'metric_name': row['metric_name'],
+             'value': row['value']})
+
+    personality = defaultdict(list)
+    cur.execute(PERSONALITY_SQL, (user_ids,))
+    for row in cur.fetchall():
+        personality[row['user_id']].append(
+            {'trait_name': row['trait_name'], 'value': row['value']})
+
+    principles = defaultdict(list)
+    cur.execute(PRINCIPLES_SQL, (user_ids,))
+    for row in cur.fetchall():
+        principles[row['user_id']].append(row['name'])
+
+    history = defaultdict(list)
+    cur.execute(HISTORY_SQL, (user_ids, HISTORY_WINDOW_DAYS))
+    for row in cur.fetchall():
+        history[row['user_id']].append(
+            {'checkin_date': row['checkin_date'],
+             'principle_alignment': row['principle_alignment'],
+             'has_gratitude': row['has_gratitude'],
+             'metrics': row['metrics']})
+
+    return [(user_id, personality[user_id], principles[user_id],
+             latest[user_id], history[user_id])
+            for user_id in user_ids if user_id in latest]
+
+
+def evaluate_user(inputs):
+    """Runs in a worker process."""
+    user_id, personality, principles, latest, history_rows = inputs
+    content = generate_insights(personality, principles, latest,
+                                build_history_frame(history_rows))
+    return user_id, content
+
+
+def run_batch(chunk_size, workers):
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=DictCursor)
+    try:
+        cur.execute(PENDING_USERS_SQL, (NIGHTLY_INSIGHT_TYPE,))
+        user_ids = [row['user_id'] for row in cur.fetchall()]
+        conn.commit()
+        total = len(user_ids)
+        print(f"--- {total} users need tonight's insight "
+              f"({workers} workers, chunks of {chunk_size}) ---")
+
+        started = time.monotonic()
+        processed = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for i in range(0, total, chunk_size):
+                chunk = user_ids[i:i + chunk_size]
+                inputs = fetch_inputs(cur, chunk)
+
+                results = pool.map(evaluate_user, inputs,
+                                   chunksize=max(1, len(inputs) //
+                                                 (workers * 4)))
+                rows = [(uuid.uuid4(), user_id, NIGHTLY_INSIGHT_TYPE,
+                         content)
+                        for user_id, content in results if content]
+                if rows:
+                    execute_values(cur, INSERT_INSIGHTS_SQL, rows,
+                                   page_size=1000)
+                conn.commit()
+
+                processed += len(chunk)
+                elapsed = time.monotonic() - started
+                print(f"--- {processed}/{total} users "
+                      f"({processed / elapsed:.1f} users/s) ---")
+
+        elapsed = time.monotonic() - started
+        rate = processed / elapsed if elapsed else 0.0
+        print(f"\n--- ✅ Generated insights for {processed} users in "
+              f"{elapsed:.1f}s ({rate:.1f} users/s) ---")
+
+    except Exception as e:
+        print("\n--- !!! AN ERROR OCCURRED !!! ---")
+        print(f"Error: {e}")
+        conn.rollback()
+        print("--- Current chunk rolled back; re-run to resume. ---")
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate tonight's insight for every user.")
+    parser.add_argument("--chunk-size", type=int, default=500,
+                        help="Users fetched and written per transaction.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Engine worker processes.")
+    args = parser.parse_args()
+    run_batch(args.chunk_size, args.workers)
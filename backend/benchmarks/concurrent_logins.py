@@ -0,0 +1,142 @@
+# /backend/benchmarks/concurrent_logins.py
+"""
+Login storm: N logins fired at once, against
+
+* before - the previous handler: a sync endpoint that runs bcrypt on
+           FastAPI's shared threadpool while holding a pooled psycopg2
+           connection, and
+* after  - POST /api/login, which verifies on core.passwords' bounded
+           pool and sheds load with 503 once it is full.
+
+While each storm runs, a probe requests GET /api/principles every 50 ms
+to show what the storm does to everything else.
+
+Needs the database from .env (a throwaway user is created and removed).
+Run from /backend:
+
+    python -m benchmarks.concurrent_logins [--concurrency 50 200]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import timedelta
+import httpx
+import numpy as np
+from psycopg2.extras import DictCursor
+import main
+from auth import verify_password, create_access_token
+from core.config import ACCESS_TOKEN_EXPIRE_MINUTES
+from database import db_connection
+from schemas import UserLogin
+
+PASSWORD = "benchmark-password"
+PROBE_INTERVAL = 0.05
+
+
+def legacy_login(credentials: UserLogin):
+    """The login handler as it was before the bcrypt pool."""
+    with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=DictCursor)
+        cur.execute("SELECT user_id, password_hash, onboarding_complete \
+                    FROM users WHERE email = %s;", (credentials.email,))
+        user = cur.fetchone()
+        if not user or not verify_password(credentials.password,
+                                           user["password_hash"]):
+            return {"error": "Invalid credentials"}
+        access_token = create_access_token(
+            data={"sub": str(user["user_id"])},
+            expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    return {"access_token": access_token, "token_type": "bearer",
+            "onboarding_complete": user["onboarding_complete"]}
+
+
+async def _timed(client, method, url, **kwargs):
+    started = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    return response.status_code, time.perf_counter() - started
+
+
+async def _probe(client, stop, latencies):
+    while not stop.is_set():
+        _, elapsed = await _timed(client, "GET", "/api/principles")
+        latencies.append(elapsed)
+        await asyncio.sleep(PROBE_INTERVAL)
+
+
+def _ms(values, q):
+    return np.percentile(values, q) * 1000 if values else float("nan")
+
+
+async def storm(client, path, email, concurrency):
+    stop = asyncio.Event()
+    probe_latencies = []
+    probe = asyncio.create_task(_probe(client, stop, probe_latencies))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        _timed(client, "POST", path,
+               json={"email": email, "password": PASSWORD})
+        for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    ok = [t for status, t in results if status == 200]
+    shed = sum(1 for status, _ in results if status == 503)
+    return {
+        "ok": len(ok),
+        "shed": shed,
+        "other": len(results) - len(ok) - shed,
+        "logins_per_s": len(ok) / elapsed,
+        "p50_ms": _ms(ok, 50),
+        "p95_ms": _ms(ok, 95),
+        "probe_p95_ms": _ms(probe_latencies, 95),
+        "probe_max_ms": max(probe_latencies, default=0.0) * 1000,
+    }
+
+
+async def run_benchmark(concurrency_levels):
+    app = main.app
+    app.add_api_route("/benchmark/legacy-login", legacy_login,
+                      methods=["POST"])
+    email = f"login-benchmark-{uuid.uuid4().hex[:8]}@example.com"
+
+    async with main.lifespan(app):
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport,
+                                     base_url="http://benchmark",
+                                     timeout=None) as client:
+            response = await client.post("/api/users", json={
+                "display_name": "Benchmark", "email": email,
+                "password": PASSWORD})
+            response.raise_for_status()
+            try:
+                for concurrency in concurrency_levels:
+                    for label, path in (("before", "/benchmark/legacy-login"),
+                                        ("after", "/api/login")):
+                        r = await storm(client, path, email, concurrency)
+                        print(f"{concurrency:>4} logins, {label:<6}: "
+                              f"{r['ok']} ok, {r['shed']} shed (503), "
+                              f"{r['other']} other | "
+                              f"{r['logins_per_s']:.1f} logins/s, "
+                              f"p50 {r['p50_ms']:.0f} ms, "
+                              f"p95 {r['p95_ms']:.0f} ms | probe p95 "
+                              f"{r['probe_p95_ms']:.0f} ms, max "
+                              f"{r['probe_max_ms']:.0f} ms")
+            finally:
+                with db_connection() as conn:
+                    cur = conn.cursor()
+                    cur.execute("DELETE FROM users WHERE email = %s;",
+                                (email,))
+                    conn.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Concurrent login load, before and after.")
+    parser.add_argument("--concurrency", type=int, nargs="+",
+                        default=[50, 200])
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.concurrency))
@@ -0,0 +1,339 @@
+# /backend/benchmarks/endpoints.py
+"""
+p50/p95/p99 latency, throughput and queries per request of the main
+endpoints (dashboard, today's check-in, charts, routines and insight
+generation) at several data scales.
+
+Boots a throwaway Postgres cluster in a temporary directory (initdb and
+pg_ctl, Unix socket only, fsync off), loads sql/init.sql and
+sql/personality.sql, and for each scale seeds USERSxYEARS of history
+with seed.py. The app is then driven in-process through httpx's ASGI
+transport, by --concurrency clients that rotate over a sample of the
+seeded users. Caches are cleared before each endpoint, so every
+endpoint starts cold. The app's own console output is discarded while
+requests run.
+
+Results are written as JSON (--output) so runs can be compared; with
+--compare the p50/p95 of a previous results file are shown alongside.
+
+Needs the Postgres server binaries (initdb, pg_ctl, psql) on PATH, in
+$PG_BIN or in --pg-bin; the database in .env is not touched. Run from
+/backend:
+
+    python -m benchmarks.endpoints [--scales 100x1 1000x1 1000x3]
+        [--requests 200] [--concurrency 10] [--compare old.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+import httpx
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_FILES = [os.path.join(BACKEND_DIR, "sql", "init.sql"),
+                os.path.join(BACKEND_DIR, "sql", "personality.sql")]
+DATABASE_NAME = "benchmark"
+
+DEFAULT_SCALES = ["100x1", "1000x1", "1000x3"]
+# Seeded users the clients rotate over at each scale
+SAMPLED_USERS = 50
+WARMUP_REQUESTS = 10
+
+
+def endpoints(years):
+    """(name, method, path, query params) for each endpoint measured."""
+    history_start = (date.today() - timedelta(days=int(years * 365))
+                     ).isoformat()
+    return [
+        ("dashboard", "GET", "/api/dashboard", None),
+        ("checkins_today", "GET", "/api/checkins/today", None),
+        ("charts_principle_alignment", "GET",
+         "/api/charts/principle-alignment", None),
+        ("charts_series_day", "GET", "/api/charts/series",
+         {"metric": ["principle_alignment", "Time Allocation:Work",
+                     "Daily Rating:Focus"]}),
+        ("charts_series_month_all", "GET", "/api/charts/series",
+         {"metric": ["principle_alignment", "Time Allocation:Sleep"],
+          "granularity": "month", "start": history_start}),
+        ("routines", "GET", "/api/routines", None),
+        # Last: it writes, and invalidates the dashboard cache
+        ("insights_generate", "POST", "/api/insights/generate", None),
+    ]
+
+
+# -----------------------------------------------------------------
+# --- Throwaway Postgres cluster ---
+# -----------------------------------------------------------------
+
+def find_pg_bin(pg_bin=None):
+    """Directory holding initdb/pg_ctl/psql."""
+    candidates = [pg_bin, os.getenv("PG_BIN")]
+    initdb = shutil.which("initdb")
+    if initdb:
+        candidates.append(os.path.dirname(initdb))
+    pg_config = shutil.which("pg_config")
+    if pg_config:
+        candidates.append(subprocess.run(
+            [pg_config, "--bindir"], capture_output=True,
+            text=True).stdout.strip())
+    for candidate in candidates:
+        if candidate and os.path.exists(os.path.join(candidate, "initdb")):
+            return candidate
+    raise SystemExit("!!! Could not find initdb; pass --pg-bin or set "
+                     "PG_BIN to the Postgres bin directory.")
+
+
+class ThrowawayPostgres:
+    """
+    A fresh cluster in a temporary directory, listening only on a Unix
+    socket in that directory, removed again on exit.
+    """
+
+    def __init__(self, pg_bin):
+        self.pg_bin = pg_bin
+        self.root = None
+
+    def _run(self, program, *args):
+        subprocess.run([os.path.join(self.pg_bin, program), *args],
+                       check=True, stdout=subprocess.DEVNULL,
+                       env={**os.environ,
+                            "PGOPTIONS": "-c client_min_messages=warning"})
+
+    def psql(self, *args):
+        self._run("psql", "-h", self.root, "-U", "postgres", "-X", "-q",
+                  "-v", "ON_ERROR_STOP=1", *args)
+
+    def __enter__(self):
+        self.root = tempfile.mkdtemp(prefix="pa-benchmark-")
+        data = os.path.join(self.root, "data")
+        try:
+            self._run("initdb", "-D", data, "-U", "postgres", "-A", "trust",
+                      "-E", "UTF8", "--no-sync")
+            self._run("pg_ctl", "-D", data, "-w", "-l",
+                      os.path.join(self.root, "postgres.log"),
+                      "-o", f"-k {self.root} -c listen_addresses='' "
+                            "-c fsync=off -c full_page_writes=off",
+                      "start")
+            self.psql("-d", "postgres", "-c",
+                      f"CREATE DATABASE {DATABASE_NAME};")
+            for path in SCHEMA_FILES:
+                self.psql("-d", DATABASE_NAME, "-f", path)
+        except BaseException:
+            self.__exit__()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        data = os.path.join(self.root, "data")
+        if os.path.exists(os.path.join(data, "postmaster.pid")):
+            self._run("pg_ctl", "-D", data, "-w", "-m", "fast", "stop")
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def environment(self):
+        """Settings database.py reads, pointing at this cluster."""
+        return {"DB_HOST": self.root, "DB_DATABASE": DATABASE_NAME,
+                "DB_USER": "postgres", "DB_PASSWORD": ""}
+
+
+# -----------------------------------------------------------------
+# --- Load generation ---
+# -----------------------------------------------------------------
+
+def _ms(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 2) \
+        if values else None
+
+
+async def measure(client, method, path, params, tokens, requests,
+                  concurrency):
+    """Fires requests calls at path from concurrency clients."""
+    from database import track_queries
+
+    pending = iter(range(requests))
+    latencies, queries, statuses = [], [], {}
+
+    async def client_loop():
+        for i in pending:
+            token = tokens[i % len(tokens)]
+            with track_queries() as counted:
+                started = time.perf_counter()
+                response = await client.request(
+                    method, path, params=params,
+                    headers={"Authorization": f"Bearer {token}"})
+                elapsed = time.perf_counter() - started
+            status = str(response.status_code)
+            statuses[status] = statuses.get(status, 0) + 1
+            # 4xx are answers too (no check-in today is a 404)
+            if response.status_code >= 500:
+                continue
+            latencies.append(elapsed)
+            queries.append(counted.count)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client_loop() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    if latencies and not any(queries):
+        # Every endpoint here reads the database at least once, so all
+        # zeros means the statements are not reaching the counter
+        raise RuntimeError(f"{method} {path}: no queries were counted")
+    return {
+        "requests": requests,
+        "errors": requests - len(latencies),
+        "statuses": statuses,
+        "p50_ms": _ms(latencies, 50),
+        "p95_ms": _ms(latencies, 95),
+        "p99_ms": _ms(latencies, 99),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2)
+        if latencies else None,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "queries_per_request": round(sum(queries) / len(queries), 2)
+        if queries else None,
+    }
+
+
+async def run_scale(cluster, users, years, args):
+    import main
+    from auth import create_access_token
+    from core.cache import dashboard_cache, token_cache
+    from database import db_connection
+    from seed import seed
+
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("TRUNCATE users CASCADE;")
+        conn.commit()
+    started = time.monotonic()
+    _, checkins, rows = seed(users, years, workers=args.workers,
+                             prefix="bench", random_seed=args.seed)
+    seeded = time.monotonic() - started
+
+    with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT user_id FROM users ORDER BY user_id;")
+        user_ids = [row[0] for row in cur.fetchall()]
+        conn.commit()
+    sample = random.Random(args.seed).sample(
+        user_ids, min(SAMPLED_USERS, len(user_ids)))
+    tokens = [create_access_token({"sub": str(user_id)})
+              for user_id in sample]
+
+    result = {"users": users, "years": years, "checkins": checkins,
+              "rows": rows, "seed_seconds": round(seeded, 1),
+              "endpoints": {}}
+    app = main.app
+    async with main.lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport,
+                                     base_url="http://benchmark",
+                                     timeout=None) as client:
+            for name, method, path, params in endpoints(years):
+                dashboard_cache.clear()
+                token_cache.clear()
+                # print() to a None stdout is a no-op
+                quiet = contextlib.nullcontext() if args.verbose else \
+                    contextlib.redirect_stdout(None)
+                with quiet:
+                    await measure(client, method, path, params, tokens,
+                                  WARMUP_REQUESTS, 1)
+                    stats = await measure(client, method, path, params,
+                                          tokens, args.requests,
+                                          args.concurrency)
+                result["endpoints"][name] = stats
+                print(f"{users:>6}x{years:<3} {name:<28} "
+                      f"p50 {stats['p50_ms']} ms, "
+                      f"p95 {stats['p95_ms']} ms, "
+                      f"p99 {stats['p99_ms']} ms, "
+                      f"{stats['throughput_rps']} req/s, "
+                      f"{stats['queries_per_request']} queries/req, "
+                      f"{stats['errors']} errors")
+    return result
+
+
+def compare(results, previous_path):
+    with open(previous_path) as f:
+        previous = {(scale["users"], scale["years"]): scale
+                    for scale in json.load(f)["scales"]}
+    print(f"\n--- Compared with {previous_path} (p50 / p95) ---")
+    for scale in results["scales"]:
+        old_scale = previous.get((scale["users"], scale["years"]))
+        if old_scale is None:
+            continue
+        for name, stats in scale["endpoints"].items():
+            old = old_scale["endpoints"].get(name)
+            if not old or not old["p50_ms"] or not stats["p50_ms"]:
+                continue
+            changes = ", ".join(
+                f"{old[key]} -> {stats[key]} ms "
+                f"({(stats[key] / old[key] - 1) * 100:+.0f}%)"
+                for key in ("p50_ms", "p95_ms"))
+            print(f"{scale['users']:>6}x{scale['years']:<3} "
+                  f"{name:<28} {changes}")
+
+
+def parse_scale(value):
+    users, _, years = value.partition("x")
+    try:
+        return int(users), float(years) if "." in years else int(years)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected USERSxYEARS, e.g. 1000x3, not {value!r}")
+
+
+def run_benchmark(args):
+    with ThrowawayPostgres(find_pg_bin(args.pg_bin)) as cluster:
+        # database.py and seed.py's workers read these when connecting
+        os.environ.update(cluster.environment())
+        results = {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "git_commit": subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                capture_output=True, text=True).stdout.strip() or None,
+            "settings": {"requests": args.requests,
+                         "concurrency": args.concurrency,
+                         "sampled_users": SAMPLED_USERS,
+                         "seed": args.seed},
+            "scales": [],
+        }
+        for users, years in args.scales:
+            results["scales"].append(
+                asyncio.run(run_scale(cluster, users, years, args)))
+
+    output = args.output or \
+        f"endpoints-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n--- Results written to {output} ---")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Endpoint latency at several data scales.")
+    parser.add_argument("--scales", type=parse_scale, nargs="+",
+                        default=[parse_scale(s) for s in DEFAULT_SCALES],
+                        help="USERSxYEARS to seed, e.g. 1000x3.")
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Requests per endpoint and scale.")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="seed.py worker processes.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pg-bin", help="Postgres bin directory.")
+    parser.add_argument("--output", help="Results file (JSON).")
+    parser.add_argument("--compare", help="Earlier results file.")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Keep the app's console output.")
+    run_benchmark(parser.parse_args())
@@ -0,0 +1,95 @@
+# /backend/benchmarks/gratitude_sampling.py
+"""
+Compares the old ORDER BY RANDOM() gratitude query with the
+gratitude_seq sampler used by GET /api/dashboard, for a user with
+10 years of daily check-ins.
+
+Run from /backend against a database built from sql/init.sql:
+
+    python -m benchmarks.gratitude_sampling
+
+Everything happens inside one transaction that is rolled back, so the
+database is left untouched.
+"""
+import time
+import uuid
+from database import get_db_connection
+
+YEARS_OF_HISTORY = 10
+ITERATIONS = 200
+
+ORDER_BY_RANDOM_SQL = """
+    SELECT gratitude_entry, checkin_date
+    FROM daily_checkins
+    WHERE user_id = %(user_id)s
+    AND gratitude_entry IS NOT NULL
+    AND gratitude_entry != ''
+    ORDER BY RANDOM()
+    LIMIT 1;
+"""
+
+SEQ_SAMPLER_SQL = """
+    SELECT gratitude_entry, checkin_date
+    FROM daily_checkins
+    WHERE user_id = %(user_id)s
+      AND gratitude_seq >= (
+          SELECT floor(random() * MAX(gratitude_seq))::int + 1
+          FROM daily_checkins
+          WHERE user_id = %(user_id)s
+            AND gratitude_seq IS NOT NULL
+      )
+    ORDER BY gratitude_seq
+    LIMIT 1;
+"""
+
+
+def time_query(cur, sql, params):
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        cur.execute(sql, params)
+        cur.fetchone()
+    return (time.perf_counter() - started) / ITERATIONS * 1000
+
+
+def run_benchmark():
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        user_id = uuid.uuid4()
+        days = YEARS_OF_HISTORY * 365
+        cur.execute(
+            "INSERT INTO users (user_id, email, password_hash) \
+            VALUES (%s, %s, 'x');",
+            (user_id, f"bench-{user_id}@example.com")
+        )
+        # Roughly one day in five has no gratitude entry
+        cur.execute(
+            """
+            INSERT INTO daily_checkins (user_id, checkin_date,
+                                        gratitude_entry, principle_alignment)
+            SELECT %(user_id)s, CURRENT_DATE - d,
+                   CASE WHEN random() < 0.8
+                        THEN 'Synthetic gratitude ' || d END,
+                   1 + floor(random() * 10)::int
+            FROM generate_series(0, %(days)s - 1) AS d;
+            """,
+            {"user_id": user_id, "days": days}
+        )
+        cur.execute("ANALYZE daily_checkins;")
+        params = {"user_id": user_id}
+
+        print(f"User with {days} check-ins, {ITERATIONS} iterations each:")
+        for label, sql in (("ORDER BY RANDOM()", ORDER_BY_RANDOM_SQL),
+                           ("gratitude_seq sampler", SEQ_SAMPLER_SQL)):
+            avg_ms = time_query(cur, sql, params)
+            cur.execute("EXPLAIN (ANALYZE, COSTS OFF) " + sql, params)
+            plan = "\n".join("      " + row[0] for row in cur.fetchall())
+            print(f"  {label:<22} {avg_ms:8.3f} ms/query\n{plan}")
+    finally:
+        conn.rollback()
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,115 @@
+# /backend/benchmarks/insights_engine.py
+"""
+Per-user latency of the insights engine (history frame build plus rule
+evaluation) at 1 and 5 years of daily check-ins, and of a plan with
+hundreds of synthetic rules when all of them run versus when only the
+rules reading one changed input do.
+
+Needs no database. Run from /backend:
+
+    python -m benchmarks.insights_engine
+"""
+import random
+import time
+from datetime import date, timedelta
+from insights_engine import (build_history_frame, generate_insights,
+                             evaluate_rules, EvaluationPlan, Rule)
+
+HISTORY_YEARS = (1, 5)
+ITERATIONS = 50
+RULE_COUNTS = (10, 100, 1000)
+
+# Same metrics as seed.py / the check-in form
+TIME_METRICS = ['Work', 'Family', 'Social', 'Exercise', 'Sleep', 'Maintenance']
+RATING_METRICS = ['Productivity', 'Focus', 'Fun']
+
+
+def synthetic_history(days):
+    """Rows shaped like the insights router's history query."""
+    today = date.today()
+    rows = []
+    for i in range(days, 0, -1):
+        if random.random() < 0.1:
+            continue  # a missed day
+        metrics = {f"Time Allocation:{name}": random.randint(5, 25)
+                   for name in TIME_METRICS}
+        metrics.update({f"Daily Rating:{name}": random.randint(4, 9)
+                        for name in RATING_METRICS})
+        rows.append({
+            'checkin_date': today - timedelta(days=i),
+            'principle_alignment': random.randint(1, 10),
+            'has_gratitude': random.random() < 0.8,
+            'metrics': metrics,
+        })
+    return rows
+
+
+def run_benchmark():
+    personality = [{'trait_name': 'Introverted', 'value': 70}]
+    for years in HISTORY_YEARS:
+        rows = synthetic_history(years * 365)
+        latest = {**rows[-1], 'metrics': []}
+
+        started = time.perf_counter()
+        for _ in range(ITERATIONS):
+            history = build_history_frame(rows)
+        built = time.perf_counter()
+        for _ in range(ITERATIONS):
+            generate_insights(personality, [], latest, history)
+        finished = time.perf_counter()
+
+        build_ms = (built - started) / ITERATIONS * 1000
+        rules_ms = (finished - built) / ITERATIONS * 1000
+        print(f"{years} year(s), {len(rows)} check-ins: "
+              f"build {build_ms:.2f} ms + rules {rules_ms:.2f} ms "
+              f"= {build_ms + rules_ms:.2f} ms per user")
+
+
+def synthetic_plan(rule_count):
+    """rule_count rules, each reading one trait and one metric."""
+    def check(trait_name, metric_name):
+        def evaluate(inputs):
+            if inputs.trait(trait_name, 0) > 50 and \
+                    inputs.metric('Daily Rating', metric_name, 0) < 5:
+                return f"{trait_name} / {metric_name}"
+            return None
+        return evaluate
+
+    return EvaluationPlan([
+        Rule(f"rule_{i}", check(f"Trait {i % 50}", f"Metric {i % 40}"),
+             frozenset({('trait', f"Trait {i % 50}"),
+                        ('metric', 'Daily Rating', f"Metric {i % 40}")}))
+        for i in range(rule_count)
+    ])
+
+
+def run_rule_scaling_benchmark():
+    personality = [{'trait_name': f"Trait {i}",
+                    'value': random.randint(0, 100)} for i in range(50)]
+    metrics = [{'metric_type': 'Daily Rating', 'metric_name': f"Metric {i}",
+                'value': random.randint(1, 10)} for i in range(40)]
+    latest = {'metrics': metrics}
+    # The next day's check-in differs in a single metric
+    changed = {'metrics': metrics[1:] + [{**metrics[0], 'value': 0}]}
+
+    for rule_count in RULE_COUNTS:
+        plan = synthetic_plan(rule_count)
+        previous = evaluate_rules(plan, personality, [], latest)
+
+        started = time.perf_counter()
+        for _ in range(ITERATIONS):
+            evaluate_rules(plan, personality, [], changed)
+        full = time.perf_counter()
+        for _ in range(ITERATIONS):
+            evaluate_rules(plan, personality, [], changed, previous=previous)
+        finished = time.perf_counter()
+
+        full_ms = (full - started) / ITERATIONS * 1000
+        incremental_ms = (finished - full) / ITERATIONS * 1000
+        print(f"{rule_count} rules: all {full_ms:.3f} ms, "
+              f"changed inputs only {incremental_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    run_benchmark()
+    run_rule_scaling_benchmark()
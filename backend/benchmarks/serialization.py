@@ -0,0 +1,170 @@
+# /backend/benchmarks/serialization.py
+"""
+Serialization cost per endpoint: the time from a handler's return value
+to response body bytes, for payloads shaped like those of the hot read
+endpoints (charts, routines, today's check-in, dashboard).
+
+Three paths are timed for each payload:
+
+* before  - what FastAPI did with the stdlib JSON response: the
+            response_model is validated and dumped (or, without one,
+            jsonable_encoder walks the payload), then json.dumps.
+* default - the same encoding step, then orjson (ORJSONResponse as the
+            app's default_response_class, for handlers returning data).
+* direct  - the handler returns ORJSONResponse(rows) itself, so only
+            orjson runs. This is what the endpoints below now do.
+
+No database or app is needed. Run from /backend:
+
+    python -m benchmarks.serialization [--iterations 2000]
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+from core.responses import ORJSONResponse
+from schemas import ChartData, MultiSeriesChartData
+
+REPEATS = 5
+rng = random.Random(0)
+
+
+def _days(count):
+    today = date.today()
+    return [today - timedelta(days=count - 1 - i) for i in range(count)]
+
+
+def principle_alignment_chart(days=60):
+    labels = _days(days)
+    return ChartData, {"labels": labels,
+                       "data": [rng.randint(1, 10) for _ in labels]}
+
+
+def chart_series(days, metrics=3):
+    labels = _days(days)
+    return MultiSeriesChartData, {
+        "granularity": "day",
+        "aggregate": "avg",
+        "labels": labels,
+        "series": [{"metric": f"metric {i}",
+                    "data": [round(rng.uniform(0, 10), 2)
+                             if rng.random() < 0.8 else None
+                             for _ in labels]}
+                   for i in range(metrics)],
+    }
+
+
+def routines(count=10, steps=8):
+    user_id = uuid.uuid4()
+    created = datetime.now(timezone.utc)
+    payload = []
+    for _ in range(count):
+        routine_id = uuid.uuid4()
+        payload.append({
+            "routine_id": routine_id, "user_id": user_id,
+            "routine_name": "Morning routine", "is_active": True,
+            "created_at": created,
+            "steps": [{"step_id": uuid.uuid4(), "routine_id": routine_id,
+                       "step_name": f"Step {i}", "target_duration": 10,
+                       "step_order": i, "created_at": created}
+                      for i in range(steps)],
+        })
+    return None, payload
+
+
+def checkins_today(metrics=12, steps=8):
+    # The nested parts come from json_agg, so they are plain JSON types
+    return None, {
+        "checkin_id": uuid.uuid4(), "checkin_date": date.today(),
+        "gratitude_entry": "Coffee with a friend",
+        "principle_alignment": 7, "principle_alignment_note": "Good day",
+        "metrics": [{"metric_type": "Time Allocation",
+                     "metric_name": f"Metric {i}", "value": i}
+                    for i in range(metrics)],
+        "top_goal": {"goal_description": "Ship it", "is_completed": False},
+        "completed_steps": [{"step_id": str(uuid.uuid4()),
+                             "step_name": f"Step {i}", "is_completed": True,
+                             "actual_duration": 9}
+                            for i in range(steps)],
+    }
+
+
+def dashboard(metrics=12):
+    return None, {
+        "latest_checkin": {
+            "checkin_id": uuid.uuid4(), "checkin_date": date.today(),
+            "gratitude_entry": "Coffee", "principle_alignment": 7,
+            "principle_alignment_note": "Good day"},
+        "top_goal": {"goal_description": "Ship it", "is_completed": False},
+        "daily_metrics": [{"metric_type": "Daily Rating",
+                           "metric_name": f"Metric {i}",
+                           "value": Decimal(f"{rng.uniform(0, 10):.2f}")}
+                          for i in range(metrics)],
+        "latest_insight": {"insight_id": uuid.uuid4(),
+                           "insight_type": "Daily Tidbit",
+                           "content": "Your principle alignment " * 8},
+        "random_gratitude": {"gratitude_entry": "Sunshine",
+                             "checkin_date": date.today()},
+    }
+
+
+PAYLOADS = [
+    ("charts_principle_alignment", principle_alignment_chart),
+    ("charts_series_day_60", lambda: chart_series(60)),
+    ("charts_series_day_365", lambda: chart_series(365)),
+    ("routines", routines),
+    ("checkins_today", checkins_today),
+    ("dashboard", dashboard),
+]
+
+
+def encode(model, payload):
+    """FastAPI's step between the return value and the response class."""
+    if model is not None:
+        return model.model_validate(payload).model_dump(mode="json")
+    return jsonable_encoder(payload)
+
+
+PATHS = {
+    "before": lambda model, payload:
+        JSONResponse(encode(model, payload)).body,
+    "default": lambda model, payload:
+        ORJSONResponse(encode(model, payload)).body,
+    "direct": lambda model, payload: ORJSONResponse(payload).body,
+}
+
+
+def time_path(path, model, payload, iterations):
+    """Best of REPEATS, in microseconds per response."""
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            path(model, payload)
+        best = min(best, time.perf_counter() - started)
+    return best / iterations * 1e6
+
+
+def run_benchmark(iterations):
+    print(f"{'endpoint':<28}{'bytes':>8}"
+          + "".join(f"{name:>11}" for name in PATHS) + "   speedup")
+    for name, build in PAYLOADS:
+        model, payload = build()
+        size = len(PATHS["direct"](model, payload))
+        timings = {path_name: time_path(path, model, payload, iterations)
+                   for path_name, path in PATHS.items()}
+        print(f"{name:<28}{size:>8}"
+              + "".join(f"{us:>8.1f} us" for us in timings.values())
+              + f"   {timings['before'] / timings['direct']:6.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time response serialization per endpoint.")
+    parser.add_argument("--iterations", type=int, default=2000,
+                        help="Responses encoded per timing run.")
+    run_benchmark(parser.parse_args().iterations)
@@ -0,0 +1,179 @@
+# /backend/core/cache.py
+
+import hashlib
+import threading
+import time
+from cachetools import TLRUCache, TTLCache
+from core.config import (DASHBOARD_CACHE_SIZE, DASHBOARD_CACHE_TTL,
+                         AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_CACHE_MAX_AGE)
+
+
+class SnapshotCache:
+    """
+    Bounded per-key cache (LRU eviction once full, entries expire after
+    ttl seconds) with hit/miss counters.
+
+    Readers call begin(key) before running their queries and pass the
+    returned token to set(). If the key was invalidated in the meantime
+    the snapshot is dropped, so a slow read can never overwrite the
+    invalidation of a concurrent write.
+
+    The cache is per process: with several workers, a write only clears
+    the worker that handled it. Readers that can cheaply read a version
+    of the data (e.g. users.data_version) pass it to set() and get(), so
+    an entry built from older data is never served; without one, the
+    other workers catch up within ttl.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._invalidated = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key, version=None):
+        """The value for key, if it was set with this version."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] != version:
+                # Built from older data, e.g. before another process wrote
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def begin(self, key):
+        with self._lock:
+            return self._epoch
+
+    def set(self, key, value, token, version=None):
+        with self._lock:
+            if self._invalidated.get(key, -1) > token:
+                return
+            self._entries[key] = (version, value)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._epoch += 1
+            self._invalidated[key] = self._epoch
+            self._entries.pop(key, None)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+# Per-user GET /api/dashboard snapshots, keyed by user_id
+dashboard_cache = SnapshotCache(DASHBOARD_CACHE_SIZE, DASHBOARD_CACHE_TTL)
+
+
+class TokenCache:
+    """
+    Verified access tokens: SHA-256 of the token -> (user_id, exp).
+
+    An entry expires at the token's own exp, or max_age seconds after it
+    was verified if that comes first. Revoking a token drops its entry
+    and keeps it from being re-added in this process; other processes
+    stop accepting it within max_age, when their entry expires and the
+    token is checked against revoked_tokens again.
+
+    Verifications (signature check plus revocation lookup on a miss) are
+    timed, so stats() can estimate the auth work the hits saved.
+    """
+
+    def __init__(self, maxsize, max_age):
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self._entries = TLRUCache(maxsize=maxsize, ttu=self._expires_at,
+                                  timer=time.time)
+        # Hashes revoked here, until the token would have expired anyway
+        self._revoked = TLRUCache(maxsize=maxsize,
+                                  ttu=lambda key, exp, now: exp,
+                                  timer=time.time)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revocations = 0
+        self.verifications = 0
+        self._verify_time_total = 0.0
+
+    def _expires_at(self, key, value, now):
+        _, exp = value
+        return min(exp, now + self.max_age)
+
+    @staticmethod
+    def key(token):
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, key):
+        """Returns (user_id, exp) for a cached token, else None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key, user_id, exp, verify_seconds=0.0):
+        with self._lock:
+            self.verifications += 1
+            self._verify_time_total += verify_seconds
+            if key in self._revoked or exp <= time.time():
+                return
+            self._entries[key] = (user_id, exp)
+
+    def revoke(self, key, exp):
+        with self._lock:
+            self._entries.pop(key, None)
+            if exp > time.time():
+                self._revoked[key] = exp
+            self.revocations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            verify_ms_avg = (self._verify_time_total / self.verifications
+                             * 1000 if self.verifications else 0.0)
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "max_age": self.max_age,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "revocations": self.revocations,
+                "verify_ms_avg": verify_ms_avg,
+                # Time the hits would have spent verifying tokens
+                "verify_ms_saved": verify_ms_avg * self.hits,
+            }
+
+
+# Verified bearer tokens for auth.get_current_user
+token_cache = TokenCache(AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_CACHE_MAX_AGE)
@@ -0,0 +1,143 @@
+# /backend/core/catalog.py
+"""
+Process-wide copy of the principles catalog.
+
+The principles table only changes when sql/personality.sql is loaded, so
+GET /api/principles and the insight path read it from memory instead of
+querying or joining it. The copy is loaded at startup and kept current
+by a listener task holding a LISTEN connection: the trigger that bumps
+catalog_versions also sends NOTIFY catalog_changed (sql/init.sql).
+
+While that connection is down (or before it is up), every read first
+compares catalog_versions with the loaded version, one primary-key
+lookup, and reloads if they differ.
+"""
+import asyncio
+import logging
+from database import async_db_connection, connect_async_unpooled
+from core.etags import make_etag
+
+logger = logging.getLogger(__name__)
+
+CATALOG_CHANNEL = "catalog_changed"
+CATALOG = "principles"
+# Seconds between attempts to re-establish the LISTEN connection
+LISTEN_RETRY_DELAY = 5
+
+VERSION_SQL = "SELECT version FROM catalog_versions WHERE catalog = %s;"
+PRINCIPLES_SQL = "SELECT principle_id, name, description FROM principles \
+                 ORDER BY name;"
+
+
+class PrinciplesCatalog:
+    """The principles rows, their names by id, and the catalog's ETag."""
+
+    def __init__(self):
+        self._rows = []  # as GET /api/principles returns them
+        self._names = {}  # principle_id -> name
+        self._loaded = False
+        self.version = None
+        self.etag = None
+        self.listening = False
+        self.reloads = 0
+        self._listener = None
+
+    async def start(self):
+        try:
+            await self.refresh()
+        except Exception:
+            # Reads load it on demand once the database is reachable
+            logger.exception("Could not load the principles catalog")
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    async def _load(self, cur):
+        # Version first: if the catalog changes in between, the rows are
+        # newer than the version and the next check loads them again
+        await cur.execute(VERSION_SQL, (CATALOG,))
+        row = await cur.fetchone()
+        version = row["version"] if row else None
+        await cur.execute(PRINCIPLES_SQL)
+        rows = await cur.fetchall()
+        self._rows = rows
+        self._names = {row["principle_id"]: row["name"] for row in rows}
+        self.version = version
+        self.etag = make_etag(CATALOG, version)
+        self._loaded = True
+        self.reloads += 1
+        logger.info("Principles catalog loaded",
+                    extra={"principles": len(rows), "version": version})
+
+    async def refresh(self, cur=None):
+        """Reloads the catalog, on cur's connection if one is given."""
+        if cur is not None:
+            await self._load(cur)
+            return
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            await self._load(cur)
+
+    async def _refresh_if_stale(self, cur=None):
+        if cur is None:
+            async with async_db_connection() as conn, conn.cursor() as cur:
+                await self._refresh_if_stale(cur)
+            return
+        await cur.execute(VERSION_SQL, (CATALOG,))
+        row = await cur.fetchone()
+        version = row["version"] if row else None
+        if not self._loaded or version != self.version:
+            await self._load(cur)
+
+    async def _ensure_current(self, cur=None):
+        if not self._loaded or not self.listening:
+            await self._refresh_if_stale(cur)
+
+    async def principles(self):
+        """(rows ordered by name, ETag)"""
+        await self._ensure_current()
+        return self._rows, self.etag
+
+    async def names(self, principle_ids, cur=None):
+        """
+        Names of principle_ids, skipping unknown ids. An unknown id can
+        mean a change whose notification has not arrived yet, so the
+        catalog is reloaded once before giving up on it.
+        """
+        await self._ensure_current(cur)
+        principle_ids = list(principle_ids)
+        if any(pid not in self._names for pid in principle_ids):
+            await self.refresh(cur)
+        return [self._names[pid] for pid in principle_ids
+                if pid in self._names]
+
+    async def _listen(self):
+        while True:
+            try:
+                conn = await connect_async_unpooled()
+                async with conn:
+                    await conn.execute(f"LISTEN {CATALOG_CHANNEL};")
+                    self.listening = True
+                    # Anything changed while not listening is picked up
+                    await self._refresh_if_stale()
+                    async for notify in conn.notifies():
+                        if notify.payload == CATALOG:
+                            await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Catalog listener disconnected; checking "
+                               "versions until it is back", exc_info=True)
+            finally:
+                self.listening = False
+            await asyncio.sleep(LISTEN_RETRY_DELAY)
+
+    def stats(self):
+        return {"size": len(self._rows), "version": self.version or 0,
+                "listening": int(self.listening), "reloads": self.reloads}
+
+
+principles_catalog = PrinciplesCatalog()
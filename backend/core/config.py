@@ -17,3 +17,47 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30  # Token validity period
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Per-user dashboard snapshot cache (see core/cache.py)
+DASHBOARD_CACHE_SIZE = int(os.getenv("DASHBOARD_CACHE_SIZE", "1024"))
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "300"))
+
+# Users whose previous insight-rule inputs and results are kept, so their
+# next call only re-runs the rules whose inputs changed (insights_engine.py)
+INSIGHT_RULE_CACHE_SIZE = int(os.getenv("INSIGHT_RULE_CACHE_SIZE", "1024"))
+
+# Background insight generation (see insight_jobs.py)
+INSIGHT_QUEUE_BACKEND = os.getenv("INSIGHT_QUEUE_BACKEND", "memory")
+INSIGHT_WORKERS = int(os.getenv("INSIGHT_WORKERS", "2"))
+# Seconds a finished job stays visible to the memory backend
+INSIGHT_JOB_TTL = float(os.getenv("INSIGHT_JOB_TTL", "3600"))
+# Seconds between polls of insight_jobs when idle (postgres backend)
+INSIGHT_JOB_POLL_INTERVAL = float(os.getenv("INSIGHT_JOB_POLL_INTERVAL", "1"))
+# 'running' jobs older than this are assumed orphaned and re-run
+INSIGHT_JOB_STALE_AFTER = float(os.getenv("INSIGHT_JOB_STALE_AFTER", "300"))
+
+# bcrypt thread pool used by login/signup (see core/passwords.py)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS",
+                                      str(os.cpu_count() or 1)))
+# Hash/verify calls allowed to run or wait at once before answering 503
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING",
+                                          str(PASSWORD_HASH_WORKERS * 8)))
+
+# Verified access tokens kept by auth.get_current_user (see core/cache.py)
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+# Seconds before a cached token is re-verified (and re-checked for
+# revocation by another process), even if it has not expired
+AUTH_TOKEN_CACHE_MAX_AGE = float(os.getenv("AUTH_TOKEN_CACHE_MAX_AGE", "60"))
+
+# GET /metrics (see core/metrics.py). Scrapers must send METRICS_TOKEN as
+# a bearer token; without one set the route is not mounted at all.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Logging (see core/logging.py). LOG_FORMAT is "text" or "json"; at
+# DEBUG, only LOG_DEBUG_SAMPLE_RATE of requests keep their debug records.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+# Requests slower than this are logged as a warning with their slowest
+# SQL statement
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "1.0"))
@@ -0,0 +1,65 @@
+# /backend/core/etags.py
+"""
+ETags for the read endpoints, built from version counters instead of a
+hash of the body. users.data_version is bumped by triggers whenever any
+of the user's rows change, and catalog_versions by changes to shared
+data such as principles (see sql/init.sql), so a handler can answer a
+matching If-None-Match with 304 after one primary-key lookup and
+without running its main queries:
+
+    etag = await user_etag(cur, current_user_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    ...
+    return with_etag(ORJSONResponse(rows), etag)
+
+The tags are weak: they promise the same data, not the same bytes.
+"""
+import hashlib
+from fastapi import Response
+
+# Browsers keep the response but revalidate it on every use; shared
+# caches must not store it at all
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts):
+    """Weak ETag over parts. The user id is one of them, so tags stay
+    distinct when another user signs in on the same browser."""
+    digest = hashlib.blake2s(repr(parts).encode(), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+async def user_etag(cur, user_id, *parts):
+    """ETag for the user's data as of now, plus any extra parts (e.g.
+    today's date for endpoints whose default range moves daily)."""
+    await cur.execute("SELECT data_version FROM users WHERE user_id = %s;",
+                      (user_id,))
+    row = await cur.fetchone()
+    return make_etag(str(user_id), row["data_version"] if row else None,
+                     *parts)
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header value covers etag (weak
+    comparison, as RFC 9110 requires for If-None-Match)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque
+               for tag in if_none_match.split(","))
+
+
+def _headers(etag):
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag):
+    return Response(status_code=304, headers=_headers(etag))
+
+
+def with_etag(response, etag):
+    response.headers.update(_headers(etag))
+    return response
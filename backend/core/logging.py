@@ -0,0 +1,197 @@
+# /backend/core/logging.py
+"""
+Application logging.
+
+Handlers only put records on a queue; a QueueListener thread formats and
+writes them, so a log call on the event loop never waits on stdout. Every
+record carries the id of the request it was logged for, which
+RequestIdMiddleware takes from the X-Request-ID header (or generates) and
+echoes back on the response.
+
+    logger = logging.getLogger(__name__)
+    logger.info("Check-in created",
+                extra={"user_id": user_id, "checkin_id": checkin_id})
+
+Fields passed in `extra` become JSON keys (LOG_FORMAT=json) or trailing
+key=value pairs (LOG_FORMAT=text). At LOG_LEVEL=DEBUG only
+LOG_DEBUG_SAMPLE_RATE of requests keep their debug records, all of them,
+so a sampled request can still be followed end to end.
+"""
+
+import copy
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from core.config import LOG_LEVEL, LOG_FORMAT, LOG_DEBUG_SAMPLE_RATE
+
+request_id = ContextVar("request_id", default=None)
+# Whether the current request keeps its DEBUG records. Outside requests
+# (startup, insight workers) nothing is sampled away.
+_debug_sampled = ContextVar("debug_sampled", default=True)
+
+# Client supplied ids are only trusted if they look like an id
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {
+    "message", "asctime", "request_id", "taskName"}
+
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_traceback_formatter = logging.Formatter()
+_listener = None
+_queue_handler = None
+
+
+def _extra_fields(record):
+    return {key: value for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES}
+
+
+class _ContextFilter(logging.Filter):
+    """
+    Runs in the thread that logs, where the request context is visible:
+    stamps the request id and drops DEBUG records of unsampled requests.
+    """
+
+    def filter(self, record):
+        if record.levelno <= logging.DEBUG and not _debug_sampled.get():
+            return False
+        record.request_id = request_id.get()
+        return True
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record):
+        # The base class folds message, traceback and all into one
+        # formatted string; keep them apart so the formatter on the
+        # writer thread can lay them out. The traceback travels as an
+        # extra field.
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.traceback = _traceback_formatter.formatException(
+                record.exc_info)
+        record.exc_info = record.exc_text = record.stack_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            **_extra_fields(record),
+        }
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s "
+                         "[%(request_id)s] %(message)s")
+
+    def format(self, record):
+        if getattr(record, "request_id", None) is None:
+            record.request_id = "-"
+        fields = _extra_fields(record)
+        traceback = fields.pop("traceback", None)
+        line = super().format(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}"
+                                   for key, value in fields.items())
+        if traceback:
+            line += "\n" + traceback
+        return line
+
+
+def setup_logging(level=LOG_LEVEL, log_format=LOG_FORMAT, stream=None):
+    """
+    Route the root logger through a queue to a writer thread. Call once
+    at startup, and stop_logging() on shutdown to flush what is queued.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(JsonFormatter() if log_format == "json"
+                        else TextFormatter())
+
+    records = queue.SimpleQueue()
+    _queue_handler = _QueueHandler(records)
+    _queue_handler.addFilter(_ContextFilter())
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+    # Send uvicorn's error and access logs through the same queue rather
+    # than its own handlers, which write to stderr on the event loop
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    _listener = QueueListener(records, writer)
+    _listener.start()
+
+
+def stop_logging():
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    _listener = _queue_handler = None
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware that gives each HTTP request an id for its log
+    records: the caller's X-Request-ID if it looks like one, a new one
+    otherwise. The id is returned in the X-Request-ID response header.
+    It also decides whether this request keeps its DEBUG records.
+    """
+
+    def __init__(self, app, sample_rate=LOG_DEBUG_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")
+                break
+        current_id = incoming if incoming and \
+            _REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [
+                    *message.get("headers", []),
+                    (b"x-request-id", current_id.encode())]}
+            await send(message)
+
+        id_token = request_id.set(current_id)
+        sampled_token = _debug_sampled.set(
+            self.sample_rate >= 1 or random.random() < self.sample_rate)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _debug_sampled.reset(sampled_token)
+            request_id.reset(id_token)
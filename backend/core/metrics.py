@@ -0,0 +1,288 @@
+# /backend/core/metrics.py
+
+import bisect
+import hashlib
+import logging
+import re
+import threading
+import time
+from database import track_queries
+from core.config import SLOW_REQUEST_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds (seconds, or statements per request)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0)
+QUERY_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                      0.5, 1.0, 2.5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+# Longest SQL text logged with a slow request
+STATEMENT_LOG_LENGTH = 200
+
+# The table a statement names first, for its label
+_STATEMENT_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+([\w.\"]+)",
+                              re.IGNORECASE)
+
+# Label for requests that matched no route, so 404 scans of random
+# paths cannot create unbounded label sets
+UNMATCHED_ROUTE = "unmatched"
+
+
+def statement_label(statement):
+    """
+    Short name for a SQL statement, e.g. "SELECT daily_checkins 3f2a9c1e":
+    its verb, the first table it names and a fingerprint of the text.
+    Label values are published on /metrics, so the SQL itself is not.
+    """
+    text = " ".join(statement.split())
+    verb = text.split(" ", 1)[0].upper() if text else "?"
+    table = _STATEMENT_TABLE.search(text)
+    digest = hashlib.blake2s(text.encode(), digest_size=4).hexdigest()
+    return " ".join(part for part in
+                    (verb, table.group(1) if table else None, digest)
+                    if part)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            yield bound, total
+
+
+class _RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_time = Histogram(QUERY_TIME_BUCKETS)
+        self.db_queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.slowest_query = Histogram(QUERY_TIME_BUCKETS)
+        self.statuses = {}
+        # The slowest single statement seen on this route, as its
+        # statement_label()
+        self.slowest_seconds = 0.0
+        self.slowest_statement = None
+
+
+class RequestMetrics:
+    """
+    Per-route request latency, and per-request query count, DB time and
+    slowest statement, keyed by (method, route template).
+    """
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(self, method, route, status, seconds, queries):
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = _RouteMetrics()
+            metrics.latency.observe(seconds)
+            metrics.db_time.observe(queries.total_seconds)
+            metrics.db_queries.observe(queries.count)
+            metrics.slowest_query.observe(queries.slowest_seconds)
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            if queries.count and \
+                    queries.slowest_seconds >= metrics.slowest_seconds:
+                metrics.slowest_seconds = queries.slowest_seconds
+                metrics.slowest_statement = \
+                    statement_label(queries.slowest_statement)
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    def snapshot(self):
+        """(method, route) -> _RouteMetrics, safe to read while serving."""
+        with self._lock:
+            return {key: _copy_route(metrics)
+                    for key, metrics in self._routes.items()}
+
+
+def _copy_route(metrics):
+    copy = _RouteMetrics()
+    for name in ("latency", "db_time", "db_queries", "slowest_query"):
+        source, target = getattr(metrics, name), getattr(copy, name)
+        target.counts = list(source.counts)
+        target.count, target.sum = source.count, source.sum
+    copy.statuses = dict(metrics.statuses)
+    copy.slowest_seconds = metrics.slowest_seconds
+    copy.slowest_statement = metrics.slowest_statement
+    return copy
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that times every HTTP request and tracks the queries
+    it runs (database.track_queries). The totals are added to the
+    response as a Server-Timing header, e.g.
+
+        Server-Timing: db;dur=4.2;desc="3 queries", app;dur=9.8
+
+    so they show up in the browser's network panel, and recorded in
+    request_metrics for GET /metrics. Requests slower than
+    SLOW_REQUEST_SECONDS are logged as a warning. For streamed responses the
+    latency runs until the last body chunk is sent; Server-Timing only
+    covers what happened before the first.
+    """
+
+    def __init__(self, app, metrics=request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        with track_queries() as queries:
+            async def send_with_timing(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    timing = (f'db;dur={queries.total_seconds * 1000:.1f};'
+                              f'desc="{queries.count} queries", '
+                              f'app;dur={elapsed_ms:.1f}')
+                    message = {**message, "headers": [
+                        *message.get("headers", []),
+                        (b"server-timing", timing.encode())]}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                route = getattr(scope.get("route"), "path", None) \
+                    or UNMATCHED_ROUTE
+                seconds = time.perf_counter() - started
+                self.metrics.record(scope["method"], route, status, seconds,
+                                    queries)
+                if seconds >= SLOW_REQUEST_SECONDS:
+                    _log_slow_request(scope["method"], route, status,
+                                      seconds, queries)
+
+
+def _log_slow_request(method, route, status, seconds, queries):
+    logger.warning("Slow request", extra={
+        "method": method, "route": route, "status": status,
+        "duration_ms": round(seconds * 1000, 1),
+        "db_queries": queries.count,
+        "db_ms": round(queries.total_seconds * 1000, 1),
+        "slowest_statement": (queries.slowest_statement or "")
+        [:STATEMENT_LOG_LENGTH]})
+
+
+# -----------------------------------------------------------------
+# --- Prometheus text format ---
+# -----------------------------------------------------------------
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"') \
+        .replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_label_value(value)}"'
+                          for name, value in labels.items()) + "}"
+
+
+def _histogram_lines(name, histogram, labels):
+    for bound, total in histogram.cumulative():
+        yield f"{name}_bucket{_labels(**labels, le=bound)} {total}"
+    yield f"{name}_sum{_labels(**labels)} {histogram.sum}"
+    yield f"{name}_count{_labels(**labels)} {histogram.count}"
+
+
+# (metric, help, _RouteMetrics attribute)
+_HISTOGRAMS = [
+    ("pa_http_request_duration_seconds",
+     "Time from request start to the last byte of the response.",
+     "latency"),
+    ("pa_http_request_db_seconds",
+     "Total time spent executing SQL statements per request.", "db_time"),
+    ("pa_http_request_db_queries",
+     "SQL statements executed per request.", "db_queries"),
+    ("pa_http_request_slowest_query_seconds",
+     "The slowest SQL statement of each request.", "slowest_query"),
+]
+
+# Keys of the stats() dicts that only ever grow
+_COUNTER_KEYS = {"hits", "misses", "invalidations", "revocations",
+                 "checkouts", "timeouts", "failed_health_checks",
+                 "completed", "rejected", "reloads"}
+
+
+def _stats_lines(prefix, stats):
+    for key, value in stats.items():
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            continue
+        if key in _COUNTER_KEYS:
+            name = f"{prefix}_{key}_total"
+            yield f"# TYPE {name} counter"
+        else:
+            name = f"{prefix}_{key}"
+            yield f"# TYPE {name} gauge"
+        yield f"{name} {value}"
+
+
+def render(stats_sources=()):
+    """
+    The request metrics plus each (prefix, stats dict) in stats_sources,
+    in the Prometheus text exposition format (version 0.0.4).
+    """
+    routes = sorted(request_metrics.snapshot().items())
+    lines = []
+
+    for name, help_text, attribute in _HISTOGRAMS:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (method, route), metrics in routes:
+            lines += _histogram_lines(name, getattr(metrics, attribute),
+                                      {"method": method, "route": route})
+
+    name = "pa_http_requests_total"
+    lines += [f"# HELP {name} Requests by route and status.",
+              f"# TYPE {name} counter"]
+    for (method, route), metrics in routes:
+        for status, count in sorted(metrics.statuses.items()):
+            labels = _labels(method=method, route=route, status=status)
+            lines.append(f"{name}{labels} {count}")
+
+    name = "pa_db_slowest_statement_seconds"
+    lines += [f"# HELP {name} Slowest SQL statement seen on each route.",
+              f"# TYPE {name} gauge"]
+    for (method, route), metrics in routes:
+        if metrics.slowest_statement is not None:
+            labels = _labels(method=method, route=route,
+                             statement=metrics.slowest_statement)
+            lines.append(f"{name}{labels} {metrics.slowest_seconds}")
+
+    for prefix, stats in stats_sources:
+        lines += _stats_lines(prefix, stats)
+
+    name = "pa_process_start_time_seconds"
+    lines += [f"# TYPE {name} gauge", f"{name} {request_metrics.started_at}"]
+    return "\n".join(lines) + "\n"
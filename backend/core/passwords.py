@@ -0,0 +1,81 @@
+# /backend/core/passwords.py
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from core.config import (pwd_context, PASSWORD_HASH_WORKERS,
+                         PASSWORD_HASH_MAX_PENDING)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash/verify calls are already queued."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, bounded thread pool so a burst of logins
+    never blocks the event loop (bcrypt releases the GIL, so the workers
+    hash in parallel).
+
+    At most max_pending calls may be running or queued at once; beyond
+    that, calls fail fast with PasswordHasherBusy instead of piling up
+    behind each other, and the routers turn that into a 503.
+    """
+
+    def __init__(self, workers=PASSWORD_HASH_WORKERS,
+                 max_pending=PASSWORD_HASH_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt")
+            return self._executor
+
+    async def _run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy(
+                    f"{self._pending} password operations already queued.")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(),
+                                              func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    async def hash(self, password):
+        return await self._run(pwd_context.hash, password)
+
+    async def verify(self, password, password_hash):
+        return await self._run(pwd_context.verify, password, password_hash)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,41 @@
+# /backend/core/responses.py
+
+import orjson
+from decimal import Decimal
+from fastapi.encoders import decimal_encoder
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+
+def orjson_default(value):
+    """orjson fallback for what it cannot encode natively."""
+    if isinstance(value, Decimal):
+        # Same int/float choice as jsonable_encoder
+        return decimal_encoder(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def orjson_dumps(content):
+    """content as JSON bytes, encoded the way ORJSONResponse does."""
+    return orjson.dumps(content, default=orjson_default,
+                        option=orjson.OPT_NON_STR_KEYS
+                        | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson, the app's default response class.
+
+    orjson encodes dates, datetimes, UUIDs and numpy values itself, so
+    dict rows straight from the database can be returned as they are:
+    `return ORJSONResponse(rows)` skips FastAPI's jsonable_encoder and
+    response_model validation, which otherwise walk the whole payload
+    before it is encoded. Hot read endpoints do this with data whose
+    shape they build themselves; keep response_model on the route so the
+    OpenAPI schema still documents it.
+    """
+
+    def render(self, content):
+        return orjson_dumps(content)
@@ -0,0 +1,9 @@
+# /backend/core/streaming.py
+
+from core.responses import orjson_dumps
+
+
+async def ndjson_lines(rows):
+    """Encodes an async iterable of dict rows as NDJSON, one row a line."""
+    async for row in rows:
+        yield orjson_dumps(row) + b"\n"
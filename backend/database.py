@@ -1,6 +1,18 @@
 # /backend/database.py
+import contextvars
 import os
+import time
+import uuid
+import threading
+import weakref
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+import psycopg
 import psycopg2
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+from psycopg2 import extensions
 from psycopg2.extras import register_uuid
 from dotenv import load_dotenv
 
@@ -8,13 +20,544 @@ register_uuid()
 
 load_dotenv()
 
+# --- Pool configuration (override in .env) ---
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+# Seconds a request waits for a free connection before giving up
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+# Idle connections older than this are closed (down to DB_POOL_MIN_SIZE)
+DB_POOL_MAX_IDLE = float(os.getenv('DB_POOL_MAX_IDLE', '300'))
+# Connections idle for longer than this are pinged before being handed out
+DB_POOL_CHECK_AFTER = float(os.getenv('DB_POOL_CHECK_AFTER', '30'))
 
-def get_db_connection():
-    """Establishes a connection to the PostgreSQL database."""
-    conn = psycopg2.connect(
+
+class PoolTimeout(psycopg2.OperationalError):
+    """Raised when no pooled connection becomes free in time."""
+
+
+def _connect():
+    return psycopg2.connect(
         host=os.getenv('DB_HOST'),
         database=os.getenv('DB_DATABASE'),
         user=os.getenv('DB_USER'),
         password=os.getenv('DB_PASSWORD')
     )
-    return conn
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections.
+
+    Idle connections are kept LIFO so the oldest ones drift to the bottom
+    of the stack and get recycled once they pass max_idle. A connection
+    that has been idle for longer than check_after is pinged before it is
+    handed out, so a server restart never reaches the routers.
+    """
+
+    def __init__(self, min_size=DB_POOL_MIN_SIZE, max_size=DB_POOL_MAX_SIZE,
+                 timeout=DB_POOL_TIMEOUT, max_idle=DB_POOL_MAX_IDLE,
+                 check_after=DB_POOL_CHECK_AFTER, connect=_connect):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size: "
+                             f"min={min_size}, max={max_size}")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self._connect = connect
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, returned_at)
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._checkout_time_total = 0.0
+        self._checkout_time_max = 0.0
+        self._timeouts = 0
+        self._failed_checks = 0
+        self._recycled = 0
+
+    # --- Checkout / return ---
+    def getconn(self):
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            conn, returned_at = self._reserve(deadline)
+            if conn is None:
+                # A slot was reserved for a brand new connection
+                try:
+                    conn = self._connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+                break
+            if self._healthy(conn, returned_at):
+                break
+            self._discard(conn)
+            with self._cond:
+                self._failed_checks += 1
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._checkouts += 1
+            self._checkout_time_total += waited
+            self._checkout_time_max = max(self._checkout_time_max, waited)
+        return conn
+
+    def putconn(self, conn):
+        if conn.closed:
+            self._discard(conn)
+            return
+        try:
+            if conn.get_transaction_status() != \
+                    extensions.TRANSACTION_STATUS_IDLE:
+                # The caller left a transaction open (or failed mid-way)
+                conn.rollback()
+        except psycopg2.Error:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._in_use -= 1
+            if self._closed:
+                self._size -= 1
+                conn.close()
+                return
+            self._idle.append((conn, time.monotonic()))
+            self._prune_idle()
+            self._cond.notify()
+
+    def _reserve(self, deadline):
+        """Pop an idle connection, or reserve room for a new one."""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed.")
+                self._prune_idle()
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    self._in_use += 1
+                    return conn, returned_at
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._in_use += 1
+                    return None, None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"No database connection available after "
+                        f"{self.timeout}s (max_size={self.max_size})."
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def _healthy(self, conn, returned_at):
+        if conn.closed:
+            return False
+        if time.monotonic() - returned_at < self.check_after:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1;")
+            cur.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _prune_idle(self):
+        # Called with the lock held; oldest idle connections sit on the left
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size:
+            conn, returned_at = self._idle[0]
+            if now - returned_at < self.max_idle:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self._recycled += 1
+            conn.close()
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._in_use -= 1
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                conn.close()
+            self._cond.notify_all()
+
+    # --- Introspection ---
+    def stats(self):
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "checkouts": checkouts,
+                "checkout_ms_avg": (self._checkout_time_total / checkouts
+                                    * 1000 if checkouts else 0.0),
+                "checkout_ms_max": self._checkout_time_max * 1000,
+                "timeouts": self._timeouts,
+                "failed_health_checks": self._failed_checks,
+                "recycled": self._recycled,
+            }
+
+
+class PooledConnection:
+    """
+    Proxy returned by get_db_connection(). Behaves like a psycopg2
+    connection, except close() hands it back to the pool.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.putconn(conn)
+
+    @property
+    def closed(self):
+        return self._conn is None or self._conn.closed
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("connection already closed")
+        return getattr(self._conn, name)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Returns the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def pool_stats():
+    """Snapshot of pool usage: in-use, waiting, checkout latency, ..."""
+    return get_pool().stats()
+
+
+def get_db_connection():
+    """
+    Synchronous fallback for scripts such as seed.py; request handlers
+    use async_db_connection() instead.
+
+    Checks a connection out of the pool. Calling close() on the
+    returned object returns it to the pool instead of disconnecting.
+    """
+    pool = get_pool()
+    return PooledConnection(pool, pool.getconn())
+
+
+@contextmanager
+def db_connection():
+    """
+    Context-manager form of get_db_connection():
+
+        with db_connection() as conn:
+            ...
+
+    Any transaction left open is rolled back when the block exits.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+
+# -----------------------------------------------------------------
+# --- Async (psycopg 3) layer used by the request handlers ---
+# -----------------------------------------------------------------
+
+_async_pool = None
+# When each pooled connection was last handed back, for the health check
+_returned_at = weakref.WeakKeyDictionary()
+
+# The QueryStats of the enclosing track_queries() block, if any
+_query_stats = contextvars.ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    """What the async pool's cursors ran inside a track_queries() block."""
+
+    def __init__(self, parent=None):
+        # The enclosing block's stats, which see the same statements
+        self.parent = parent
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self._slowest_query = None
+
+    def record(self, query, seconds):
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self._slowest_query = query
+        if self.parent is not None:
+            self.parent.record(query, seconds)
+
+    @property
+    def slowest_statement(self):
+        """The slowest statement's SQL on one line, or None."""
+        query = self._slowest_query
+        if query is None:
+            return None
+        if isinstance(query, bytes):
+            query = query.decode(errors="replace")
+        return " ".join(str(query).split())
+
+
+@contextmanager
+def track_queries():
+    """
+    Records the statements (execute, executemany and COPY calls) that
+    the async pool's cursors run in this context, including the tasks
+    and threads it starts: how many, their total time and the slowest.
+
+        with track_queries() as queries:
+            await client.get("/api/dashboard")
+        print(queries.count, queries.total_seconds)
+
+    Blocks nest: a statement is recorded in the innermost block and in
+    every block around it, so a benchmark counting around a request still
+    sees what runs inside MetricsMiddleware's own block.
+
+    COPY is counted but not timed, since its data is streamed by the
+    caller.
+    """
+    stats = QueryStats(_query_stats.get())
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+async def _timed(query, run):
+    stats = _query_stats.get()
+    if stats is None:
+        return await run
+    started = time.perf_counter()
+    try:
+        return await run
+    finally:
+        stats.record(query, time.perf_counter() - started)
+
+
+class _TrackedCursor(psycopg.AsyncCursor):
+    """Client-side cursor of the async pool; reports to track_queries()."""
+
+    async def execute(self, query, params=None, **kwargs):
+        return await _timed(query, super().execute(query, params, **kwargs))
+
+    async def executemany(self, query, params_seq, **kwargs):
+        return await _timed(query, super().executemany(query, params_seq,
+                                                       **kwargs))
+
+    def copy(self, statement, params=None, **kwargs):
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.record(statement, 0.0)
+        return super().copy(statement, params, **kwargs)
+
+
+class _TrackedServerCursor(psycopg.AsyncServerCursor):
+    """Named cursor of the async pool (stream_batches)."""
+
+    async def execute(self, query, params=None, **kwargs):
+        return await _timed(query, super().execute(query, params, **kwargs))
+
+
+async def _check_async_connection(conn):
+    returned_at = _returned_at.get(conn)
+    if returned_at is not None and \
+            time.monotonic() - returned_at < DB_POOL_CHECK_AFTER:
+        return
+    # The ping is the pool's, not a query of whoever is counting
+    token = _query_stats.set(None)
+    try:
+        await AsyncConnectionPool.check_connection(conn)
+    finally:
+        _query_stats.reset(token)
+
+
+async def _configure_async_connection(conn):
+    conn.cursor_factory = _TrackedCursor
+    conn.server_cursor_factory = _TrackedServerCursor
+
+
+async def _reset_async_connection(conn):
+    _returned_at[conn] = time.monotonic()
+
+
+def _async_conninfo():
+    return make_conninfo(
+        host=os.getenv('DB_HOST'),
+        dbname=os.getenv('DB_DATABASE'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD')
+    )
+
+
+async def connect_async_unpooled():
+    """
+    A dedicated autocommit AsyncConnection outside the pool, for work
+    that holds a connection indefinitely, such as LISTEN. The caller
+    closes it.
+    """
+    return await psycopg.AsyncConnection.connect(
+        _async_conninfo(), autocommit=True, row_factory=dict_row)
+
+
+async def open_async_pool():
+    """Opens the async pool; called once from the app lifespan."""
+    global _async_pool
+    if _async_pool is not None:
+        return _async_pool
+    pool = AsyncConnectionPool(
+        _async_conninfo(),
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        timeout=DB_POOL_TIMEOUT,
+        max_idle=DB_POOL_MAX_IDLE,
+        check=_check_async_connection,
+        reset=_reset_async_connection,
+        configure=_configure_async_connection,
+        kwargs={"row_factory": dict_row},
+        open=False,
+    )
+    await pool.open()
+    _async_pool = pool
+    return pool
+
+
+async def close_async_pool():
+    global _async_pool
+    if _async_pool is not None:
+        pool, _async_pool = _async_pool, None
+        await pool.close()
+
+
+def get_async_pool():
+    if _async_pool is None:
+        raise psycopg.OperationalError("Async connection pool is not open.")
+    return _async_pool
+
+
+def async_pool_stats():
+    """Same shape as pool_stats(), for the async pool."""
+    stats = get_async_pool().get_stats()
+    requests = stats.get("requests_num", 0)
+    return {
+        "size": stats.get("pool_size", 0),
+        "idle": stats.get("pool_available", 0),
+        "in_use": stats.get("pool_size", 0) - stats.get("pool_available", 0),
+        "waiting": stats.get("requests_waiting", 0),
+        "min_size": stats.get("pool_min", DB_POOL_MIN_SIZE),
+        "max_size": stats.get("pool_max", DB_POOL_MAX_SIZE),
+        "checkouts": requests,
+        "checkout_ms_avg": (stats.get("requests_wait_ms", 0) / requests
+                            if requests else 0.0),
+        "timeouts": stats.get("requests_errors", 0),
+        "failed_health_checks": stats.get("connections_lost", 0),
+    }
+
+
+@asynccontextmanager
+async def async_db_connection():
+    """
+    Checks out a psycopg 3 AsyncConnection whose cursors return dict rows:
+
+        async with async_db_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(...)
+
+    The transaction is committed when the block exits normally and
+    rolled back if it raises.
+    """
+    async with get_async_pool().connection() as conn:
+        yield conn
+
+
+async def stream_batches(conn, sql, params=None, batch_size=1000):
+    """
+    Runs sql through a server-side (named) cursor on conn and yields
+    (cursor.description, rows) batches of at most batch_size dict rows,
+    so memory use does not depend on the size of the result. The first
+    batch is yielded even when empty, so callers always see the columns.
+
+    Named cursors only live inside a transaction: conn must not be in
+    autocommit mode.
+    """
+    async with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cur:
+        await cur.execute(sql, params)
+        rows = await cur.fetchmany(batch_size)
+        yield cur.description, rows
+        while len(rows) == batch_size:
+            rows = await cur.fetchmany(batch_size)
+            if rows:
+                yield cur.description, rows
+
+
+async def stream_rows(sql, params=None, batch_size=1000):
+    """
+    Async generator over a query's rows, read batch by batch through
+    stream_batches():
+
+        async for row in stream_rows("SELECT ...", (user_id,)):
+            ...
+
+    The pooled connection stays checked out until the generator is
+    exhausted or closed (e.g. when a streaming client disconnects).
+    """
+    async with async_db_connection() as conn:
+        async for _, rows in stream_batches(conn, sql, params, batch_size):
+            for row in rows:
+                yield row
@@ -0,0 +1,80 @@
+# /backend/downsampling.py
+"""
+Largest-Triangle-Three-Buckets (LTTB) downsampling for chart series.
+
+LTTB keeps the first and last points and, for each of max_points - 2
+equal-width buckets in between, the point that forms the largest
+triangle with the point kept from the previous bucket and the average
+of the next bucket. That preserves the visual shape of a line chart
+far better than taking every n-th point.
+"""
+import numpy as np
+
+
+def lttb_indices(x, y, max_points):
+    """
+    Returns the sorted indices of the points to keep.
+
+    :param x: Strictly increasing x values (e.g. date ordinals)
+    :param y: y values, same length as x
+    :param max_points: Number of points to keep (at least 3)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    # Bucket i covers [edges[i], edges[i + 1]) of the interior points
+    edges = np.floor(
+        np.linspace(1, n - 1, max_points - 1)).astype(np.int64)
+    edges[-1] = n - 1
+
+    # Average point of every bucket, computed at once from cumulative
+    # sums. The bucket after the last one is just the final point.
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    starts, ends = edges[:-1], edges[1:]
+    sizes = np.maximum(ends - starts, 1)
+    avg_x = np.append((cum_x[ends] - cum_x[starts]) / sizes, x[-1])
+    avg_y = np.append((cum_y[ends] - cum_y[starts]) / sizes, y[-1])
+
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, end = starts[i], max(ends[i], starts[i] + 1)
+        # Twice the triangle area for every candidate in the bucket
+        area = np.abs(
+            (x[a] - avg_x[i + 1]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y[i + 1] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_indices(labels, series, max_points):
+    """
+    Indices of the labels to keep, or None if nothing needs dropping.
+
+    Each series (a list aligned with labels, None for gaps) is reduced
+    to max_points with LTTB over its non-null points. The kept indices
+    are merged so all series still share one label axis; with several
+    series the result can therefore hold more than max_points labels.
+    """
+    if max_points is None or len(labels) <= max_points:
+        return None
+    x = np.fromiter((label.toordinal() for label in labels),
+                    dtype=np.float64, count=len(labels))
+    keep = []
+    for values in series:
+        y = np.array(values, dtype=np.float64)  # None becomes nan
+        present = np.flatnonzero(~np.isnan(y))
+        if len(present):
+            keep.append(present[lttb_indices(x[present], y[present],
+                                             max_points)])
+    if not keep:
+        return np.array([0, len(labels) - 1])
+    return np.unique(np.concatenate(keep))
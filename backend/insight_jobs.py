@@ -0,0 +1,326 @@
+# /backend/insight_jobs.py
+"""
+Background insight generation.
+
+POST /api/insights/generate?mode=async and create_checkin enqueue a job;
+a pool of asyncio workers started from the app lifespan runs
+insight_service.generate_insight() for each one. A user has at most one
+queued job at a time, so a burst of check-ins produces one insight.
+
+Two backends, chosen with INSIGHT_QUEUE_BACKEND:
+
+* memory   - an asyncio.Queue in this process. Jobs are lost on restart
+             and only visible to the process that accepted them.
+* postgres - the insight_jobs table. Workers claim jobs with
+             FOR UPDATE SKIP LOCKED, so any number of app processes can
+             share the queue, and a job left 'running' by a crashed
+             process is picked up again after INSIGHT_JOB_STALE_AFTER.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from cachetools import TTLCache
+from database import async_db_connection
+from core.cache import dashboard_cache
+from core.config import (INSIGHT_QUEUE_BACKEND, INSIGHT_WORKERS,
+                         INSIGHT_JOB_TTL, INSIGHT_JOB_POLL_INTERVAL,
+                         INSIGHT_JOB_STALE_AFTER)
+from insight_service import (generate_insight, NoCheckinData,
+                             DEFAULT_INSIGHT_TYPE)
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on finished jobs the memory backend remembers
+MEMORY_JOB_HISTORY = 10000
+
+FINISHED = ('done', 'failed')
+
+
+async def _run_job(user_id, insight_type, on_saved=None):
+    """
+    Generates the insight for one job. on_saved(cur, insight) runs in
+    the same transaction as the insert.
+    """
+    async with async_db_connection() as conn, conn.cursor() as cur:
+        insight = await generate_insight(cur, user_id, insight_type)
+        if on_saved is not None:
+            await on_saved(cur, insight)
+    dashboard_cache.invalidate(user_id)
+    return insight
+
+
+def _error_message(error):
+    if isinstance(error, NoCheckinData):
+        return "No check-in data found to generate insight."
+    return "Insight generation failed."
+
+
+class _MemoryJob:
+    __slots__ = ('job_id', 'user_id', 'insight_type', 'status', 'insight',
+                 'error', 'created_at', 'started_at', 'finished_at', 'done')
+
+    def __init__(self, user_id, insight_type):
+        self.job_id = uuid.uuid4()
+        self.user_id = user_id
+        self.insight_type = insight_type
+        self.status = 'queued'
+        self.insight = None
+        self.error = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at = None
+        self.finished_at = None
+        self.done = asyncio.Event()
+
+    def as_dict(self):
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "insight_type": self.insight_type,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "insight": self.insight,
+        }
+
+
+class MemoryJobQueue:
+    """In-process queue; see the module docstring."""
+
+    def __init__(self, workers=INSIGHT_WORKERS, job_ttl=INSIGHT_JOB_TTL):
+        self.worker_count = workers
+        self._jobs = TTLCache(maxsize=MEMORY_JOB_HISTORY, ttl=job_ttl)
+        self._queued_by_user = {}
+        self._queue = None
+        self._workers = []
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._work())
+                         for _ in range(self.worker_count)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def enqueue(self, user_id, insight_type=DEFAULT_INSIGHT_TYPE):
+        job = self._jobs.get(self._queued_by_user.get(user_id))
+        if job is not None and job.status == 'queued':
+            return job.as_dict()
+        job = _MemoryJob(user_id, insight_type)
+        self._jobs[job.job_id] = job
+        self._queued_by_user[user_id] = job.job_id
+        self._queue.put_nowait(job)
+        return job.as_dict()
+
+    async def get(self, job_id, user_id):
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job.as_dict()
+
+    async def wait(self, job_id, user_id, timeout):
+        """Like get(), but waits up to timeout seconds for the result."""
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job.as_dict()
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            if self._queued_by_user.get(job.user_id) == job.job_id:
+                del self._queued_by_user[job.user_id]
+            job.status = 'running'
+            job.started_at = datetime.now(timezone.utc)
+            try:
+                job.insight = await _run_job(job.user_id, job.insight_type)
+                job.status = 'done'
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Insight job failed",
+                                 extra={"job_id": str(job.job_id)})
+                job.status = 'failed'
+                job.error = _error_message(e)
+            finally:
+                job.finished_at = datetime.now(timezone.utc)
+                job.done.set()
+                self._queue.task_done()
+
+
+class PostgresJobQueue:
+    """insight_jobs-backed queue; see the module docstring."""
+
+    ENQUEUE_SQL = """
+        WITH new_job AS (
+            INSERT INTO insight_jobs (user_id, insight_type)
+            VALUES (%(user_id)s, %(insight_type)s)
+            ON CONFLICT (user_id) WHERE status = 'queued' DO NOTHING
+            RETURNING job_id
+        )
+        SELECT job_id FROM new_job
+        UNION ALL
+        SELECT job_id FROM insight_jobs
+        WHERE user_id = %(user_id)s AND status = 'queued'
+        LIMIT 1;
+    """
+
+    CLAIM_SQL = """
+        UPDATE insight_jobs
+        SET status = 'running', started_at = NOW()
+        WHERE job_id = (
+            SELECT job_id FROM insight_jobs
+            WHERE status = 'queued'
+               OR (status = 'running'
+                   AND started_at < NOW() - make_interval(secs => %s))
+            ORDER BY created_at
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING job_id, user_id, insight_type;
+    """
+
+    GET_SQL = """
+        SELECT j.job_id, j.status, j.insight_type, j.created_at,
+               j.started_at, j.finished_at, j.error,
+               CASE WHEN i.insight_id IS NOT NULL THEN json_build_object(
+                   'insight_id', i.insight_id,
+                   'user_id', i.user_id,
+                   'insight_type', i.insight_type,
+                   'content', i.content,
+                   'generated_at', i.generated_at,
+                   'is_read', i.is_read
+               ) END AS insight
+        FROM insight_jobs j
+        LEFT JOIN insight i ON i.insight_id = j.insight_id
+        WHERE j.job_id = %s AND j.user_id = %s;
+    """
+
+    def __init__(self, workers=INSIGHT_WORKERS,
+                 poll_interval=INSIGHT_JOB_POLL_INTERVAL,
+                 stale_after=INSIGHT_JOB_STALE_AFTER):
+        self.worker_count = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._wakeup = None
+        self._workers = []
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._work())
+                         for _ in range(self.worker_count)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def enqueue(self, user_id, insight_type=DEFAULT_INSIGHT_TYPE):
+        params = {"user_id": user_id, "insight_type": insight_type}
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(self.ENQUEUE_SQL, params)
+            row = await cur.fetchone()
+            if row is None:
+                # The queued job we conflicted with was claimed meanwhile
+                await cur.execute(self.ENQUEUE_SQL, params)
+                row = await cur.fetchone()
+        # Workers in this process start at once; others on their next poll
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return await self.get(row["job_id"], user_id)
+
+    async def get(self, job_id, user_id):
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(self.GET_SQL, (job_id, user_id))
+            return await cur.fetchone()
+
+    async def wait(self, job_id, user_id, timeout):
+        """Like get(), but polls up to timeout seconds for the result."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await self.get(job_id, user_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in FINISHED or remaining <= 0:
+                return job
+            await asyncio.sleep(min(self.poll_interval, remaining))
+
+    async def _claim(self):
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(self.CLAIM_SQL, (self.stale_after,))
+            return await cur.fetchone()
+
+    async def _work(self):
+        while True:
+            try:
+                job = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Could not claim insight job")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(),
+                                           self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Could not record insight job result")
+
+    async def _process(self, job):
+        async def mark_done(cur, insight):
+            await cur.execute(
+                "UPDATE insight_jobs SET status = 'done', \
+                insight_id = %s, finished_at = NOW() WHERE job_id = %s",
+                (insight["insight_id"] if insight else None, job["job_id"]))
+
+        try:
+            await _run_job(job["user_id"], job["insight_type"], mark_done)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Insight job failed",
+                             extra={"job_id": str(job["job_id"])})
+            async with async_db_connection() as conn, conn.cursor() as cur:
+                await cur.execute(
+                    "UPDATE insight_jobs SET status = 'failed', \
+                    error = %s, finished_at = NOW() WHERE job_id = %s",
+                    (_error_message(e), job["job_id"]))
+
+
+async def enqueue_quietly(user_id, insight_type=DEFAULT_INSIGHT_TYPE):
+    """enqueue() for background tasks: failures are logged, not raised."""
+    try:
+        await insight_jobs.enqueue(user_id, insight_type)
+    except Exception:
+        logger.exception("Could not queue insight",
+                         extra={"user_id": str(user_id)})
+
+
+def create_job_queue(backend=INSIGHT_QUEUE_BACKEND):
+    if backend == 'memory':
+        return MemoryJobQueue()
+    if backend == 'postgres':
+        return PostgresJobQueue()
+    raise ValueError(f"Unknown INSIGHT_QUEUE_BACKEND: {backend!r}")
+
+
+insight_jobs = create_job_queue()
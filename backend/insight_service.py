@@ -0,0 +1,116 @@
+# /backend/insight_service.py
+"""
+Generates and stores one insight for a user. Shared by
+POST /api/insights/generate and the background job workers
+(insight_jobs.py).
+"""
+import logging
+import uuid
+from starlette.concurrency import run_in_threadpool
+from core.catalog import principles_catalog
+from insights_engine import (generate_insights, build_history_frame,
+                             HISTORY_WINDOW_DAYS)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INSIGHT_TYPE = 'Daily Tidbit'
+
+
+class NoCheckinData(LookupError):
+    """The user has no check-ins to generate an insight from."""
+
+
+def _run_engine(user_personality, user_principles, latest_checkin,
+                history_rows, user_id):
+    """Builds the history frame and runs the rules; both are pandas
+    work, so this runs on a worker thread."""
+    history = build_history_frame(history_rows)
+    return generate_insights(user_personality, user_principles,
+                             latest_checkin, history, user_id)
+
+
+async def generate_insight(cur, user_id, insight_type=DEFAULT_INSIGHT_TYPE):
+    """
+    Loads the user's inputs, runs the engine and inserts the result.
+
+    :param cur:
+        Cursor on an async_db_connection(); the insert commits with it
+    :return:
+        The saved insight row, or None if the engine produced nothing
+    """
+    # --- 1. Fetch latest check-in data ---
+    await cur.execute(
+        "SELECT checkin_id, checkin_date, gratitude_entry, \
+        principle_alignment, principle_alignment_note \
+        FROM daily_checkins WHERE user_id = %s \
+        ORDER BY checkin_date DESC LIMIT 1",
+        (user_id,)
+    )
+    latest_checkin = await cur.fetchone()
+    if not latest_checkin:
+        raise NoCheckinData(user_id)
+
+    # --- 2. Fetch metrics for that check-in ---
+    await cur.execute(
+        "SELECT metric_type, metric_name, value \
+        FROM daily_metrics WHERE checkin_id = %s",
+        (latest_checkin['checkin_id'],)
+    )
+    latest_checkin['metrics'] = await cur.fetchall()
+
+    # --- 3. Fetch personality traits ---
+    await cur.execute(
+        "SELECT trait_name, value FROM personality_traits \
+        WHERE user_id = %s",
+        (user_id,)
+    )
+    user_personality = await cur.fetchall()
+
+    # --- 4. Fetch user principles, named from the in-memory catalog ---
+    await cur.execute(
+        "SELECT principle_id FROM user_principles WHERE user_id = %s",
+        (user_id,)
+    )
+    user_principles = await principles_catalog.names(
+        (row['principle_id'] for row in await cur.fetchall()), cur)
+
+    # --- 5. Fetch recent history, one row per check-in ---
+    await cur.execute(
+        """
+        SELECT dc.checkin_date, dc.principle_alignment,
+               (dc.gratitude_entry IS NOT NULL
+                AND dc.gratitude_entry <> '') AS has_gratitude,
+               COALESCE(json_object_agg(
+                   dm.metric_type || ':' || dm.metric_name, dm.value
+               ) FILTER (WHERE dm.metric_id IS NOT NULL), '{}')
+                   AS metrics
+        FROM daily_checkins dc
+        LEFT JOIN daily_metrics dm ON dm.checkin_id = dc.checkin_id
+        WHERE dc.user_id = %s
+          AND dc.checkin_date > %s::date - %s::int
+        GROUP BY dc.checkin_id
+        ORDER BY dc.checkin_date;
+        """,
+        (user_id, latest_checkin['checkin_date'], HISTORY_WINDOW_DAYS)
+    )
+    history_rows = await cur.fetchall()
+
+    # --- 6. Run the engine (pandas work stays off the loop) ---
+    insight_content = await run_in_threadpool(
+        _run_engine, user_personality, user_principles, latest_checkin,
+        history_rows, user_id)
+    if not insight_content:
+        return None
+
+    # --- 7. Save the new insight to the DB ---
+    logger.debug("Saving new insight",
+                 extra={"user_id": str(user_id), "insight_type": insight_type})
+    insert_sql = """
+        INSERT INTO insight
+        (insight_id, user_id, insight_type, content)
+        VALUES (%s, %s, %s, %s)
+        RETURNING *;
+    """
+    await cur.execute(insert_sql, (uuid.uuid4(), user_id, insight_type,
+                                   insight_content))
+    return await cur.fetchone()
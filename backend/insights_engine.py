@@ -1,65 +1,518 @@
 # /backend/insights_engine.py
 import random
+import threading
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+from core.config import INSIGHT_RULE_CACHE_SIZE
 
+# Days of check-in history the insights router loads for each user
+HISTORY_WINDOW_DAYS = 365
 
-def generate_insights(user_personality, user_principles, latest_checkin):
+# Column names in the history frame that are not daily_metrics
+ALIGNMENT = 'principle_alignment'
+GRATITUDE = 'has_gratitude'
+
+# Rule thresholds
+MIN_DAYS_FOR_TREND = 4
+WEEK_OVER_WEEK_ALIGNMENT_DELTA = 1.5
+CHECKIN_STREAK_MILESTONE = 7
+RATING_DIP_BELOW_30_DAY_MEAN = 1.5
+MIN_DAYS_FOR_CORRELATION = 10
+STRONG_CORRELATION = 0.5
+
+
+def build_history_frame(rows):
     """
-    Runs a simple rules-based engine to generate insights.
+    Turns the user's check-in history into one row per calendar day.
 
-    :param user_personality:
-        List of user's personality traits (from personality_traits table)
-    :param user_principles:
-        List of user's principles (from user_principles table)
-    :param latest_checkin:
-        The latest check-in data (from daily_checkins & metrics)
+    :param rows:
+        Dicts with checkin_date, principle_alignment, has_gratitude and
+        metrics, a {"<metric_type>:<metric_name>": value} mapping.
     :return:
-        A string containing a generated insight, or None.
+        A DataFrame indexed by every day from the first to the last
+        check-in (days without a check-in are NaN) with a column for
+        principle_alignment, has_gratitude and each metric.
+    """
+    if not rows:
+        return pd.DataFrame(columns=[ALIGNMENT, GRATITUDE])
+
+    base = pd.DataFrame.from_records(
+        rows, columns=['checkin_date', ALIGNMENT, GRATITUDE])
+    metrics = pd.DataFrame.from_records(
+        [row.get('metrics') or {} for row in rows])
+    frame = pd.concat([base, metrics], axis=1)
+    frame.index = pd.DatetimeIndex(frame.pop('checkin_date'))
+    frame = frame.astype('float64').sort_index()
+
+    calendar = pd.date_range(frame.index[0], frame.index[-1], freq='D')
+    return frame[~frame.index.duplicated(keep='last')].reindex(calendar)
+
+
+def _masked_correlation(columns, target):
+    """
+    Pearson r of each column against target, using only the days where
+    both are present. Columns with fewer than MIN_DAYS_FOR_CORRELATION
+    such days (or no variance) get NaN.
+    """
+    mask = ~np.isnan(columns) & ~np.isnan(target)[:, None]
+    n = mask.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = np.where(mask, columns, 0.0)
+        y = np.where(mask, target[:, None], 0.0)
+        dx = np.where(mask, x - x.sum(axis=0) / n, 0.0)
+        dy = np.where(mask, y - y.sum(axis=0) / n, 0.0)
+        r = (dx * dy).sum(axis=0) / np.sqrt(
+            (dx ** 2).sum(axis=0) * (dy ** 2).sum(axis=0))
+    return np.where(n >= MIN_DAYS_FOR_CORRELATION, r, np.nan)
+
+
+def compute_history_features(history):
+    """
+    Evaluates every rolling-window statistic the rules need in a few
+    column-wise operations over the whole frame.
+    """
+    if history.empty:
+        return None
+
+    last_7 = history.iloc[-7:]
+    prior_7 = history.iloc[-14:-7]
+    last_30 = history.iloc[-30:]
+
+    mean_7 = last_7.mean()
+    mean_30 = last_30.mean()
+    week_over_week = mean_7 - prior_7.mean()
+    count_7 = last_7.count()
+    count_prior_7 = prior_7.count()
+
+    # Trailing run of consecutive days with a check-in (has_gratitude is
+    # set on every check-in row, so it is only NaN on missing days)
+    checked_in = history[GRATITUDE].notna().to_numpy()
+    missed = np.flatnonzero(~checked_in[::-1])
+    checkin_streak = int(missed[0]) if len(missed) else len(checked_in)
+
+    # Same for gratitude entries
+    grateful = history[GRATITUDE].fillna(0).to_numpy() > 0
+    missed = np.flatnonzero(~grateful[::-1])
+    gratitude_streak = int(missed[0]) if len(missed) else len(grateful)
+
+    # Pearson r of every metric against alignment over the last 30 days
+    metric_columns = last_30.columns.drop([ALIGNMENT, GRATITUDE])
+    correlations = pd.Series(
+        _masked_correlation(last_30[metric_columns].to_numpy(),
+                            last_30[ALIGNMENT].to_numpy()),
+        index=metric_columns).dropna()
+
+    # Best 30-day alignment stretch across the whole history
+    rolling_30 = history[ALIGNMENT].rolling(30, min_periods=15).mean()
+
+    return {
+        'mean_7': mean_7,
+        'mean_30': mean_30,
+        'week_over_week': week_over_week.where(
+            (count_7 >= MIN_DAYS_FOR_TREND)
+            & (count_prior_7 >= MIN_DAYS_FOR_TREND)),
+        'checkin_streak': checkin_streak,
+        'gratitude_streak': gratitude_streak,
+        'alignment_correlations': correlations,
+        'alignment_30_current': rolling_30.iloc[-1],
+        'alignment_30_best_before': rolling_30.iloc[:-30].max(),
+    }
+
+
+# -----------------------------------------------------------------
+# --- Rule registry ---
+# -----------------------------------------------------------------
+#
+# A rule is a function that takes a RuleInputs and returns an insight
+# string or None. It is registered with @rule(...), declaring every
+# input it reads:
+#
+#     @rule(traits=['Introverted'], metrics=[('Time Allocation', 'Social')])
+#     def introvert_low_social(inputs): ...
+#
+# The declarations are compiled once, at import, into an EvaluationPlan
+# that maps each input to the rules reading it. A call then evaluates
+# only the rules whose inputs differ from the user's previous call.
+
+_REGISTRY = []
+
+
+class Rule:
+    """A registered rule and the input keys it declared."""
+
+    __slots__ = ('name', 'func', 'inputs')
+
+    def __init__(self, name, func, inputs):
+        self.name = name
+        self.func = func
+        self.inputs = inputs
+
+
+def rule(*, checkin=(), metrics=(), traits=(), principles=False,
+         history=None):
+    """
+    Registers an insight rule.
+
+    :param checkin:
+        daily_checkins columns the rule reads from the latest check-in
+    :param metrics:
+        (metric_type, metric_name) pairs read from the latest check-in
+    :param traits:
+        personality trait names
+    :param principles:
+        True if the rule reads the user's principle names
+    :param history:
+        Days of history the rule looks back over (0 for all of it)
+    """
+    def register(func):
+        inputs = [('checkin', field) for field in checkin]
+        inputs += [('metric', metric_type, metric_name)
+                   for metric_type, metric_name in metrics]
+        inputs += [('trait', trait_name) for trait_name in traits]
+        if principles:
+            inputs.append(('principles',))
+        if history is not None:
+            inputs.append(('history', history))
+        if not inputs:
+            raise ValueError(f"Rule {func.__name__} declares no inputs.")
+        _REGISTRY.append(Rule(func.__name__, func, frozenset(inputs)))
+        return func
+    return register
+
+
+class EvaluationPlan:
+    """
+    Rules in evaluation order plus an inverted index from each input key
+    to the positions of the rules that read it.
+    """
+
+    def __init__(self, rules):
+        names = [r.name for r in rules]
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate rule names: {sorted(duplicates)}")
+
+        self.rules = tuple(rules)
+        rules_by_input = defaultdict(list)
+        for position, r in enumerate(self.rules):
+            for key in r.inputs:
+                rules_by_input[key].append(position)
+        self.rules_by_input = {key: tuple(positions)
+                               for key, positions in rules_by_input.items()}
+
+        self.checkin_fields = tuple(sorted(
+            {key[1] for key in self.rules_by_input if key[0] == 'checkin'}))
+        self.history_windows = tuple(sorted(
+            {key[1] for key in self.rules_by_input if key[0] == 'history'}))
+        self.uses_principles = ('principles',) in self.rules_by_input
+
+    def affected(self, changed_keys):
+        """Positions, in plan order, of the rules reading changed_keys."""
+        positions = set()
+        for key in changed_keys:
+            positions.update(self.rules_by_input.get(key, ()))
+        return sorted(positions)
+
+
+class RuleInputs:
+    """
+    What a rule sees: the latest check-in plus O(1) lookups for metrics
+    and traits. History features are computed on first access, so a call
+    that re-runs no history rule never touches pandas.
+    """
+
+    def __init__(self, facts, checkin, principles, history):
+        self._facts = facts
+        self.checkin = checkin
+        self.principles = principles
+        self._history = history
+        self._features = None
+
+    def metric(self, metric_type, metric_name, default=None):
+        return self._facts.get(('metric', metric_type, metric_name), default)
+
+    def trait(self, trait_name, default=None):
+        return self._facts.get(('trait', trait_name), default)
+
+    @property
+    def features(self):
+        """compute_history_features() of the history frame, or None."""
+        if self._features is None and self._history is not None:
+            self._features = compute_history_features(self._history)
+        return self._features
+
+
+def _collect_facts(plan, user_personality, user_principles, latest_checkin,
+                   history):
+    """
+    Flattens one call's inputs into {input key: value}, the same keys the
+    rules declare. History windows are represented by a fingerprint of
+    their rows so they can be compared between calls without recomputing
+    any features.
+    """
+    facts = {}
+    for field in plan.checkin_fields:
+        value = latest_checkin.get(field)
+        if value is not None:
+            facts[('checkin', field)] = value
+    for metric in latest_checkin.get('metrics') or []:
+        facts[('metric', metric['metric_type'], metric['metric_name'])] = \
+            metric['value']
+    for trait in user_personality:
+        facts[('trait', trait['trait_name'])] = trait['value']
+    if plan.uses_principles:
+        facts[('principles',)] = frozenset(user_principles)
+
+    if history is not None and not history.empty and plan.history_windows:
+        row_hashes = pd.util.hash_pandas_object(history).to_numpy()
+        for window in plan.history_windows:
+            rows = row_hashes[-window:] if window else row_hashes
+            facts[('history', window)] = (len(rows), int(rows.sum()))
+    return facts
+
+
+def evaluate_rules(plan, user_personality, user_principles, latest_checkin,
+                   history=None, previous=None):
     """
+    Runs the plan's rules.
+
+    :param previous:
+        The (facts, results) this returned for the same user last time.
+        Only rules reading an input that changed since then are run; the
+        others keep their previous result.
+    :return:
+        (facts, results), results holding one insight or None per rule
+    """
+    facts = _collect_facts(plan, user_personality, user_principles,
+                           latest_checkin, history)
+    if previous is None:
+        positions = range(len(plan.rules))
+        results = [None] * len(plan.rules)
+    else:
+        previous_facts, previous_results = previous
+        changed = [key for key in facts.keys() | previous_facts.keys()
+                   if facts.get(key) != previous_facts.get(key)]
+        positions = plan.affected(changed)
+        results = list(previous_results)
+
+    inputs = RuleInputs(facts, latest_checkin, user_principles, history)
+    for position in positions:
+        results[position] = plan.rules[position].func(inputs)
+    return facts, results
 
-    insights = []
 
-    # --- Rule 1:
-    # Check Principle Alignment ---
-    alignment_score = latest_checkin.get('principle_alignment')
+# -----------------------------------------------------------------
+# --- Rules (evaluated, and offered to the user, in this order) ---
+# -----------------------------------------------------------------
+
+# --- Rule 1:
+# Check Principle Alignment ---
+@rule(checkin=['principle_alignment', 'principle_alignment_note'])
+def low_principle_alignment(inputs):
+    alignment_score = inputs.checkin.get('principle_alignment')
     if alignment_score is not None and alignment_score < 5:
-        insights.append(
+        return (
             f"Your principle alignment score was {alignment_score}/10. "
             f"Remember your note:\n\n"
-            f"{latest_checkin.get('principle_alignment_note')}. "
+            f"{inputs.checkin.get('principle_alignment_note')}. "
             "What's one small action you can take today to align better?"
         )
+    return None
+
 
-    # --- Rule 2:
-    # Check for a specific personality trait (e.g., Introverted) ---
-    is_introverted = any(p['trait_name'] == 'Introverted' and p['value'] >= 60
-                         for p in user_personality)
-
-    # --- Rule 3:
-    # Check for a specific metric (e.g., Social Time) ---
-    social_time = 0
-    for metric in latest_checkin.get('metrics', []):
-        if metric.get('metric_name') == 'Social' \
-                      and metric.get('metric_type') == 'Time Allocation':
-            social_time = metric.get('value', 0)
-            break
-
-    # --- Rule 4:
-    # Combine Personality and Metrics ---
+# --- Rules 2-4:
+# Combine a personality trait (Introverted) with a metric (Social Time) ---
+@rule(traits=['Introverted'], metrics=[('Time Allocation', 'Social')])
+def introvert_low_social(inputs):
+    is_introverted = inputs.trait('Introverted', 0) >= 60
+    social_time = inputs.metric('Time Allocation', 'Social', 0)
     if is_introverted and social_time < 5:
-        insights.append(
+        return (
             "As an introvert, solo time is key, \
             but you've logged very little social time. \
             Remember that even small, \
             positive interactions can boost your energy."
         )
+    return None
 
-    # --- Rule 5:
-    # Check Gratitude ---
-    if not latest_checkin.get('gratitude_entry'):
-        insights.append(
+
+# --- Rule 5:
+# Check Gratitude ---
+@rule(checkin=['gratitude_entry'])
+def missing_gratitude(inputs):
+    if not inputs.checkin.get('gratitude_entry'):
+        return (
             "You didn't log a gratitude entry yesterday. "
             "Try to spot one small thing you're thankful for right now."
         )
+    return None
+
+
+# --- Rule 6:
+# Week-over-week change in principle alignment ---
+@rule(history=14)
+def alignment_week_over_week(inputs):
+    features = inputs.features
+    if features is None:
+        return None
+    delta = features['week_over_week'].get(ALIGNMENT)
+    if delta is None or np.isnan(delta):
+        return None
+    mean_7 = features['mean_7'][ALIGNMENT]
+    if delta <= -WEEK_OVER_WEEK_ALIGNMENT_DELTA:
+        return (
+            f"Your principle alignment averaged {mean_7:.1f}/10 this "
+            f"week, {abs(delta):.1f} points lower than last week. "
+            "What changed, and what can you bring back?"
+        )
+    if delta >= WEEK_OVER_WEEK_ALIGNMENT_DELTA:
+        return (
+            f"Your principle alignment is up {delta:.1f} points on "
+            f"last week (now {mean_7:.1f}/10). Keep doing what "
+            "you're doing."
+        )
+    return None
+
+
+# --- Rule 7:
+# Check-in and gratitude streaks ---
+@rule(history=0)
+def checkin_streak(inputs):
+    features = inputs.features
+    if features is None:
+        return None
+    streak = features['checkin_streak']
+    if streak >= CHECKIN_STREAK_MILESTONE:
+        return (
+            f"You've checked in {streak} days in a row. "
+            "Consistency is how habits stick."
+        )
+    return None
+
+
+@rule(history=0)
+def gratitude_streak(inputs):
+    features = inputs.features
+    if features is None:
+        return None
+    streak = features['gratitude_streak']
+    if streak >= CHECKIN_STREAK_MILESTONE:
+        return (
+            f"{streak} days straight of gratitude entries. "
+            "That practice compounds."
+        )
+    return None
+
+
+# --- Rule 8:
+# Metric most correlated with principle alignment (last 30 days) ---
+@rule(history=30)
+def alignment_correlation(inputs):
+    features = inputs.features
+    if features is None:
+        return None
+    correlations = features['alignment_correlations']
+    if correlations.empty:
+        return None
+    metric = correlations.abs().idxmax()
+    r = correlations[metric]
+    if abs(r) < STRONG_CORRELATION:
+        return None
+    metric_name = metric.split(':', 1)[-1]
+    direction = "more" if r > 0 else "less"
+    return (
+        f"Over the last month, days with {direction} "
+        f"{metric_name} were the days you lived closest to your "
+        f"principles (r = {r:.2f})."
+    )
+
+
+# --- Rule 9:
+# Best 30-day alignment stretch in the loaded history ---
+@rule(history=0)
+def best_alignment_stretch(inputs):
+    features = inputs.features
+    if features is None:
+        return None
+    current = features['alignment_30_current']
+    best_before = features['alignment_30_best_before']
+    if not np.isnan(current) and not np.isnan(best_before) \
+            and current > best_before:
+        return (
+            f"Your 30-day principle alignment average ({current:.1f}/10) "
+            "is the best it has been in your history. Notice what's "
+            "working."
+        )
+    return None
+
+
+# --- Rule 10:
+# Daily ratings this week well below their 30-day average ---
+@rule(history=30)
+def rating_dip(inputs):
+    features = inputs.features
+    if features is None:
+        return None
+    ratings = [c for c in features['mean_7'].index
+               if c.startswith('Daily Rating:')]
+    dips = (features['mean_30'][ratings] - features['mean_7'][ratings]) \
+        .where(features['week_over_week'][ratings].notna()).dropna()
+    dips = dips[dips >= RATING_DIP_BELOW_30_DAY_MEAN]
+    if dips.empty:
+        return None
+    metric = dips.idxmax()
+    return (
+        f"Your {metric.split(':', 1)[-1]} rating averaged "
+        f"{features['mean_7'][metric]:.1f} this week against "
+        f"{features['mean_30'][metric]:.1f} over the last month. "
+        "Is something draining it?"
+    )
+
+
+# Compiled once, when the app imports this module
+PLAN = EvaluationPlan(_REGISTRY)
+
+# Each user's (facts, results) from their previous call
+_previous_runs = LRUCache(maxsize=INSIGHT_RULE_CACHE_SIZE)
+_previous_runs_lock = threading.Lock()
+
+
+def generate_insights(user_personality, user_principles, latest_checkin,
+                      history=None, cache_key=None):
+    """
+    Runs a simple rules-based engine to generate insights.
+
+    :param user_personality:
+        List of user's personality traits (from personality_traits table)
+    :param user_principles:
+        List of user's principles (from user_principles table)
+    :param latest_checkin:
+        The latest check-in data (from daily_checkins & metrics)
+    :param history:
+        Optional frame from build_history_frame() with the user's recent
+        check-ins; enables the trend, streak and correlation rules
+    :param cache_key:
+        Optional key (the user id) under which this call's inputs and rule
+        results are kept, so the user's next call only re-runs the rules
+        whose inputs changed
+    :return:
+        A string containing a generated insight, or None.
+    """
+    previous = None
+    if cache_key is not None:
+        with _previous_runs_lock:
+            previous = _previous_runs.get(cache_key)
+
+    facts, results = evaluate_rules(PLAN, user_personality, user_principles,
+                                    latest_checkin, history, previous)
+
+    if cache_key is not None:
+        with _previous_runs_lock:
+            _previous_runs[cache_key] = (facts, results)
+
+    insights = [result for result in results if result]
 
     # --- If no specific rules hit, give a generic insight ---
     if not insights:
@@ -1,5 +1,6 @@
 # /backend/main.py
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import settings, \
@@ -10,11 +11,40 @@ from routers import settings, \
     principles, \
     charts, \
     insights, \
-    reflections
+    reflections, \
+    search, \
+    export, \
+    metrics
 import auth
+from database import close_pool, open_async_pool, close_async_pool
+from insight_jobs import insight_jobs
+from core.passwords import password_hasher
+from core.catalog import principles_catalog
+from core.config import METRICS_TOKEN
+from core.metrics import MetricsMiddleware
+from core.responses import ORJSONResponse
+from core.logging import setup_logging, stop_logging, RequestIdMiddleware
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    await open_async_pool()
+    await principles_catalog.start()
+    await insight_jobs.start()
+    yield
+    await insight_jobs.stop()
+    await principles_catalog.stop()
+    # Release pooled DB connections on shutdown
+    await close_async_pool()
+    close_pool()
+    password_hasher.shutdown()
+    # Flush queued log records
+    stop_logging()
+
+
+# orjson for every JSON response; see core/responses.py
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 
 # --- CORS Middleware ---
@@ -25,8 +55,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursor for GET /api/reflections and /api/search, and
+    # the id that tags this request's log records
+    expose_headers=["X-Next-Cursor", "X-Request-ID"],
 )
 
+# Per-route latency and query stats, served on GET /metrics. Added after
+# CORS so it times everything, CORS included.
+app.add_middleware(MetricsMiddleware)
+
+# Outside that, so the slow request warnings it logs carry the request id
+app.add_middleware(RequestIdMiddleware)
+
 
 app.include_router(auth.router)
 app.include_router(settings.router)
@@ -38,3 +78,8 @@ app.include_router(principles.router)
 app.include_router(insights.router)
 app.include_router(reflections.router)
 app.include_router(charts.router)
+app.include_router(search.router)
+app.include_router(export.router)
+# GET /metrics is never served without a token to protect it
+if METRICS_TOKEN:
+    app.include_router(metrics.router)
@@ -0,0 +1,108 @@
+# /backend/rollups.py
+"""
+Weekly and monthly rollups (count, sum, min, max, mean) of every
+daily metric and of principle_alignment, stored in metric_rollups.
+
+New check-ins are folded in incrementally by the same transaction that
+writes them (create_checkin, the bulk import). Run this module to
+rebuild the table from the raw rows, e.g. after loading data by hand
+(seed.py rebuilds the users it creates):
+
+    python rollups.py                  # every user
+    python rollups.py --user-id <id>   # just one user
+"""
+import argparse
+import time
+import uuid
+from database import get_db_connection
+
+GRANULARITIES = ("week", "month")
+PRINCIPLE_ALIGNMENT = "principle_alignment"
+
+# Users rebuilt per transaction by the backfill
+REBUILD_BATCH_SIZE = 500
+
+_ROLLUP_SQL = """
+    INSERT INTO metric_rollups
+    (user_id, granularity, period_start, metric,
+        value_count, value_sum, value_min, value_max)
+    SELECT dc.user_id, g.granularity,
+           date_trunc(g.granularity, dc.checkin_date)::date, v.metric,
+           COUNT(*), SUM(v.value), MIN(v.value), MAX(v.value)
+    FROM daily_checkins dc
+    CROSS JOIN (VALUES ('week'), ('month')) AS g(granularity)
+    CROSS JOIN LATERAL (
+        SELECT 'principle_alignment' AS metric,
+               dc.principle_alignment AS value
+        WHERE dc.principle_alignment IS NOT NULL
+        UNION ALL
+        SELECT dm.metric_type || ':' || dm.metric_name, dm.value
+        FROM daily_metrics dm
+        WHERE dm.checkin_id = dc.checkin_id
+    ) v
+    WHERE {checkin_filter}
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (user_id, granularity, metric, period_start) DO UPDATE SET
+        value_count = metric_rollups.value_count + EXCLUDED.value_count,
+        value_sum = metric_rollups.value_sum + EXCLUDED.value_sum,
+        value_min = LEAST(metric_rollups.value_min, EXCLUDED.value_min),
+        value_max = GREATEST(metric_rollups.value_max, EXCLUDED.value_max);
+"""
+
+# Folds freshly inserted check-ins (and their metrics) into the rollups.
+# Must run in the transaction that inserted them, after the metrics.
+APPLY_CHECKINS_SQL = _ROLLUP_SQL.format(
+    checkin_filter="dc.checkin_id = ANY(%(checkin_ids)s)")
+
+# Same, for the rows staged by POST /api/checkins/import
+APPLY_IMPORT_SQL = _ROLLUP_SQL.format(
+    checkin_filter="dc.checkin_id IN (SELECT checkin_id "
+                   "FROM import_checkins)")
+
+_REBUILD_SQL = """
+    DELETE FROM metric_rollups WHERE user_id = ANY(%(user_ids)s);
+""" + _ROLLUP_SQL.format(checkin_filter="dc.user_id = ANY(%(user_ids)s)")
+
+# Columns read for each chart aggregate
+AGGREGATE_COLUMNS = {"avg": "value_mean", "sum": "value_sum",
+                     "min": "value_min", "max": "value_max",
+                     "count": "value_count"}
+
+
+def rebuild_user_rollups(cur, user_ids):
+    """Recomputes these users' rollups inside the caller's transaction."""
+    cur.execute(_REBUILD_SQL, {"user_ids": list(user_ids)})
+
+
+def rebuild_rollups(user_ids=None):
+    """Recomputes metric_rollups from the raw rows."""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        if user_ids is None:
+            cur.execute("SELECT user_id FROM users ORDER BY user_id;")
+            user_ids = [row[0] for row in cur.fetchall()]
+
+        started = time.monotonic()
+        for i in range(0, len(user_ids), REBUILD_BATCH_SIZE):
+            batch = user_ids[i:i + REBUILD_BATCH_SIZE]
+            rebuild_user_rollups(cur, batch)
+            conn.commit()
+            print(f"--- Rebuilt rollups for {i + len(batch)}/"
+                  f"{len(user_ids)} users ---")
+        print(f"--- Done in {time.monotonic() - started:.1f}s ---")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rebuild the weekly/monthly metric rollups.")
+    parser.add_argument("--user-id", action="append", type=uuid.UUID,
+                        help="Only rebuild this user (repeatable).")
+    args = parser.parse_args()
+    rebuild_rollups(args.user_id)
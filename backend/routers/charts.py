@@ -1,59 +1,251 @@
 # /backend/routers/charts.py
+import logging
 import uuid
-import psycopg2
-from psycopg2.extras import DictCursor
-from fastapi import APIRouter, HTTPException, Depends
-from database import get_db_connection
+import psycopg
+from datetime import date, timedelta
+from typing import List, Literal, Optional
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from database import async_db_connection
+from core.responses import ORJSONResponse
+from core.etags import user_etag, etag_matches, not_modified, with_etag
 from auth import get_current_user
-from schemas import ChartData
+from schemas import ChartData, MultiSeriesChartData
+from rollups import AGGREGATE_COLUMNS
+from downsampling import downsample_indices
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/api/charts",
     tags=["Charts"]
 )
 
+# Metric key for daily_checkins.principle_alignment; any other key is
+# "<metric_type>:<metric_name>" from daily_metrics.
+PRINCIPLE_ALIGNMENT = "principle_alignment"
+
+# Whitelisted SQL aggregates (interpolated into the query, never user text)
+AGGREGATES = {"avg": "AVG", "sum": "SUM", "min": "MIN",
+              "max": "MAX", "count": "COUNT"}
+
+DEFAULT_RANGE_DAYS = 60
+
 
 @router.get("/principle-alignment", response_model=ChartData)
 async def get_principle_alignment_chart(
-    current_user_id: uuid.UUID = Depends(get_current_user)
+    max_points: Optional[int] = Query(None, ge=3),
+    current_user_id: uuid.UUID = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
 ):
-    print(f"\n--- 1. get_principle_alignment_chart called for user: \
-            {current_user_id} ---")
-    conn = None
-    cur = None
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=DictCursor)
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            # The 60-day window moves daily, hence the date
+            etag = await user_etag(cur, current_user_id, date.today())
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
 
-        # This query fetches the date and score for the last 60 days
-        # ordering by date ASC to make the chart plot correctly
-        sql_query = """
-            SELECT checkin_date, principle_alignment
-            FROM daily_checkins
-            WHERE user_id = %s
-              AND checkin_date >= NOW() - INTERVAL '60 days'
-            ORDER BY checkin_date ASC;
-        """
+            # This query fetches the date and score for the last 60 days
+            # ordering by date ASC to make the chart plot correctly
+            sql_query = """
+                SELECT checkin_date, principle_alignment
+                FROM daily_checkins
+                WHERE user_id = %s
+                  AND checkin_date >= NOW() - INTERVAL '60 days'
+                ORDER BY checkin_date ASC;
+            """
 
-        print("--- 2. Executing SQL for chart data ---")
-        cur.execute(sql_query, (current_user_id,))
+            await cur.execute(sql_query, (current_user_id,))
 
-        rows = cur.fetchall()
+            rows = await cur.fetchall()
 
         # Separate the data into two lists for Chart.js
         labels = [row['checkin_date'] for row in rows]
         data = [row['principle_alignment'] for row in rows]
 
-        print(f"--- 3. Found {len(labels)} data points ---")
-        return ChartData(labels=labels, data=data)
+        logger.debug("Principle alignment chart",
+                     extra={"points": len(labels)})
+        keep = downsample_indices(labels, [data], max_points)
+        if keep is not None:
+            labels = [labels[i] for i in keep]
+            data = [data[i] for i in keep]
+        return with_etag(ORJSONResponse({"labels": labels, "data": data}),
+                         etag)
 
-    except psycopg2.Error as db_error:
-        print(f"\n--- !!! DATABASE ERROR !!! ---\n{db_error}")
+    except psycopg.Error:
+        logger.exception("Database error in get_principle_alignment_chart")
         raise HTTPException(status_code=500,
                             detail="Database error fetching chart data.")
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-        print("--- Connection closed ---")
+
+
+def bucket_start(day, granularity):
+    """Same bucketing as Postgres date_trunc() for day/week/month."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucket_labels(start, end, granularity):
+    """Every bucket between start and end, so gaps can be filled."""
+    labels = []
+    current = bucket_start(start, granularity)
+    while current <= end:
+        labels.append(current)
+        if granularity == "month":
+            current = (current.replace(year=current.year + 1, month=1)
+                       if current.month == 12
+                       else current.replace(month=current.month + 1))
+        else:
+            current += timedelta(days=7 if granularity == "week" else 1)
+    return labels
+
+
+def build_series_sql(metrics, aggregate):
+    """
+    One UNION ALL query returning (metric, bucket, value) rows for every
+    requested series, aggregated per bucket with date_trunc.
+    """
+    agg = AGGREGATES[aggregate]
+    parts = []
+    if PRINCIPLE_ALIGNMENT in metrics:
+        parts.append(f"""
+            SELECT %(principle_alignment)s AS metric,
+                   date_trunc(%(granularity)s, checkin_date)::date AS bucket,
+                   {agg}(principle_alignment) AS value
+            FROM daily_checkins
+            WHERE user_id = %(user_id)s
+              AND checkin_date BETWEEN %(start)s AND %(end)s
+              AND principle_alignment IS NOT NULL
+            GROUP BY bucket
+        """)
+    if any(metric != PRINCIPLE_ALIGNMENT for metric in metrics):
+        parts.append(f"""
+            SELECT dm.metric_type || ':' || dm.metric_name AS metric,
+                   date_trunc(%(granularity)s, dc.checkin_date)::date
+                       AS bucket,
+                   {agg}(dm.value) AS value
+            FROM daily_checkins dc
+            JOIN daily_metrics dm ON dm.checkin_id = dc.checkin_id
+            WHERE dc.user_id = %(user_id)s
+              AND dc.checkin_date BETWEEN %(start)s AND %(end)s
+              AND (dm.metric_type, dm.metric_name) IN (
+                  SELECT * FROM unnest(%(metric_types)s::text[],
+                                       %(metric_names)s::text[]))
+            GROUP BY dm.metric_type, dm.metric_name, bucket
+        """)
+    return " UNION ALL ".join(parts) + " ORDER BY bucket;"
+
+
+def build_rollup_sql(aggregate):
+    """
+    Week/month series read straight from metric_rollups instead of the
+    raw rows. Buckets are whole periods, so the first and last bucket
+    may include days just outside start/end.
+    """
+    column = AGGREGATE_COLUMNS[aggregate]
+    return f"""
+        SELECT metric, period_start AS bucket, {column} AS value
+        FROM metric_rollups
+        WHERE user_id = %(user_id)s
+          AND granularity = %(granularity)s
+          AND metric = ANY(%(metrics)s)
+          AND period_start BETWEEN date_trunc(%(granularity)s, %(start)s)
+                               AND %(end)s
+        ORDER BY period_start;
+    """
+
+
+@router.get("/series", response_model=MultiSeriesChartData)
+async def get_chart_series(
+    metric: List[str] = Query([PRINCIPLE_ALIGNMENT]),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    granularity: Literal["day", "week", "month"] = "day",
+    aggregate: Literal["avg", "sum", "min", "max", "count"] = "avg",
+    max_points: Optional[int] = Query(None, ge=3),
+    current_user_id: uuid.UUID = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Several series over any date range in one response. Each metric is
+    "principle_alignment" or "<metric_type>:<metric_name>", e.g.
+    "Time Allocation:Social". Buckets with no data are returned as null.
+    Week and month series are served from the metric_rollups table.
+    With max_points, long series are downsampled with LTTB.
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS)
+    if start > end:
+        raise HTTPException(status_code=400,
+                            detail="start must be on or before end.")
+
+    metrics = list(dict.fromkeys(metric))
+    metric_types, metric_names = [], []
+    for key in metrics:
+        if key == PRINCIPLE_ALIGNMENT:
+            continue
+        metric_type, sep, metric_name = key.partition(":")
+        if not sep or not metric_type or not metric_name:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown metric '{key}'. Use "
+                       f"'{PRINCIPLE_ALIGNMENT}' or "
+                       "'<metric_type>:<metric_name>'."
+            )
+        metric_types.append(metric_type)
+        metric_names.append(metric_name)
+
+    try:
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            # The default range ends today
+            etag = await user_etag(cur, current_user_id, date.today())
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            if granularity == "day":
+                sql_query = build_series_sql(metrics, aggregate)
+            else:
+                sql_query = build_rollup_sql(aggregate)
+            await cur.execute(sql_query, {
+                "user_id": current_user_id,
+                "metrics": metrics,
+                "start": start,
+                "end": end,
+                "granularity": granularity,
+                "principle_alignment": PRINCIPLE_ALIGNMENT,
+                "metric_types": metric_types,
+                "metric_names": metric_names,
+            })
+            rows = await cur.fetchall()
+
+    except psycopg.Error:
+        logger.exception("Database error in get_chart_series")
+        raise HTTPException(status_code=500,
+                            detail="Database error fetching chart data.")
+
+    labels = bucket_labels(start, end, granularity)
+    values = {key: {} for key in metrics}
+    for row in rows:
+        values[row["metric"]][row["bucket"]] = float(row["value"])
+
+    data = [[values[key].get(label) for label in labels]
+            for key in metrics]
+    logger.debug("Chart series", extra={
+        "metric": metric, "granularity": granularity,
+        "buckets": len(rows), "labels": len(labels)})
+
+    keep = downsample_indices(labels, data, max_points)
+    if keep is not None:
+        labels = [labels[i] for i in keep]
+        data = [[series[i] for i in keep] for series in data]
+        logger.debug("Chart series downsampled",
+                     extra={"labels": len(labels)})
+
+    # Built to the MultiSeriesChartData shape and returned as is
+    return with_etag(ORJSONResponse({
+        "granularity": granularity,
+        "aggregate": aggregate,
+        "labels": labels,
+        "series": [{"metric": key, "data": series}
+                   for key, series in zip(metrics, data)],
+    }), etag)
@@ -1,17 +1,30 @@
 # /backend/routers/checkins.py
 
+import logging
+import csv
+import itertools
+import json
+import tempfile
 import uuid
-import psycopg2
-from psycopg2.extras import DictCursor
+import psycopg
 from fastapi import HTTPException
 from datetime import date
-from fastapi import Depends
-from database import get_db_connection
+from typing import Literal
+from pydantic import ValidationError
+from fastapi import BackgroundTasks, Depends, Query, Request
+from starlette.concurrency import run_in_threadpool
+from database import async_db_connection
+from core.cache import dashboard_cache
+from core.responses import ORJSONResponse
 from fastapi import APIRouter
 from auth import get_current_user
 from schemas import CheckinCreate
+from rollups import APPLY_CHECKINS_SQL, APPLY_IMPORT_SQL
+from insight_jobs import enqueue_quietly
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/api/checkins",
     tags=["Checkins"]
@@ -21,202 +34,439 @@ router = APIRouter(
 @router.get("/today")
 async def get_todays_checkin(current_user_id: uuid.UUID =
                              Depends(get_current_user)):
-    print(f"\n--- 1. get_todays_checkin called for user: \
-          {current_user_id} ---")
     today = date.today()
-    conn = None
-    cur = None
     try:
-        print("--- 2. Attempting DB connection ---")
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=DictCursor)
-        print("--- 3. DB connection successful ---")
-
-        checkin_sql = """
-            SELECT checkin_id, checkin_date, gratitude_entry,
-                   principle_alignment, principle_alignment_note
-            FROM daily_checkins
-            WHERE user_id = %s AND checkin_date = %s;
-        """
-        cur.execute(checkin_sql, (current_user_id, today))
-        checkin_data = cur.fetchone()
-
-        if not checkin_data:
-            print(f"--- No check-in found for user \
-                  {current_user_id} on {today} ---")
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            # One round trip: the nested metrics, top goal and completed
+            # steps are assembled server-side with json_agg.
+            checkin_sql = """
+                SELECT dc.checkin_id, dc.checkin_date, dc.gratitude_entry,
+                       dc.principle_alignment, dc.principle_alignment_note,
+                       COALESCE(m.metrics, '[]'::json) AS metrics,
+                       g.top_goal,
+                       COALESCE(s.completed_steps, '[]'::json)
+                           AS completed_steps
+                FROM daily_checkins dc
+                LEFT JOIN LATERAL (
+                    SELECT json_agg(json_build_object(
+                               'metric_type', dm.metric_type,
+                               'metric_name', dm.metric_name,
+                               'value', dm.value)) AS metrics
+                    FROM daily_metrics dm
+                    WHERE dm.checkin_id = dc.checkin_id
+                ) m ON TRUE
+                LEFT JOIN LATERAL (
+                    SELECT json_build_object(
+                               'goal_description', tg.goal_description,
+                               'is_completed', tg.is_completed) AS top_goal
+                    FROM top_goal tg
+                    WHERE tg.user_id = dc.user_id
+                      AND tg.goal_date = dc.checkin_date
+                ) g ON TRUE
+                LEFT JOIN LATERAL (
+                    SELECT json_agg(json_build_object(
+                               'step_id', cs.step_id,
+                               'step_name', rs.step_name,
+                               'is_completed', cs.is_completed,
+                               'actual_duration', cs.actual_duration)
+                           ORDER BY rs.step_order) AS completed_steps
+                    FROM completed_steps cs
+                    JOIN routine_steps rs ON cs.step_id = rs.step_id
+                    WHERE cs.checkin_id = dc.checkin_id
+                ) s ON TRUE
+                WHERE dc.user_id = %s AND dc.checkin_date = %s;
+            """
+            await cur.execute(checkin_sql, (current_user_id, today))
+            full_checkin_details = await cur.fetchone()
+
+        if not full_checkin_details:
             raise HTTPException(status_code=404,
                                 detail="No check-in found for today.")
 
-        checkin_id = checkin_data["checkin_id"]
-        print(f"--- Found check-in for today (ID: {checkin_id}) ---")
-
-        metrics_sql = """
-            SELECT metric_type, metric_name, value
-            FROM daily_metrics WHERE checkin_id = %s;
-        """
-        cur.execute(metrics_sql, (checkin_id,))
-        metrics_rows = cur.fetchall()
-        metrics = [dict(row) for row in metrics_rows]
-        print(f"--- Found {len(metrics)} metrics ---")
-
-        goal_sql = """
-            SELECT goal_description, is_completed
-            FROM top_goal WHERE user_id = %s AND goal_date = %s;
-        """
-        cur.execute(goal_sql, (current_user_id, today))
-        top_goal_row = cur.fetchone()
-        top_goal = dict(top_goal_row) if top_goal_row else None
-        print(f"--- Found top goal: {bool(top_goal)} ---")
-
-        print(f"--- 4e. Fetching completed steps for check-in \
-              {checkin_id} ---")
-        steps_sql = """
-             SELECT cs.step_id, \
-             rs.step_name, \
-             cs.is_completed, \
-             cs.actual_duration \
-             FROM completed_steps cs \
-             JOIN routine_steps rs ON cs.step_id = rs.step_id \
-             WHERE cs.checkin_id = %s \
-             ORDER BY rs.step_order;
-        """
-        cur.execute(steps_sql, (checkin_id,))
-        completed_steps_rows = cur.fetchall()
-        completed_steps = [dict(row) for row in completed_steps_rows]
-        print(f"--- Found {len(completed_steps)} completed steps ---")
-
-        full_checkin_details = {
-            **dict(checkin_data),
-            "metrics": metrics,
-            "top_goal": top_goal,
-            "completed_steps": completed_steps
-        }
-
-        return full_checkin_details
+        return ORJSONResponse(full_checkin_details)
 
     except HTTPException as e:
         raise e
-    except psycopg2.Error as db_error:
-        print(f"DB Error: {db_error}")
+    except psycopg.Error:
+        logger.exception("Database error in get_todays_checkin")
         raise HTTPException(status_code=500,
                             detail="Database error fetching today's check-in.")
-    except Exception as e:
-        print(f"Unexpected Error: {e}")
+    except Exception:
+        logger.exception("Unexpected error in get_todays_checkin")
         raise HTTPException(status_code=500,
                             detail="An unexpected server error occurred.")
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-        print("--- Connection closed ---")
 
 
 @router.post("")
 async def create_checkin(checkin_data: CheckinCreate,
+                         background_tasks: BackgroundTasks,
                          current_user_id: uuid.UUID =
                          Depends(get_current_user)):
-    print("\n--- 1. create_checkin endpoint called ---")
-    print(f"   - User ID from token: {current_user_id}")
-    conn = None
-    cur = None
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-
-        checkin_sql = """
-            INSERT INTO daily_checkins
-            (checkin_id, user_id, checkin_date, gratitude_entry,
-                principle_alignment, principle_alignment_note)
-            VALUES (%s, %s, %s, %s, %s, %s) RETURNING checkin_id;
-        """
-        checkin_id = uuid.uuid4()
-        cur.execute(checkin_sql, (
-            checkin_id,
-            current_user_id,
-            checkin_data.checkin_date,
-            checkin_data.gratitude_entry,
-            checkin_data.principle_alignment,
-            checkin_data.principle_alignment_note
-        ))
-        print(f"--- daily_checkins insert successful for ID: {checkin_id} ---")
-
-        if checkin_data.metrics:
-            print("--- 4b. Inserting into daily_metrics ---")
-            metric_sql = """
-                INSERT INTO daily_metrics
-                (metric_id, checkin_id, metric_type, metric_name, value)
-                VALUES (%s, %s, %s, %s, %s);
-            """
-            metrics_to_insert = [
-                (uuid.uuid4(), checkin_id,
-                    metric.metric_type, metric.metric_name, metric.value)
-                for metric in checkin_data.metrics
-            ]
-            psycopg2.extras.execute_batch(cur, metric_sql, metrics_to_insert)
-            print(f"--- Inserted {len(metrics_to_insert)} metrics ---")
-
-        if checkin_data.completed_steps:
-            print("--- 4c. Inserting into completed_steps ---")
-            step_sql = """
-                INSERT INTO completed_steps
-                (completion_id, checkin_id, step_id,
-                    is_completed, actual_duration)
-                VALUES (%s, %s, %s, %s, %s);
-            """
-            steps_to_insert = [
-                (uuid.uuid4(), checkin_id,
-                    step.step_id, step.is_completed, step.actual_duration)
-                for step in checkin_data.completed_steps
-            ]
-            psycopg2.extras.execute_batch(cur, step_sql, steps_to_insert)
-            print(f"--- Inserted {len(steps_to_insert)} completed steps ---")
-
-        if checkin_data.top_goal:
-            goal_sql = """
-                INSERT INTO top_goal
-                (goal_id, user_id, goal_date, goal_description, is_completed)
-                VALUES (%s, %s, %s, %s, %s);
+        # The transaction commits when the block exits without an error
+        # and is rolled back otherwise.
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            checkin_sql = """
+                INSERT INTO daily_checkins
+                (checkin_id, user_id, checkin_date, gratitude_entry,
+                    principle_alignment, principle_alignment_note)
+                VALUES (%s, %s, %s, %s, %s, %s) RETURNING checkin_id;
             """
-            cur.execute(goal_sql, (
-                uuid.uuid4(),
+            checkin_id = uuid.uuid4()
+            await cur.execute(checkin_sql, (
+                checkin_id,
                 current_user_id,
                 checkin_data.checkin_date,
-                checkin_data.top_goal.goal_description,
-                checkin_data.top_goal.is_completed
+                checkin_data.gratitude_entry,
+                checkin_data.principle_alignment,
+                checkin_data.principle_alignment_note
             ))
 
-        conn.commit()
+            if checkin_data.metrics:
+                metric_sql = """
+                    INSERT INTO daily_metrics
+                    (metric_id, checkin_id, metric_type, metric_name, value)
+                    VALUES (%s, %s, %s, %s, %s);
+                """
+                metrics_to_insert = [
+                    (uuid.uuid4(), checkin_id,
+                        metric.metric_type, metric.metric_name, metric.value)
+                    for metric in checkin_data.metrics
+                ]
+                await cur.executemany(metric_sql, metrics_to_insert)
+
+            if checkin_data.completed_steps:
+                step_sql = """
+                    INSERT INTO completed_steps
+                    (completion_id, checkin_id, step_id,
+                        is_completed, actual_duration)
+                    VALUES (%s, %s, %s, %s, %s);
+                """
+                steps_to_insert = [
+                    (uuid.uuid4(), checkin_id,
+                        step.step_id, step.is_completed, step.actual_duration)
+                    for step in checkin_data.completed_steps
+                ]
+                await cur.executemany(step_sql, steps_to_insert)
+
+            if checkin_data.top_goal:
+                goal_sql = """
+                    INSERT INTO top_goal
+                    (goal_id, user_id, goal_date,
+                        goal_description, is_completed)
+                    VALUES (%s, %s, %s, %s, %s);
+                """
+                await cur.execute(goal_sql, (
+                    uuid.uuid4(),
+                    current_user_id,
+                    checkin_data.checkin_date,
+                    checkin_data.top_goal.goal_description,
+                    checkin_data.top_goal.is_completed
+                ))
+
+            # Fold the new values into the weekly/monthly rollups
+            await cur.execute(APPLY_CHECKINS_SQL,
+                              {"checkin_ids": [checkin_id]})
+
+        dashboard_cache.invalidate(current_user_id)
+        # Queued once the response is sent, so the write never waits on it
+        background_tasks.add_task(enqueue_quietly, current_user_id)
         return {"status": "success",
                 "message": "Check-in created successfully.",
                 "checkin_id": checkin_id}
 
-    except psycopg2.Error as db_error:
-        print("\n--- !!! DATABASE ERROR !!! ---")
-        print(f"DB Error Type: {type(db_error).__name__}")
-        print(f"DB Error Details: {db_error}")
-        print(f"DB Error pgcode: {db_error.pgcode}")
-        print(f"DB Error pgerror: {db_error.pgerror}")
-        if conn:
-            print("--- Rolling back transaction ---")
-            conn.rollback()
+    except psycopg.Error as db_error:
+        logger.exception("Database error in create_checkin")
         raise HTTPException(status_code=500,
                             detail=f"Database error occurred. \
-                            Code: {db_error.pgcode}")
-
-    except Exception as e:
-        print("\n--- !!! UNEXPECTED ERROR !!! ---")
-        print(f"Error Type: {type(e).__name__}")
-        print(f"Error Details: {e}")
-        if conn:
-            print("--- Rolling back transaction ---")
-            conn.rollback()
+                            Code: {db_error.sqlstate}")
+
+    except Exception:
+        logger.exception("Unexpected error in create_checkin")
         raise HTTPException(status_code=500,
                             detail="An unexpected server error occurred.")
 
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-        print("--- Connection closed ---")
+
+# --- Bulk import ---
+# Rows are parsed and COPY'd into temp staging tables in batches of this
+# size, so memory stays flat however large the upload is.
+IMPORT_BATCH_SIZE = 1000
+# Uploads are spooled to disk past this size
+IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+IMPORT_CSV_FIELDS = ["checkin_date", "gratitude_entry", "principle_alignment",
+                     "principle_alignment_note", "metrics",
+                     "completed_steps", "top_goal"]
+
+IMPORT_STAGING_SQL = """
+    CREATE TEMP TABLE import_checkins (
+        line_no INTEGER, checkin_id UUID, checkin_date DATE,
+        gratitude_entry TEXT, principle_alignment INTEGER,
+        principle_alignment_note TEXT
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE import_metrics (
+        checkin_id UUID, metric_type VARCHAR(255),
+        metric_name VARCHAR(255), value INTEGER
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE import_steps (
+        line_no INTEGER, checkin_id UUID, step_id UUID,
+        is_completed BOOLEAN, actual_duration INTEGER
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE import_goals (
+        line_no INTEGER, checkin_id UUID, goal_date DATE,
+        goal_description TEXT, is_completed BOOLEAN
+    ) ON COMMIT DROP;
+"""
+
+# Rows that collide with an existing (user_id, checkin_date), or with an
+# earlier line of the same upload, are skipped and reported back.
+IMPORT_MERGE_CHECKINS_SQL = """
+    WITH inserted AS (
+        INSERT INTO daily_checkins
+        (checkin_id, user_id, checkin_date, gratitude_entry,
+            principle_alignment, principle_alignment_note)
+        SELECT checkin_id, %(user_id)s, checkin_date, gratitude_entry,
+               principle_alignment, principle_alignment_note
+        FROM import_checkins
+        ORDER BY line_no
+        ON CONFLICT (user_id, checkin_date) DO NOTHING
+        RETURNING checkin_id
+    )
+    SELECT s.line_no, s.checkin_date
+    FROM import_checkins s
+    WHERE NOT EXISTS (SELECT 1 FROM inserted i
+                      WHERE i.checkin_id = s.checkin_id)
+    ORDER BY s.line_no;
+"""
+
+IMPORT_MERGE_METRICS_SQL = """
+    INSERT INTO daily_metrics
+    (metric_id, checkin_id, metric_type, metric_name, value)
+    SELECT gen_random_uuid(), m.checkin_id,
+           m.metric_type, m.metric_name, m.value
+    FROM import_metrics m
+    JOIN daily_checkins dc ON dc.checkin_id = m.checkin_id;
+"""
+
+# Steps must belong to one of the user's routines; others are reported
+IMPORT_MERGE_STEPS_SQL = """
+    WITH inserted AS (
+        INSERT INTO completed_steps
+        (completion_id, checkin_id, step_id, is_completed, actual_duration)
+        SELECT gen_random_uuid(), s.checkin_id, s.step_id,
+               s.is_completed, s.actual_duration
+        FROM import_steps s
+        JOIN daily_checkins dc ON dc.checkin_id = s.checkin_id
+        JOIN routine_steps rs ON rs.step_id = s.step_id
+        JOIN routines r ON r.routine_id = rs.routine_id
+                       AND r.user_id = %(user_id)s
+        RETURNING checkin_id, step_id
+    )
+    SELECT s.line_no, s.step_id
+    FROM import_steps s
+    JOIN daily_checkins dc ON dc.checkin_id = s.checkin_id
+    WHERE NOT EXISTS (SELECT 1 FROM inserted i
+                      WHERE i.checkin_id = s.checkin_id
+                        AND i.step_id = s.step_id)
+    ORDER BY s.line_no;
+"""
+
+IMPORT_MERGE_GOALS_SQL = """
+    WITH inserted AS (
+        INSERT INTO top_goal
+        (goal_id, user_id, goal_date, goal_description, is_completed)
+        SELECT gen_random_uuid(), %(user_id)s, g.goal_date,
+               g.goal_description, g.is_completed
+        FROM import_goals g
+        JOIN daily_checkins dc ON dc.checkin_id = g.checkin_id
+        ON CONFLICT (user_id, goal_date) DO NOTHING
+        RETURNING goal_date
+    )
+    SELECT g.line_no, g.goal_date
+    FROM import_goals g
+    JOIN daily_checkins dc ON dc.checkin_id = g.checkin_id
+    WHERE NOT EXISTS (SELECT 1 FROM inserted i
+                      WHERE i.goal_date = g.goal_date)
+    ORDER BY g.line_no;
+"""
+
+
+def _parse_import_records(upload, fmt):
+    """
+    Yields (line_no, CheckinCreate) for valid records and
+    (line_no, error message) for invalid ones. NDJSON lines are decoded
+    one at a time, so bytes that are not UTF-8 only invalidate their
+    line. A CSV record can span lines, so a malformed or undecodable CSV
+    raises a 400 instead.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(_utf8_lines(upload))
+        try:
+            for record in reader:
+                yield reader.line_num, _parse_csv_record(record)
+        except csv.Error as e:
+            raise HTTPException(status_code=400,
+                                detail=f"Malformed CSV at line "
+                                f"{reader.line_num}: {e}")
+    else:
+        for line_no, line in enumerate(upload, start=1):
+            try:
+                line = line.decode("utf-8")
+                if not line.strip():
+                    continue
+                yield line_no, _validate_import_record(json.loads(line))
+            except (ValueError, ValidationError) as e:
+                yield line_no, str(e)
+
+
+def _utf8_lines(upload):
+    for line_no, line in enumerate(upload, start=1):
+        try:
+            yield line.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise HTTPException(status_code=400,
+                                detail=f"Line {line_no} is not UTF-8: {e}")
+
+
+def _parse_csv_record(record):
+    """The CheckinCreate of a CSV row, or the reason it is invalid."""
+    try:
+        raw = {key: (value if value != "" else None)
+               for key, value in record.items()
+               if key in IMPORT_CSV_FIELDS}
+        for field in ("metrics", "completed_steps", "top_goal"):
+            if raw.get(field) is not None:
+                raw[field] = json.loads(raw[field])
+            elif field != "top_goal":
+                raw.pop(field, None)
+        return _validate_import_record(raw)
+    except (ValueError, ValidationError) as e:
+        return str(e)
+
+
+def _next_import_batch(records):
+    """Parses and validates up to IMPORT_BATCH_SIZE more records."""
+    return list(itertools.islice(records, IMPORT_BATCH_SIZE))
+
+
+def _validate_import_record(raw):
+    if not isinstance(raw, dict) or not raw.get("checkin_date"):
+        raise ValueError("checkin_date is required.")
+    return CheckinCreate.model_validate(raw)
+
+
+async def _copy_import_batch(cur, batch):
+    checkins, metrics, steps, goals = [], [], [], []
+    for line_no, record in batch:
+        checkin_id = uuid.uuid4()
+        checkins.append((line_no, checkin_id, record.checkin_date,
+                         record.gratitude_entry, record.principle_alignment,
+                         record.principle_alignment_note))
+        metrics.extend((checkin_id, m.metric_type, m.metric_name, m.value)
+                       for m in record.metrics)
+        steps.extend((line_no, checkin_id, st.step_id,
+                      st.is_completed, st.actual_duration)
+                     for st in record.completed_steps)
+        if record.top_goal:
+            goals.append((line_no, checkin_id, record.checkin_date,
+                          record.top_goal.goal_description,
+                          record.top_goal.is_completed))
+
+    for table, rows in (("import_checkins", checkins),
+                        ("import_metrics", metrics),
+                        ("import_steps", steps),
+                        ("import_goals", goals)):
+        if not rows:
+            continue
+        async with cur.copy(f"COPY {table} FROM STDIN") as copy:
+            for row in rows:
+                await copy.write_row(row)
+
+
+@router.post("/import")
+async def import_checkins(request: Request,
+                          fmt: Literal["ndjson", "csv"] =
+                          Query("ndjson", alias="format"),
+                          current_user_id: uuid.UUID =
+                          Depends(get_current_user)):
+    """
+    Bulk-loads many CheckinCreate-shaped records in one transaction.
+
+    The body is NDJSON (one record per line) or CSV with the columns in
+    IMPORT_CSV_FIELDS, where metrics, completed_steps and top_goal hold
+    JSON. Invalid lines and dates that already have a check-in are
+    reported per line instead of aborting the batch.
+    """
+    errors = []
+    received = 0
+    try:
+        with tempfile.SpooledTemporaryFile(
+                max_size=IMPORT_SPOOL_BYTES) as upload:
+            async for chunk in request.stream():
+                upload.write(chunk)
+            upload.seek(0)
+
+            async with async_db_connection() as conn, \
+                    conn.cursor() as cur:
+                await cur.execute(IMPORT_STAGING_SQL)
+
+                # Parsing and validation are CPU-bound, so each batch of
+                # records is produced on a worker thread
+                records = _parse_import_records(upload, fmt)
+                while parsed := await run_in_threadpool(_next_import_batch,
+                                                        records):
+                    batch = []
+                    for line_no, record in parsed:
+                        received += 1
+                        if isinstance(record, str):
+                            errors.append({"line": line_no,
+                                           "error": record})
+                        else:
+                            batch.append((line_no, record))
+                    if batch:
+                        await _copy_import_batch(cur, batch)
+
+                params = {"user_id": current_user_id}
+                await cur.execute(IMPORT_MERGE_CHECKINS_SQL, params)
+                conflicts = [
+                    {"line": row["line_no"],
+                     "checkin_date": row["checkin_date"],
+                     "reason": "Check-in already exists for this date."}
+                    for row in await cur.fetchall()
+                ]
+                imported = received - len(errors) - len(conflicts)
+
+                await cur.execute(IMPORT_MERGE_METRICS_SQL)
+                await cur.execute(APPLY_IMPORT_SQL)
+                await cur.execute(IMPORT_MERGE_STEPS_SQL, params)
+                conflicts.extend(
+                    {"line": row["line_no"],
+                     "step_id": row["step_id"],
+                     "reason": "Step is not part of your routines."}
+                    for row in await cur.fetchall()
+                )
+                await cur.execute(IMPORT_MERGE_GOALS_SQL, params)
+                conflicts.extend(
+                    {"line": row["line_no"],
+                     "checkin_date": row["goal_date"],
+                     "reason": "Top goal already exists for this date."}
+                    for row in await cur.fetchall()
+                )
+
+        logger.info("Check-ins imported", extra={
+            "user_id": str(current_user_id), "format": fmt,
+            "imported": imported, "conflicts": len(conflicts),
+            "invalid": len(errors)})
+        if imported:
+            dashboard_cache.invalidate(current_user_id)
+        return {"status": "success",
+                "received": received,
+                "imported": imported,
+                "conflicts": conflicts,
+                "errors": errors}
+
+    except psycopg.Error as db_error:
+        logger.exception("Database error in import_checkins")
+        raise HTTPException(status_code=500,
+                            detail=f"Database error occurred. \
+                            Code: {db_error.sqlstate}")
@@ -1,12 +1,17 @@
 # /backend/routers/dashboard.py
 
+import logging
 import uuid
-import psycopg2
-from typing import Dict, Any
-from psycopg2.extras import DictCursor
+import psycopg
+from typing import Dict, Any, Optional
 from auth import get_current_user
-from fastapi import APIRouter, HTTPException, Depends
-from database import get_db_connection
+from fastapi import APIRouter, HTTPException, Depends, Header
+from database import async_db_connection
+from core.cache import dashboard_cache
+from core.responses import ORJSONResponse
+from core.etags import user_etag, etag_matches, not_modified, with_etag
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/api/dashboard",
@@ -16,102 +21,104 @@ router = APIRouter(
 
 @router.get("")
 async def get_dashboard_data(current_user_id: uuid.UUID =
-                             Depends(get_current_user)):
-    print(f"\n--- 1. get_dashboard_data called for user: \
-          {current_user_id} ---")
-    conn = None
-    cur = None
-
-    dashboard_data: Dict[str, Any] = {
-        "latest_checkin": None,
-        "top_goal": None,
-        "daily_metrics": [],
-        "latest_insight": None,
-        "random_gratitude": None
-    }
+                             Depends(get_current_user),
+                             if_none_match: Optional[str] = Header(None)):
+    # Snapshots are invalidated by create_checkin, goals.update_today and
+    # insights.generate_new_insight. The random gratitude therefore only
+    # rotates when the snapshot is rebuilt. They are kept under the ETag
+    # they were built with, which follows users.data_version, so a write
+    # handled by another process also stops the old snapshot being served.
+    cache_token = dashboard_cache.begin(current_user_id)
 
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=DictCursor)
-
-        checkin_sql = """
-            SELECT checkin_id, checkin_date, gratitude_entry, \
-            principle_alignment, principle_alignment_note
-            FROM daily_checkins
-            WHERE user_id = %s
-            ORDER BY checkin_date DESC, created_at DESC
-            LIMIT 1;
-        """
-        cur.execute(checkin_sql, (current_user_id,))
-        latest_checkin = cur.fetchone()
-
-        if latest_checkin:
-            dashboard_data["latest_checkin"] = dict(latest_checkin)
-            latest_checkin_id = latest_checkin["checkin_id"]
-
-            metrics_sql = """
-                 SELECT metric_type, metric_name, value
-                 FROM daily_metrics
-                 WHERE checkin_id = %s;
-             """
-            cur.execute(metrics_sql, (latest_checkin_id,))
-            metrics_rows = cur.fetchall()
-            dashboard_data["daily_metrics"] = \
-                [dict(row) for row in metrics_rows]
-
-            target_date = latest_checkin["checkin_date"]
-            goal_sql = """
-                 SELECT goal_description, is_completed
-                 FROM top_goal
-                 WHERE user_id = %s AND goal_date = %s;
-             """
-            cur.execute(goal_sql, (current_user_id, target_date))
-            top_goal = cur.fetchone()
-            if top_goal:
-                dashboard_data["top_goal"] = dict(top_goal)
-
-            insight_sql = """
-                 SELECT insight_id, insight_type, content
-                 FROM insight
-                 WHERE user_id = %s
-                 ORDER BY generated_at DESC
-                 LIMIT 1;
-             """
-            cur.execute(insight_sql, (current_user_id,))
-            latest_insight = cur.fetchone()
-            if latest_insight:
-                dashboard_data["latest_insight"] = dict(latest_insight)
-
-            gratitude_sql = """
-                SELECT gratitude_entry, checkin_date
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            etag = await user_etag(cur, current_user_id)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            snapshot = dashboard_cache.get(current_user_id, etag)
+            if snapshot is not None:
+                logger.debug("Dashboard served from cache")
+                return with_etag(ORJSONResponse(snapshot), etag)
+
+            dashboard_data: Dict[str, Any] = {
+                "latest_checkin": None,
+                "top_goal": None,
+                "daily_metrics": [],
+                "latest_insight": None,
+                "random_gratitude": None
+            }
+
+            checkin_sql = """
+                SELECT checkin_id, checkin_date, gratitude_entry, \
+                principle_alignment, principle_alignment_note
                 FROM daily_checkins
                 WHERE user_id = %s
-                AND gratitude_entry IS NOT NULL
-                AND gratitude_entry != ''
-                ORDER BY RANDOM()
+                ORDER BY checkin_date DESC, created_at DESC
                 LIMIT 1;
             """
-            cur.execute(gratitude_sql, (current_user_id,))
-            random_gratitude = cur.fetchone()
-            if random_gratitude:
-                dashboard_data["random_gratitude"] = dict(random_gratitude)
-
-        return dashboard_data
-
-    except psycopg2.Error as db_error:
-        print("\n--- !!! DATABASE ERROR !!! ---")
-        print(f"DB Error: {db_error}")
+            await cur.execute(checkin_sql, (current_user_id,))
+            latest_checkin = await cur.fetchone()
+
+            if latest_checkin:
+                dashboard_data["latest_checkin"] = latest_checkin
+                latest_checkin_id = latest_checkin["checkin_id"]
+
+                metrics_sql = """
+                     SELECT metric_type, metric_name, value
+                     FROM daily_metrics
+                     WHERE checkin_id = %s;
+                 """
+                await cur.execute(metrics_sql, (latest_checkin_id,))
+                dashboard_data["daily_metrics"] = await cur.fetchall()
+
+                target_date = latest_checkin["checkin_date"]
+                goal_sql = """
+                     SELECT goal_description, is_completed
+                     FROM top_goal
+                     WHERE user_id = %s AND goal_date = %s;
+                 """
+                await cur.execute(goal_sql, (current_user_id, target_date))
+                dashboard_data["top_goal"] = await cur.fetchone()
+
+                insight_sql = """
+                     SELECT insight_id, insight_type, content
+                     FROM insight
+                     WHERE user_id = %s
+                     ORDER BY generated_at DESC
+                     LIMIT 1;
+                 """
+                await cur.execute(insight_sql, (current_user_id,))
+                dashboard_data["latest_insight"] = await cur.fetchone()
+
+                # Pick a random gratitude_seq (kept 1..n by triggers) and
+                # take the first entry at or after it. Both lookups are
+                # index probes, so cost does not grow with history.
+                gratitude_sql = """
+                    SELECT gratitude_entry, checkin_date
+                    FROM daily_checkins
+                    WHERE user_id = %(user_id)s
+                      AND gratitude_seq >= (
+                          SELECT floor(random() * MAX(gratitude_seq))::int + 1
+                          FROM daily_checkins
+                          WHERE user_id = %(user_id)s
+                            AND gratitude_seq IS NOT NULL
+                      )
+                    ORDER BY gratitude_seq
+                    LIMIT 1;
+                """
+                await cur.execute(gratitude_sql,
+                                  {"user_id": current_user_id})
+                dashboard_data["random_gratitude"] = await cur.fetchone()
+
+        dashboard_cache.set(current_user_id, dashboard_data, cache_token,
+                            version=etag)
+        return with_etag(ORJSONResponse(dashboard_data), etag)
+
+    except psycopg.Error:
+        logger.exception("Database error in get_dashboard_data")
         raise HTTPException(status_code=500, detail="Database error occurred.")
 
-    except Exception as e:
-        print("\n--- !!! UNEXPECTED ERROR !!! ---")
-        print(f"Error: {e}")
+    except Exception:
+        logger.exception("Unexpected error in get_dashboard_data")
         raise HTTPException(status_code=500,
                             detail="An unexpected server error occurred.")
-
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-        print("--- Connection closed ---")
@@ -0,0 +1,300 @@
+# /backend/routers/export.py
+import csv
+import io
+import uuid
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from auth import get_current_user
+from core.responses import orjson_dumps
+from database import async_db_connection, stream_batches
+
+router = APIRouter(
+    prefix="/api/export",
+    tags=["Export"]
+)
+
+# Rows fetched from each server-side cursor at a time; the only thing
+# export memory use depends on
+EXPORT_BATCH_SIZE = 1000
+
+# Everything that belongs to the user, in export order. Password hashes,
+# search vectors and other internal columns are left out.
+EXPORT_DATASETS = [
+    ("profile", """
+        SELECT user_id, display_name, email, onboarding_complete, created_at
+        FROM users WHERE user_id = %(user_id)s
+    """),
+    ("personality_traits", """
+        SELECT trait_id, scale_name, trait_name, value, display_order
+        FROM personality_traits WHERE user_id = %(user_id)s
+        ORDER BY display_order, trait_id
+    """),
+    ("principles", """
+        SELECT p.principle_id, p.name, up.principle_rank
+        FROM user_principles up
+        JOIN principles p ON p.principle_id = up.principle_id
+        WHERE up.user_id = %(user_id)s
+        ORDER BY up.principle_rank, p.principle_id
+    """),
+    ("routines", """
+        SELECT routine_id, routine_name, is_active, created_at
+        FROM routines WHERE user_id = %(user_id)s
+        ORDER BY created_at, routine_id
+    """),
+    ("routine_steps", """
+        SELECT rs.step_id, rs.routine_id, rs.step_name, rs.target_duration,
+               rs.step_order
+        FROM routine_steps rs
+        JOIN routines r ON r.routine_id = rs.routine_id
+        WHERE r.user_id = %(user_id)s
+        ORDER BY rs.routine_id, rs.step_order
+    """),
+    ("checkins", """
+        SELECT checkin_id, checkin_date, gratitude_entry, principle_alignment,
+               principle_alignment_note, created_at
+        FROM daily_checkins WHERE user_id = %(user_id)s
+        ORDER BY checkin_date
+    """),
+    ("metrics", """
+        SELECT dm.metric_id, dm.checkin_id, dc.checkin_date, dm.metric_type,
+               dm.metric_name, dm.value
+        FROM daily_checkins dc
+        JOIN daily_metrics dm ON dm.checkin_id = dc.checkin_id
+        WHERE dc.user_id = %(user_id)s
+        ORDER BY dc.checkin_date, dm.metric_type, dm.metric_name
+    """),
+    ("completed_steps", """
+        SELECT cs.completion_id, cs.checkin_id, dc.checkin_date, cs.step_id,
+               cs.is_completed, cs.actual_duration
+        FROM daily_checkins dc
+        JOIN completed_steps cs ON cs.checkin_id = dc.checkin_id
+        WHERE dc.user_id = %(user_id)s
+        ORDER BY dc.checkin_date, cs.step_id
+    """),
+    ("goals", """
+        SELECT goal_id, goal_date, goal_description, is_completed, created_at
+        FROM top_goal WHERE user_id = %(user_id)s
+        ORDER BY goal_date
+    """),
+    ("reflections", """
+        SELECT reflection_id, title, body, created_at
+        FROM reflections WHERE user_id = %(user_id)s
+        ORDER BY created_at, reflection_id
+    """),
+    ("insights", """
+        SELECT insight_id, insight_type, content, generated_at, is_read
+        FROM insight WHERE user_id = %(user_id)s
+        ORDER BY generated_at, insight_id
+    """),
+]
+
+
+async def export_batches(user_id):
+    """
+    Yields (dataset, cursor description, rows) for every dataset, all
+    read from one REPEATABLE READ snapshot so the files agree with each
+    other even if the user writes during the export.
+    """
+    async with async_db_connection() as conn:
+        await conn.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, \
+                           READ ONLY;")
+        for name, sql in EXPORT_DATASETS:
+            async for description, rows in stream_batches(
+                    conn, sql, {"user_id": user_id}, EXPORT_BATCH_SIZE):
+                yield name, description, rows
+
+
+# --- NDJSON: one {"table": ..., "data": {...}} object per line ---
+async def ndjson_export(user_id):
+    async for name, _, rows in export_batches(user_id):
+        yield b"".join(orjson_dumps({"table": name, "data": row}) + b"\n"
+                       for row in rows)
+
+
+# --- CSV / Parquet: a zip with one file per dataset ---
+class _ChunkSink:
+    """
+    Write-only, unseekable file for ZipFile: collects what is written
+    until drain(), which hands it to the response.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class _CsvFile:
+    extension = "csv"
+    compression = zipfile.ZIP_DEFLATED
+
+    def __init__(self, entry, description):
+        self._text = io.TextIOWrapper(entry, encoding="utf-8", newline="")
+        self._writer = csv.writer(self._text)
+        self._writer.writerow([column.name for column in description])
+
+    @staticmethod
+    def _value(value):
+        if value is None:
+            return ""
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+    def write(self, rows):
+        self._writer.writerows([self._value(v) for v in row.values()]
+                               for row in rows)
+        self._text.flush()
+
+    def close(self):
+        self._text.close()
+
+
+class _ParquetFile:
+    extension = "parquet"
+    # Parquet pages are already compressed
+    compression = zipfile.ZIP_STORED
+
+    def __init__(self, entry, description):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._entry = entry
+        self._schema = pa.schema([
+            (column.name, _arrow_type(pa, column.type_code))
+            for column in description])
+        self._writer = pq.ParquetWriter(entry, self._schema)
+
+    @staticmethod
+    def _value(value):
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        if isinstance(value, Decimal):
+            return float(value)
+        if isinstance(value, (dict, list)):
+            return orjson_dumps(value).decode()
+        return value
+
+    def write(self, rows):
+        columns = {field.name: [self._value(row[field.name]) for row in rows]
+                   for field in self._schema}
+        self._writer.write_table(
+            self._pa.table(columns, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+        self._entry.close()
+
+
+# Postgres type OIDs -> Arrow types; anything else is exported as text
+_ARROW_TYPES = {
+    16: "bool_",
+    20: "int64",
+    21: "int16",
+    23: "int32",
+    700: "float32",
+    701: "float64",
+    1700: "float64",    # numeric
+    1082: "date32",
+}
+
+
+def _arrow_type(pa, type_oid):
+    if type_oid == 1184:    # timestamptz
+        return pa.timestamp("us", tz="UTC")
+    if type_oid == 1114:    # timestamp
+        return pa.timestamp("us")
+    return getattr(pa, _ARROW_TYPES.get(type_oid, "string"))()
+
+
+class _ZipWriter:
+    """
+    Builds the zip one batch at a time. Encoding and deflating are
+    CPU-bound, so zip_export() calls write() and finish() on a worker
+    thread; each returns the archive bytes produced so far.
+    """
+
+    def __init__(self, file_class):
+        self._file_class = file_class
+        self._sink = _ChunkSink()
+        self._archive = zipfile.ZipFile(self._sink, "w",
+                                        compression=file_class.compression)
+        self._name, self._file = None, None
+
+    def write(self, name, description, rows):
+        if name != self._name:
+            if self._file is not None:
+                self._file.close()
+            # Sizes are unknown up front, so allow any entry to pass 4 GB
+            entry = self._archive.open(
+                f"{name}.{self._file_class.extension}", "w",
+                force_zip64=True)
+            self._name = name
+            self._file = self._file_class(entry, description)
+        if rows:
+            self._file.write(rows)
+        return self._sink.drain()
+
+    def finish(self):
+        if self._file is not None:
+            self._file.close()
+        self._archive.close()
+        return self._sink.drain()
+
+
+async def zip_export(user_id, file_class):
+    writer = _ZipWriter(file_class)
+    async for name, description, rows in export_batches(user_id):
+        yield await run_in_threadpool(writer.write, name, description, rows)
+    yield await run_in_threadpool(writer.finish)
+
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson",
+               lambda user_id: ndjson_export(user_id)),
+    "csv": ("application/zip", "csv.zip",
+            lambda user_id: zip_export(user_id, _CsvFile)),
+    "parquet": ("application/zip", "parquet.zip",
+                lambda user_id: zip_export(user_id, _ParquetFile)),
+}
+
+
+@router.get("")
+async def export_account(fmt: Literal["ndjson", "csv", "parquet"] =
+                         Query("ndjson", alias="format"),
+                         current_user_id: uuid.UUID =
+                         Depends(get_current_user)):
+    """
+    Streams all of the user's data. NDJSON is one stream with a "table"
+    field on each line; CSV and Parquet are a zip with one file per
+    dataset.
+    """
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501,
+                                detail="Parquet export needs pyarrow \
+                                installed on the server.")
+
+    media_type, extension, body = EXPORT_FORMATS[fmt]
+    return StreamingResponse(
+        body(current_user_id), media_type=media_type,
+        headers={"Content-Disposition":
+                 f'attachment; filename="export.{extension}"'})
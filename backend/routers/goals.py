@@ -1,15 +1,19 @@
 # /backend/routers/goals.py
 
+import logging
 import uuid
-import psycopg2
+import psycopg
 from fastapi import HTTPException
 from datetime import date
 from fastapi import Depends
-from database import get_db_connection
+from database import async_db_connection
+from core.cache import dashboard_cache
 from schemas import TopGoalUpdate
 from fastapi import APIRouter
 from auth import get_current_user
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/api/goals",
     tags=["Goals"]
@@ -21,56 +25,36 @@ async def update_todays_top_goal(
     update_data: TopGoalUpdate,
     current_user_id: uuid.UUID = Depends(get_current_user)
 ):
-    print(f"\n--- 1. update_todays_top_goal called for user: \
-          {current_user_id} ---")
     today = date.today()
-    conn = None
-    cur = None
     try:
-        print("--- 2. Attempting DB connection ---")
-        conn = get_db_connection()
-        cur = conn.cursor()
-        print("--- 3. DB connection successful ---")
-
-        update_sql = """
-            UPDATE top_goal
-            SET is_completed = %s
-            WHERE user_id = %s AND goal_date = %s
-            RETURNING goal_id;
-        """
-        print(f"--- 4. Executing update for date {today}, \
-              status {update_data.is_completed} ---")
-        cur.execute(update_sql,
-                    (update_data.is_completed, current_user_id, today))
-
-        updated_goal = cur.fetchone()
-
-        if updated_goal:
-            conn.commit()
-            print("--- Update committed ---")
-            return {"status": "success", "message": "Top goal status updated."}
-        else:
-            if conn:
-                conn.rollback()
-            print("--- No top goal found for today to update ---")
-            raise HTTPException(status_code=404,
-                                detail="No top goal found for today.")
-
-    except psycopg2.Error as db_error:
-        print(f"DB Error: {db_error}")
-        if conn:
-            conn.rollback()
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            update_sql = """
+                UPDATE top_goal
+                SET is_completed = %s
+                WHERE user_id = %s AND goal_date = %s
+                RETURNING goal_id;
+            """
+            await cur.execute(update_sql,
+                              (update_data.is_completed,
+                               current_user_id, today))
+
+            updated_goal = await cur.fetchone()
+
+            if not updated_goal:
+                # Raising inside the block rolls the transaction back
+                raise HTTPException(status_code=404,
+                                    detail="No top goal found for today.")
+
+        dashboard_cache.invalidate(current_user_id)
+        return {"status": "success", "message": "Top goal status updated."}
+
+    except HTTPException as e:
+        raise e
+    except psycopg.Error:
+        logger.exception("Database error in update_todays_top_goal")
         raise HTTPException(status_code=500,
                             detail="Database error updating goal.")
-    except Exception as e:
-        print(f"Unexpected Error: {e}")
-        if conn:
-            conn.rollback()
+    except Exception:
+        logger.exception("Unexpected error in update_todays_top_goal")
         raise HTTPException(status_code=500,
                             detail="An unexpected server error occurred.")
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-        print("--- Connection closed ---")
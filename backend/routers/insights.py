@@ -1,11 +1,16 @@
 # /backend/routers/insights.py
+import logging
 import uuid
-from fastapi import APIRouter, HTTPException, Depends
-from database import get_db_connection
-import psycopg2
-from psycopg2.extras import DictCursor
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from database import async_db_connection
+from core.cache import dashboard_cache
+import psycopg
 from auth import get_current_user
-from insights_engine import generate_insights
+from insight_service import generate_insight, NoCheckinData
+from insight_jobs import insight_jobs
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/api/insights",
@@ -14,94 +19,62 @@ router = APIRouter(
 
 
 @router.post("/generate")
-async def generate_new_insight(current_user_id: uuid.UUID
+async def generate_new_insight(response: Response,
+                               mode: Literal["sync", "async"] = "sync",
+                               current_user_id: uuid.UUID
                                = Depends(get_current_user)):
-    print(f"\n--- 1. generate_new_insight called for user: \
-          {current_user_id} ---")
-    conn = None
-    cur = None
+    """
+    mode=sync generates the insight within the request. mode=async
+    queues a job and returns 202 at once; poll GET /jobs/{job_id} for
+    the result.
+    """
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=DictCursor)
-
-        # --- 1. Fetch latest check-in data ---
-        # (This is similar to the dashboard query)
-        cur.execute(
-            "SELECT * FROM daily_checkins WHERE user_id = %s \
-            ORDER BY checkin_date DESC LIMIT 1",
-            (current_user_id,)
-        )
-        latest_checkin_row = cur.fetchone()
-        if not latest_checkin_row:
-            raise HTTPException(status_code=404,
-                                detail="No check-in data found \
-                                to generate insight.")
-
-        # Convert the read-only row to a mutable dictionary
-        latest_checkin = dict(latest_checkin_row)
+        if mode == "async":
+            job = await insight_jobs.enqueue(current_user_id)
+            response.status_code = 202
+            response.headers["Location"] = \
+                f"{router.prefix}/jobs/{job['job_id']}"
+            return job
 
-        # --- 2. Fetch metrics for that check-in ---
-        cur.execute(
-            "SELECT metric_type, metric_name, value \
-            FROM daily_metrics WHERE checkin_id = %s",
-            (latest_checkin['checkin_id'],)
-        )
-        metrics = [dict(row) for row in cur.fetchall()]
-        latest_checkin['metrics'] = metrics
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            saved_insight = await generate_insight(cur, current_user_id)
+            if not saved_insight:
+                return {"status": "no_insight",
+                        "message": "No new insight generated."}
 
-        # --- 3. Fetch personality traits ---
-        cur.execute(
-            "SELECT trait_name, value FROM personality_traits \
-            WHERE user_id = %s",
-            (current_user_id,)
-        )
-        user_personality = [dict(row) for row in cur.fetchall()]
-
-        # --- 4. Fetch user principles ---
-        cur.execute(
-            "SELECT p.name FROM user_principles up \
-            JOIN principles p \
-            ON up.principle_id = p.principle_id \
-            WHERE up.user_id = %s",
-            (current_user_id,)
-        )
-        user_principles = [row['name'] for row in cur.fetchall()]
-
-        # --- 5. Run the engine ---
-        insight_content = generate_insights(user_personality,
-                                            user_principles,
-                                            latest_checkin)
+        dashboard_cache.invalidate(current_user_id)
+        return saved_insight
 
-        if not insight_content:
-            return {"status": "no_insight",
-                    "message": "No new insight generated."}
+    except NoCheckinData:
+        raise HTTPException(status_code=404,
+                            detail="No check-in data found \
+                            to generate insight.")
 
-        # --- 6. Save the new insight to the DB ---
-        print(f"--- Saving new insight: {insight_content[:50]}... ---")
-        insert_sql = """
-            INSERT INTO insight (insight_id, user_id, insight_type, content)
-            VALUES (%s, %s, %s, %s)
-            RETURNING *;
-        """
-        new_insight = (uuid.uuid4(),
-                       current_user_id,
-                       'Daily Tidbit',
-                       insight_content)
-        cur.execute(insert_sql, new_insight)
-        saved_insight = dict(cur.fetchone())
+    except psycopg.Error:
+        logger.exception("Database error in generate_new_insight")
+        raise HTTPException(status_code=500,
+                            detail="Database error generating insight.")
 
-        conn.commit()
-        return saved_insight
 
-    except psycopg2.Error as db_error:
-        print(f"DB Error: {db_error}")
-        if conn:
-            conn.rollback()
+@router.get("/jobs/{job_id}")
+async def get_insight_job(job_id: uuid.UUID,
+                          wait: float = Query(0, ge=0, le=30),
+                          current_user_id: uuid.UUID
+                          = Depends(get_current_user)):
+    """
+    Status of a queued generation: queued, running, done (with the
+    insight) or failed. wait > 0 holds the request open for up to that
+    many seconds until the job finishes.
+    """
+    try:
+        if wait:
+            job = await insight_jobs.wait(job_id, current_user_id, wait)
+        else:
+            job = await insight_jobs.get(job_id, current_user_id)
+    except psycopg.Error:
+        logger.exception("Database error in get_insight_job")
         raise HTTPException(status_code=500,
-                            detail="Database error generating insight.")
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-        print("--- Connection closed ---")
+                            detail="Database error fetching insight job.")
+    if job is None:
+        raise HTTPException(status_code=404, detail="Insight job not found.")
+    return job
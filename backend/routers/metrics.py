@@ -0,0 +1,42 @@
+# /backend/routers/metrics.py
+import secrets
+from typing import Optional
+import psycopg
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import PlainTextResponse
+from core.cache import dashboard_cache, token_cache
+from core.catalog import principles_catalog
+from core.config import METRICS_TOKEN
+from core.metrics import render
+from core.passwords import password_hasher
+from database import async_pool_stats
+
+router = APIRouter(tags=["Metrics"])
+
+
+def _stats_sources():
+    sources = [("pa_dashboard_cache", dashboard_cache.stats()),
+               ("pa_token_cache", token_cache.stats()),
+               ("pa_password_hasher", password_hasher.stats()),
+               ("pa_principles_catalog", principles_catalog.stats())]
+    try:
+        sources.insert(0, ("pa_db_pool", async_pool_stats()))
+    except psycopg.OperationalError:
+        pass  # pool not open (yet)
+    return sources
+
+
+@router.get("/metrics", response_class=PlainTextResponse,
+            include_in_schema=False)
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    """
+    Request latency, per-request query stats, pool, cache and bcrypt pool
+    stats in the Prometheus text format. Only mounted when METRICS_TOKEN
+    is set (main.py).
+    """
+    if not METRICS_TOKEN or not secrets.compare_digest(
+            authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401,
+                            detail="Invalid metrics token.")
+    return PlainTextResponse(render(_stats_sources()),
+                             media_type="text/plain; version=0.0.4")
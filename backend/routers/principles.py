@@ -1,8 +1,13 @@
 # /backend/routers/personal.py
-from fastapi import APIRouter, HTTPException
-from database import get_db_connection
-from psycopg2.extras import DictCursor
-import psycopg2
+import logging
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Header
+from core.responses import ORJSONResponse
+from core.etags import etag_matches, not_modified, with_etag
+from core.catalog import principles_catalog
+import psycopg
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/api/principles",
@@ -11,24 +16,14 @@ router = APIRouter(
 
 
 @router.get("")
-def get_all_principles():
-    print("\n--- get_all_principles endpoint called ---")
-    conn = None
-    cur = None
+async def get_all_principles(if_none_match: Optional[str] = Header(None)):
+    """Served from the in-memory catalog (core/catalog.py)."""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=DictCursor)
-        cur.execute("SELECT principle_id, name, \
-                    description FROM principles ORDER BY name;")
-        principles_rows = cur.fetchall()
-        principles = [dict(row) for row in principles_rows]
-        return principles
-    except psycopg2.Error as db_error:
-        print(f"DB Error: {db_error}")
+        principles, etag = await principles_catalog.principles()
+    except psycopg.Error:
+        logger.exception("Database error in get_all_principles")
         raise HTTPException(status_code=500,
                             detail="Database error fetching principles.")
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return with_etag(ORJSONResponse(principles), etag)
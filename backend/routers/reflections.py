@@ -1,51 +1,115 @@
 # /backend/routers/reflections.py
+import logging
+import base64
+import binascii
 import uuid
-import psycopg2
-from psycopg2.extras import DictCursor
-from fastapi import APIRouter, HTTPException, Depends
-from database import get_db_connection
+import psycopg
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from database import async_db_connection, stream_rows
 from auth import get_current_user
-from schemas import Reflection, ReflectionCreate
-from typing import List
+from core.streaming import ndjson_lines
+from schemas import Reflection, ReflectionCreate, ReflectionSummary
+from typing import List, Literal, Optional, Union
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/api/reflections",
     tags=["Reflections"]
 )
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+SNIPPET_LENGTH = 200
+
+# Newest first. The row comparison walks idx_reflections_user from the
+# cursor onwards, so every page costs the same however deep it is.
+PAGE_SQL = """
+    SELECT {columns}
+    FROM reflections
+    WHERE user_id = %(user_id)s {after_cursor}
+    ORDER BY created_at DESC, reflection_id DESC
+    LIMIT %(limit)s;
+"""
+AFTER_CURSOR = """
+      AND (created_at, reflection_id) < (%(after_created_at)s, %(after_id)s)"""
+
+FULL_COLUMNS = "reflection_id, user_id, title, body, created_at"
+SUMMARY_COLUMNS = f"""reflection_id, title,
+           left(body, {SNIPPET_LENGTH}) AS snippet,
+           length(body) > {SNIPPET_LENGTH} AS truncated,
+           created_at"""
+
+
+def encode_cursor(row):
+    raw = f"{row['created_at'].isoformat()}|{row['reflection_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, reflection_id = raw.split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(reflection_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
 
-@router.get("", response_model=List[Reflection])
-async def get_all_reflections(current_user_id: uuid.UUID =
+
+@router.get("", response_model=Union[List[Reflection],
+                                     List[ReflectionSummary]])
+async def get_all_reflections(response: Response,
+                              limit: int = Query(DEFAULT_PAGE_SIZE, ge=1,
+                                                 le=MAX_PAGE_SIZE),
+                              cursor: Optional[str] = None,
+                              view: Literal["full", "summary"] = "full",
+                              current_user_id: uuid.UUID =
                               Depends(get_current_user)):
-    print(f"\n--- 1. get_all_reflections called for user: \
-          {current_user_id} ---")
-    conn = None
-    cur = None
+    """
+    One page of reflections, newest first. If there are more, the
+    X-Next-Cursor header holds the cursor for the next page.
+    view=summary returns a snippet of each body instead of all of it.
+    """
+    after_created_at, after_id = (decode_cursor(cursor) if cursor
+                                  else (None, None))
+    columns = SUMMARY_COLUMNS if view == "summary" else FULL_COLUMNS
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=DictCursor)
-
-        sql_query = """
-            SELECT * FROM reflections
-            WHERE user_id = %s
-            ORDER BY created_at DESC;
-        """
-        cur.execute(sql_query, (current_user_id,))
-
-        reflections = [dict(row) for row in cur.fetchall()]
-        print(f"--- Found {len(reflections)} reflections ---")
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            # One extra row tells us whether there is a next page
+            sql = PAGE_SQL.format(columns=columns,
+                                  after_cursor=AFTER_CURSOR if cursor else "")
+            await cur.execute(sql, {
+                "user_id": current_user_id,
+                "after_created_at": after_created_at,
+                "after_id": after_id,
+                "limit": limit + 1,
+            })
+            reflections = await cur.fetchall()
+
+        if len(reflections) > limit:
+            reflections = reflections[:limit]
+            response.headers["X-Next-Cursor"] = encode_cursor(reflections[-1])
         return reflections
 
-    except psycopg2.Error as db_error:
-        print(f"\n--- !!! DATABASE ERROR !!! ---\n{db_error}")
+    except psycopg.Error:
+        logger.exception("Database error in get_all_reflections")
         raise HTTPException(status_code=500,
                             detail="Database error fetching reflections.")
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-        print("--- Connection closed ---")
+
+
+@router.get("/export")
+async def export_reflections(current_user_id: uuid.UUID =
+                             Depends(get_current_user)):
+    """Every reflection with its full body, streamed as NDJSON."""
+    rows = stream_rows(
+        f"SELECT {FULL_COLUMNS} FROM reflections WHERE user_id = %s \
+        ORDER BY created_at DESC, reflection_id DESC;",
+        (current_user_id,))
+    return StreamingResponse(
+        ndjson_lines(rows), media_type="application/x-ndjson",
+        headers={"Content-Disposition":
+                 'attachment; filename="reflections.ndjson"'})
 
 
 @router.post("", response_model=Reflection, status_code=201)
@@ -53,41 +117,26 @@ async def create_reflection(
     reflection_data: ReflectionCreate,
     current_user_id: uuid.UUID = Depends(get_current_user)
 ):
-    print(f"\n--- 1. create_reflection called for user: {current_user_id} ---")
-    conn = None
-    cur = None
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=DictCursor)
-
-        sql_query = """
-            INSERT INTO reflections (reflection_id, user_id, title, body)
-            VALUES (%s, %s, %s, %s)
-            RETURNING *;
-        """
-        new_reflection_id = uuid.uuid4()
-
-        cur.execute(sql_query, (
-            new_reflection_id,
-            current_user_id,
-            reflection_data.title,
-            reflection_data.body
-        ))
-
-        new_reflection = cur.fetchone()
-        conn.commit()
-        print("--- Reflection created successfully ---")
-        return dict(new_reflection)
-
-    except psycopg2.Error as db_error:
-        print(f"\n--- !!! DATABASE ERROR !!! ---\n{db_error}")
-        if conn:
-            conn.rollback()
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            sql_query = f"""
+                INSERT INTO reflections (reflection_id, user_id, title, body)
+                VALUES (%s, %s, %s, %s)
+                RETURNING {FULL_COLUMNS};
+            """
+            new_reflection_id = uuid.uuid4()
+
+            await cur.execute(sql_query, (
+                new_reflection_id,
+                current_user_id,
+                reflection_data.title,
+                reflection_data.body
+            ))
+
+            new_reflection = await cur.fetchone()
+        return new_reflection
+
+    except psycopg.Error:
+        logger.exception("Database error in create_reflection")
         raise HTTPException(status_code=500,
                             detail="Database error creating reflection.")
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-        print("--- Connection closed ---")
@@ -1,15 +1,20 @@
 # /backend/routers/routines.py
 
+import logging
 import uuid
-import psycopg2
-from psycopg2.extras import DictCursor
+import psycopg
 from fastapi import HTTPException
-from fastapi import Depends
-from database import get_db_connection
+from typing import Optional
+from fastapi import Depends, Header
+from database import async_db_connection
+from core.responses import ORJSONResponse
+from core.etags import user_etag, etag_matches, not_modified, with_etag
 from schemas import RoutineStep, RoutineCreate, RoutineStepCreate
 from fastapi import APIRouter
 from auth import get_current_user
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/api/routines",
     tags=["Routines"]
@@ -17,55 +22,47 @@ router = APIRouter(
 
 
 @router.get("")
-async def get_routines(current_user_id: uuid.UUID = Depends(get_current_user)):
-    print(f"\n--- 1. get_routines called for user: {current_user_id} ---")
-    conn = None
-    cur = None
+async def get_routines(current_user_id: uuid.UUID = Depends(get_current_user),
+                       if_none_match: Optional[str] = Header(None)):
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=DictCursor)
-
-        # 1. Fetch all parent routines for the user
-        print("--- 2. Fetching all routines ---")
-        cur.execute(
-            "SELECT * FROM routines WHERE user_id = %s ORDER BY created_at",
-            (current_user_id,)
-        )
-        routines_rows = cur.fetchall()
-
-        # 2. Fetch all steps for those routines
-        print("--- 3. Fetching all steps for user ---")
-        routine_ids = [row['routine_id'] for row in routines_rows]
-        steps = []
-        if routine_ids:
-            steps_sql = """
-                SELECT * FROM routine_steps
-                WHERE routine_id = ANY(%s)
-                ORDER BY routine_id, step_order
-            """
-            cur.execute(steps_sql, (routine_ids,))
-            steps = cur.fetchall()
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            etag = await user_etag(cur, current_user_id)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+            # 1. Fetch all parent routines for the user
+            await cur.execute(
+                "SELECT * FROM routines WHERE user_id = %s \
+                ORDER BY created_at",
+                (current_user_id,)
+            )
+            routines_rows = await cur.fetchall()
+
+            # 2. Fetch all steps for those routines
+            routine_ids = [row['routine_id'] for row in routines_rows]
+            steps = []
+            if routine_ids:
+                steps_sql = """
+                    SELECT * FROM routine_steps
+                    WHERE routine_id = ANY(%s)
+                    ORDER BY routine_id, step_order
+                """
+                await cur.execute(steps_sql, (routine_ids,))
+                steps = await cur.fetchall()
 
         # 3. Combine routines and steps into a nested structure
-        print("--- 4. Combining data ---")
-        routines_map = {row['routine_id']: dict(row) for row in routines_rows}
+        routines_map = {row['routine_id']: row for row in routines_rows}
         for routine_id in routines_map:
             routines_map[routine_id]['steps'] = []
         for step in steps:
-            routines_map[step['routine_id']]['steps'].append(dict(step))
+            routines_map[step['routine_id']]['steps'].append(step)
 
-        return list(routines_map.values())
+        return with_etag(ORJSONResponse(list(routines_map.values())), etag)
 
-    except psycopg2.Error as db_error:
-        print(f"DB Error: {db_error}")
+    except psycopg.Error:
+        logger.exception("Database error in get_routines")
         raise HTTPException(status_code=500,
                             detail="Database error fetching routines.")
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-        print("--- Connection closed ---")
 
 
 @router.post("", status_code=201)
@@ -73,58 +70,33 @@ async def create_routine(
     routine_data: RoutineCreate,
     current_user_id: uuid.UUID = Depends(get_current_user)
 ):
-    print(f"\n--- 1. create_routine called for user: {current_user_id} ---")
-    conn = None
-    cur = None
     try:
-        print("--- 2. Attempting DB connection ---")
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=DictCursor)
-        print("--- 3. DB connection successful ---")
-
-        sql_query = """
-            INSERT INTO routines (routine_id, user_id, routine_name)
-            VALUES (%s, %s, %s)
-            RETURNING routine_id, routine_name, is_active, created_at;
-        """
-        new_routine_id = uuid.uuid4()
-
-        print(f"--- 4. Executing insert for routine: \
-              '{routine_data.routine_name}' ---")
-        cur.execute(sql_query, (
-            new_routine_id,
-            current_user_id,
-            routine_data.routine_name
-        ))
-
-        new_routine = cur.fetchone()
-
-        print("--- 5. Committing transaction ---")
-        conn.commit()
-
-        print("--- Routine created successfully ---")
-        return dict(new_routine)
-
-    except psycopg2.Error as db_error:
-        print("\n--- !!! DATABASE ERROR !!! ---")
-        print(f"DB Error: {db_error}")
-        if conn:
-            conn.rollback()
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            sql_query = """
+                INSERT INTO routines (routine_id, user_id, routine_name)
+                VALUES (%s, %s, %s)
+                RETURNING routine_id, routine_name, is_active, created_at;
+            """
+            new_routine_id = uuid.uuid4()
+
+            await cur.execute(sql_query, (
+                new_routine_id,
+                current_user_id,
+                routine_data.routine_name
+            ))
+
+            new_routine = await cur.fetchone()
+
+        return new_routine
+
+    except psycopg.Error:
+        logger.exception("Database error in create_routine")
         raise HTTPException(status_code=500,
                             detail="Database error creating routine.")
-    except Exception as e:
-        print("\n--- !!! UNEXPECTED ERROR !!! ---")
-        print(f"Error: {e}")
-        if conn:
-            conn.rollback()
+    except Exception:
+        logger.exception("Unexpected error in create_routine")
         raise HTTPException(status_code=500,
                             detail="An unexpected server error occurred.")
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-        print("--- Connection closed ---")
 
 
 @router.post("/{routine_id}/steps",
@@ -134,66 +106,50 @@ async def create_routine_step(
     step_data: RoutineStepCreate,
     current_user_id: uuid.UUID = Depends(get_current_user)
 ):
-    print(f"\n--- 1. create_routine_step called for routine: {routine_id} ---")
-    conn = None
-    cur = None
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=DictCursor)
-
-        # First, verify the user owns this routine
-        print("--- 2. Verifying routine ownership ---")
-        cur.execute(
-            "SELECT user_id FROM routines WHERE routine_id = %s", (routine_id,)
-        )
-        routine = cur.fetchone()
-
-        if not routine:
-            raise HTTPException(status_code=404,
-                                detail="Routine not found.")
-        if routine['user_id'] != current_user_id:
-            raise HTTPException(status_code=403,
-                                detail="Not authorized to \
-                                modify this routine.")
-
-        # 3. Insert the new step
-        print("--- 3. Inserting new step ---")
-        sql_query = """
-            INSERT INTO routine_steps
-            (step_id, routine_id, step_name, target_duration, step_order)
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING *;
-        """
-        new_step_id = uuid.uuid4()
-        cur.execute(sql_query, (
-            new_step_id,
-            routine_id,
-            step_data.step_name,
-            step_data.target_duration,
-            step_data.step_order
-        ))
-
-        new_step = cur.fetchone()
-        conn.commit()
-        print("--- 4. Step created and committed ---")
-
-        return dict(new_step)
-
-    except psycopg2.Error as db_error:
-        print(f"DB Error: {db_error}")
-        if conn:
-            conn.rollback()
-        raise HTTPException(status_code=500, 
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            # First, verify the user owns this routine
+            await cur.execute(
+                "SELECT user_id FROM routines WHERE routine_id = %s",
+                (routine_id,)
+            )
+            routine = await cur.fetchone()
+
+            if not routine:
+                raise HTTPException(status_code=404,
+                                    detail="Routine not found.")
+            if routine['user_id'] != current_user_id:
+                raise HTTPException(status_code=403,
+                                    detail="Not authorized to \
+                                    modify this routine.")
+
+            # 3. Insert the new step
+            sql_query = """
+                INSERT INTO routine_steps
+                (step_id, routine_id, step_name, target_duration, step_order)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING *;
+            """
+            new_step_id = uuid.uuid4()
+            await cur.execute(sql_query, (
+                new_step_id,
+                routine_id,
+                step_data.step_name,
+                step_data.target_duration,
+                step_data.step_order
+            ))
+
+            new_step = await cur.fetchone()
+
+        return new_step
+
+    except HTTPException as e:
+        raise e
+    except psycopg.Error:
+        logger.exception("Database error in create_routine_step")
+        raise HTTPException(status_code=500,
                             detail="Database error creating routine step.")
-    except Exception as e:
-        print(f"Unexpected Error: {e}")
-        if conn:
-            conn.rollback()
+    except Exception:
+        logger.exception("Unexpected error in create_routine_step")
         raise HTTPException(status_code=500,
                             detail="An unexpected server error occurred.")
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-        print("--- Connection closed ---")
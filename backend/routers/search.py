@@ -0,0 +1,137 @@
+# /backend/routers/search.py
+import logging
+import base64
+import binascii
+import html
+import uuid
+import psycopg
+from typing import List, Literal, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from database import async_db_connection
+from auth import get_current_user
+from schemas import SearchResult
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/search",
+    tags=["Search"]
+)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Control characters ts_headline wraps matches in; the text around them
+# is HTML-escaped before they become <mark> tags
+MATCH_START, MATCH_STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = (f"StartSel={MATCH_START}, StopSel={MATCH_STOP}, "
+                    "MaxWords=30, MinWords=10, MaxFragments=2")
+
+# One branch per source. Each is an index probe on (user_id,
+# search_vector), so the work scales with the matches, not the history.
+SOURCE_SQL = {
+    "reflections": """
+        SELECT 'reflection' AS kind, r.reflection_id AS id,
+               r.created_at::date AS entry_date, r.title,
+               r.body AS text, ts_rank_cd(r.search_vector, q.query) AS rank
+        FROM reflections r, q
+        WHERE r.user_id = %(user_id)s AND r.search_vector @@ q.query
+    """,
+    "checkins": """
+        SELECT 'checkin' AS kind, dc.checkin_id AS id,
+               dc.checkin_date AS entry_date, NULL AS title,
+               concat_ws(E'\\n', dc.gratitude_entry,
+                         dc.principle_alignment_note) AS text,
+               ts_rank_cd(dc.search_vector, q.query) AS rank
+        FROM daily_checkins dc, q
+        WHERE dc.user_id = %(user_id)s AND dc.search_vector @@ q.query
+    """,
+}
+
+# Keyset pagination on (rank, kind, id); headlines are only built for
+# the rows on the page.
+SEARCH_SQL = """
+    WITH q AS (SELECT websearch_to_tsquery('english', %(q)s) AS query),
+    matches AS ({sources}),
+    page AS (
+        SELECT * FROM matches
+        {after_cursor}
+        ORDER BY rank DESC, kind DESC, id DESC
+        LIMIT %(limit)s
+    )
+    SELECT kind, id, entry_date, title, rank,
+           ts_headline('english', text, q.query, %(headline_options)s)
+               AS headline
+    FROM page, q
+    ORDER BY rank DESC, kind DESC, id DESC;
+"""
+AFTER_CURSOR = """
+        WHERE (rank, kind, id)
+              < (%(after_rank)s::real, %(after_kind)s, %(after_id)s)"""
+
+
+def encode_cursor(row):
+    raw = f"{row['rank']!r}|{row['kind']}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        rank, kind, result_id = raw.split("|")
+        return float(rank), kind, uuid.UUID(result_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def highlight(headline):
+    return (html.escape(headline)
+            .replace(MATCH_START, "<mark>")
+            .replace(MATCH_STOP, "</mark>"))
+
+
+@router.get("", response_model=List[SearchResult])
+async def search(response: Response,
+                 q: str = Query(..., min_length=1, max_length=200),
+                 sources: List[Literal["reflections", "checkins"]] =
+                 Query(["reflections", "checkins"]),
+                 limit: int = Query(DEFAULT_PAGE_SIZE, ge=1,
+                                    le=MAX_PAGE_SIZE),
+                 cursor: Optional[str] = None,
+                 current_user_id: uuid.UUID = Depends(get_current_user)):
+    """
+    Full-text search over the user's reflections (title, body) and
+    check-ins (gratitude entry, alignment note), best matches first.
+    q takes web-search syntax: "quoted phrases", or, -excluded.
+    If there are more results, X-Next-Cursor holds the next page's cursor.
+    """
+    params = {
+        "user_id": current_user_id,
+        "q": q,
+        "limit": limit + 1,
+        "headline_options": HEADLINE_OPTIONS,
+    }
+    if cursor:
+        (params["after_rank"], params["after_kind"],
+         params["after_id"]) = decode_cursor(cursor)
+
+    branches = [SOURCE_SQL[source] for source in dict.fromkeys(sources)]
+    sql = SEARCH_SQL.format(sources=" UNION ALL ".join(branches),
+                            after_cursor=AFTER_CURSOR if cursor else "")
+    try:
+        async with async_db_connection() as conn, conn.cursor() as cur:
+            await cur.execute(sql, params)
+            results = await cur.fetchall()
+
+    except psycopg.Error:
+        logger.exception("Database error in search")
+        raise HTTPException(status_code=500,
+                            detail="Database error searching entries.")
+
+    if len(results) > limit:
+        results = results[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(results[-1])
+    for row in results:
+        row["headline"] = highlight(row["headline"])
+    logger.debug("Search", extra={"results": len(results)})
+    return results
@@ -1,7 +1,7 @@
 # /backend/schemas.py
 
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from datetime import date, datetime
 import uuid
 
@@ -21,7 +21,8 @@ class UserLogin(BaseModel):
 class DailyMetricData(BaseModel):
     metric_type: str
     metric_name: str
-    value: int
+    # Same ranges as the CHECK constraints in sql/init.sql
+    value: int = Field(ge=0, le=100)
 
 
 class CompletedRoutineData(BaseModel):
@@ -42,7 +43,7 @@ class CompletedStepData(BaseModel):
 class CheckinCreate(BaseModel):
     checkin_date: date = date.today()
     gratitude_entry: Optional[str] = None
-    principle_alignment: Optional[int] = None
+    principle_alignment: Optional[int] = Field(None, ge=1, le=10)
     principle_alignment_note: Optional[str] = None
     metrics: List[DailyMetricData] = []
     completed_steps: List[CompletedStepData] = []
@@ -112,6 +113,35 @@ class Reflection(BaseModel):
     created_at: datetime
 
 
+class SearchResult(BaseModel):
+    kind: Literal["reflection", "checkin"]
+    id: uuid.UUID  # reflection_id or checkin_id
+    entry_date: date  # Check-in date, or when the reflection was written
+    title: Optional[str] = None  # Reflections only
+    headline: str  # HTML-escaped excerpt, matches wrapped in <mark>
+    rank: float
+
+
+class ReflectionSummary(BaseModel):
+    reflection_id: uuid.UUID
+    title: str
+    snippet: str  # The first characters of the body
+    truncated: bool  # True if the body is longer than the snippet
+    created_at: datetime
+
+
 class ChartData(BaseModel):
     labels: List[date]
     data: List[int]
+
+
+class ChartSeries(BaseModel):
+    metric: str
+    data: List[Optional[float]]
+
+
+class MultiSeriesChartData(BaseModel):
+    granularity: str
+    aggregate: str
+    labels: List[date]
+    series: List[ChartSeries]
@@ -1,216 +1,553 @@
 # /backend/seed.py
+"""
+Synthetic data for development, load tests and benchmarks.
+
+Generates N users with M years of history each across every user-facing
+table: personality traits, principles, routines and their steps, daily
+check-ins with metrics, completed steps and top goals, reflections and
+insights. Each user gets their own habits (how often they check in, how
+well they keep their routines, how their alignment drifts, how much
+they write), so the data is skewed the way real accounts are instead
+of being uniform noise.
+
+Users are generated in chunks across a process pool. Each chunk is
+loaded with COPY from in-memory buffers and its metric rollups are
+rebuilt in the same transaction, so a finished chunk is complete.
+
+    python seed.py --users 10000 --years 3 [--workers 8]
+    python seed.py --user-id <id> --years 1    # fill an existing account
+
+New users are <prefix>-<n>@example.com with the --password given
+(default "password"). --reset first deletes the users an earlier run
+created with the same prefix.
+"""
+import argparse
+import io
+import itertools
+import multiprocessing
+import os
+import time
 import uuid
-import random
-from datetime import date, timedelta
-from database import get_db_connection
-from psycopg2.extras import execute_batch
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as datetime_time
+import numpy as np
+from core.config import pwd_context
+from database import db_connection
+from rollups import rebuild_user_rollups
 
 # -----------------------------------------------------------------
-# --- 1. CONFIGURE YOUR SYNTHETIC DATA HERE ---
+# --- 1. WHAT THE DATA LOOKS LIKE ---
 # -----------------------------------------------------------------
 
-# TODO: Paste the USER_ID (as a string) you want to generate data for.
-USER_ID_TO_POPULATE = "2453ad55-a68c-48e5-b94a-60d28a5974c6"  # <--- EDIT THIS
-
-# TODO: How many days of data do you want to generate?
-NUMBER_OF_DAYS_TO_GENERATE = 60
-
-# --- NEW: Define the routines and steps you want to create ---
-ROUTINES_TO_GENERATE = [
-    {
-        "routine_name": "Morning Routine",
-        "steps": [
-            {"step_name": "Run", "target_duration": 15, "step_order": 1},
-            {"step_name": "Read", "target_duration": 10, "step_order": 2},
-            {"step_name": "Meditate", "target_duration": 5, "step_order": 3}
-        ]
-    },
-    {
-        "routine_name": "Evening Wind-down",
-        "steps": [
-            {"step_name": "Journal", "target_duration": 10, "step_order": 1},
-            {"step_name": "Tidy Up", "target_duration": 5, "step_order": 2}
-        ]
-    }
-]
-
-# These are the metric names your frontend check-in form uses
+# The metric names the check-in form uses. Time Allocation is a
+# percentage split of the day; ratings are 1-10.
 TIME_METRICS = ['Work', 'Family', 'Social', 'Exercise', 'Sleep', 'Maintenance']
 RATING_METRICS = ['Productivity', 'Focus', 'Fun']
 
+# Typical share of the day on weekdays and weekends (same order)
+WEEKDAY_SPLIT = np.array([34, 12, 8, 5, 33, 8], dtype=float)
+WEEKEND_SPLIT = np.array([8, 25, 18, 9, 36, 4], dtype=float)
+
+# (scale, trait >= 50, trait < 50), as the onboarding form stores them
+PERSONALITY_SCALES = [
+    ('Mind', 'Introverted', 'Extraverted'),
+    ('Energy', 'Intuitive', 'Observant'),
+    ('Nature', 'Feeling', 'Thinking'),
+    ('Tactics', 'Judging', 'Prospecting'),
+    ('Identity', 'Turbulent', 'Assertive'),
+]
+
+# Each user picks one morning and maybe one evening routine
+MORNING_ROUTINES = [
+    ("Morning Routine", [("Run", 15), ("Read", 10), ("Meditate", 5)]),
+    ("Morning Routine", [("Stretch", 10), ("Journal", 10)]),
+    ("Early Start", [("Cold Shower", 5), ("Plan the Day", 10),
+                     ("Deep Work Block", 60)]),
+    ("Slow Morning", [("Coffee Outside", 15), ("Read", 20)]),
+]
+EVENING_ROUTINES = [
+    ("Evening Wind-down", [("Journal", 10), ("Tidy Up", 5)]),
+    ("Evening Wind-down", [("Walk", 20), ("No Screens", 30), ("Read", 15)]),
+    ("Shutdown Ritual", [("Review Tasks", 10), ("Plan Tomorrow", 10)]),
+]
+
+GRATITUDE = [
+    "a long call with my sister", "coffee on the balcony", "a quiet morning",
+    "finishing the report early", "dinner with friends",
+    "a good night's sleep", "the walk in the park", "my partner's patience",
+    "a productive deep work session", "the kids laughing at breakfast",
+    "getting back to the gym",
+    "a kind message from an old colleague", "sunshine after a week of rain",
+    "a book I could not put down", "cooking something new",
+    "feeling healthy", "a clear head after meditating", "my team's support",
+]
+NOTES = [
+    "Stayed with the plan even when it got hard.",
+    "Got distracted in the afternoon and drifted.",
+    "Said no to something that did not matter.",
+    "Reacted too quickly in a meeting; need to pause more.",
+    "Good focus on the one thing that mattered.",
+    "Too much motion, not enough progress.",
+    "Took a small step instead of waiting for the perfect moment.",
+]
+GOALS = [
+    "Ship the first draft", "Finish the quarterly review", "Run 5k",
+    "Call the bank", "Clear the inbox", "Write 1000 words",
+    "Fix the flaky deploy", "Plan the weekend trip", "Read two chapters",
+    "Prepare the workshop slides", "Sort out the garage",
+    "Refactor the billing module",
+]
+REFLECTION_TITLES = [
+    "Weekly review", "On focus", "What went wrong", "A good week",
+    "Thinking about habits", "Energy and sleep", "Notes on the project",
+    "Why I keep procrastinating", "Small wins", "Relationships",
+]
+REFLECTION_SENTENCES = [
+    "I noticed that my energy drops every afternoon after lunch.",
+    "The morning routine made the biggest difference this week.",
+    "Work took over again and family time suffered for it.",
+    "I want to spend less time in meetings and more time building.",
+    "Sleep is still the lever I keep ignoring.",
+    "Saying no to the side project was the right call.",
+    "I was anxious about the deadline, so I broke it into smaller steps.",
+    "Exercise keeps coming up as the thing that fixes my mood.",
+    "I spent too long planning and not enough time doing.",
+    "The conversation with my manager went better than expected.",
+    "Journaling at night helps me switch off.",
+    "I keep confusing being busy with making progress.",
+    "Reading before bed instead of scrolling helped my focus the next day.",
+    "This week felt scattered, with too many open loops.",
+]
+INSIGHT_TEMPLATES = [
+    "Your focus is highest on days you sleep more than {n}% of the day.",
+    "You completed your routine {n} days in a row. Keep the streak going!",
+    "Principle alignment has been trending up over the last {n} days.",
+    "Social time dipped to {n}% this week; consider reaching out to a "
+    "friend.",
+    "Days with a top goal were rated {n} points more productive.",
+]
+
 # -----------------------------------------------------------------
-# --- 2. SCRIPT LOGIC (No edits needed below this line) ---
+# --- 2. GENERATION (runs in the worker processes) ---
 # -----------------------------------------------------------------
 
+NULL = "\\N"  # COPY text format
 
-def generate_synthetic_data():
-    if not USER_ID_TO_POPULATE or "your_user_id" in USER_ID_TO_POPULATE:
-        print("!!! ERROR: Please update 'USER_ID_TO_POPULATE' at the top of this script.")
-        return
+# "metric_type\tmetric_name" in the column order of the values
+METRIC_COLUMNS = ([f"Time Allocation\t{name}" for name in TIME_METRICS]
+                  + [f"Daily Rating\t{name}" for name in RATING_METRICS])
 
-    print(f"Connecting to database to generate {NUMBER_OF_DAYS_TO_GENERATE} days of data for user {USER_ID_TO_POPULATE}...")
+# Tables in load order, with the columns each COPY provides. Surrogate
+# keys of the small tables are left to their DEFAULT.
+COPY_COLUMNS = {
+    "users": "user_id, display_name, email, password_hash, "
+             "onboarding_complete, created_at",
+    "personality_traits": "user_id, scale_name, trait_name, value, "
+                          "display_order",
+    "user_principles": "user_id, principle_id, principle_rank",
+    "routines": "routine_id, user_id, routine_name, is_active, created_at",
+    "routine_steps": "step_id, routine_id, step_name, target_duration, "
+                     "step_order",
+    "daily_checkins": "checkin_id, user_id, checkin_date, gratitude_entry, "
+                      "principle_alignment, principle_alignment_note, "
+                      "created_at",
+    "daily_metrics": "metric_id, checkin_id, metric_type, metric_name, "
+                     "value",
+    "completed_steps": "completion_id, checkin_id, step_id, is_completed, "
+                       "actual_duration",
+    "top_goal": "user_id, goal_date, goal_description, is_completed, "
+                "created_at",
+    "reflections": "user_id, title, body, created_at",
+    "insight": "user_id, insight_type, content, generated_at, is_read",
+}
 
-    conn = None
-    cur = None
-    
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
+# Data a --user-id run replaces (steps and metrics go with CASCADE)
+CLEAR_USER_SQL = """
+    DELETE FROM daily_checkins WHERE user_id = ANY(%(user_ids)s);
+    DELETE FROM top_goal WHERE user_id = ANY(%(user_ids)s);
+    DELETE FROM routines WHERE user_id = ANY(%(user_ids)s);
+    DELETE FROM reflections WHERE user_id = ANY(%(user_ids)s);
+    DELETE FROM insight WHERE user_id = ANY(%(user_ids)s);
+    DELETE FROM personality_traits WHERE user_id = ANY(%(user_ids)s);
+    DELETE FROM user_principles WHERE user_id = ANY(%(user_ids)s);
+"""
+
+
+_next_id = None
+
+
+def _ids_per_user(days):
+    """Most ids generate_user() can take for one user: routines and
+    their steps, then per day a check-in, its metrics and a completion
+    per routine step."""
+    routine_ids = sum(1 + max(len(steps) for _, steps in options)
+                      for options in (MORNING_ROUTINES, EVENING_ROUTINES))
+    steps = routine_ids - 2
+    return routine_ids + days * (1 + len(METRIC_COLUMNS) + steps)
+
+
+def _stream_bits(users, chunk_size, days):
+    """Bits of counter each id stream needs so none can run into the
+    next: the parent's user ids, or a full chunk's worth of users."""
+    return max(users, chunk_size * _ids_per_user(days)).bit_length()
+
+
+def _start_ids(end_date, stream, stream_bits):
+    """
+    Starts the (unix ms << 12) + counter sequence _uuids() takes its
+    timestamps from. It begins at midnight UTC of end_date rather than
+    the clock, offset by stream << stream_bits (stream 0 for the parent,
+    one per chunk), so the same --seed and end date give the same ids
+    whichever worker loads a chunk.
+    """
+    global _next_id
+    epoch = datetime.combine(end_date, datetime_time(),
+                             timezone.utc).timestamp()
+    _next_id = itertools.count((int(epoch) * 1000 << 12)
+                               + (stream << stream_bits)).__next__
+
+
+def _uuids(rng, n):
+    """
+    n UUIDv7-layout ids: a millisecond timestamp and counter first, then
+    random bits. Being ascending, they are appended to the right-hand
+    edge of the key indexes instead of landing on random pages the way
+    uuid4 keys do, which roughly halves the COPY time of the big tables.
+    """
+    tails = np.frombuffer(rng.bytes(8 * n), dtype=np.uint64)
+    ids = []
+    for tail in tails.tolist():
+        head = _next_id()
+        ids.append(str(uuid.UUID(int=(
+            (head >> 12 << 16 | 0x7000 | head & 0xfff) << 64
+            | 1 << 63 | tail >> 2))))
+    return ids
+
+
+def _timestamp(day, minutes):
+    return f"{day} {minutes // 60:02d}:{minutes % 60:02d}:00+00"
+
+
+def _split_percentages(rng, weekend, concentration, weights):
+    """Time Allocation rows (in %, summing to 100) for each day."""
+    alpha = np.where(weekend[:, None], WEEKEND_SPLIT, WEEKDAY_SPLIT)
+    alpha = alpha * weights * concentration / 100
+    shares = rng.gamma(alpha)
+    shares /= shares.sum(axis=1, keepdims=True)
+    values = np.floor(shares * 100).astype(int)
+    # Hand the rounding remainder to each day's largest share
+    values[np.arange(len(values)), values.argmax(axis=1)] += \
+        100 - values.sum(axis=1)
+    return values
+
+
+def _rating(rng, base, signal, noise=1.2):
+    values = np.rint(base + signal + rng.normal(0, noise, len(signal)))
+    return np.clip(values, 1, 10).astype(int)
 
-        today = date.today()
-        user_uuid = uuid.UUID(USER_ID_TO_POPULATE)
-        
-        # --- NEW: Clear old data for this user ---
-        print(f"--- Clearing old synthetic data for user {user_uuid} ---")
-        cur.execute("DELETE FROM daily_checkins WHERE user_id = %s;", (user_uuid,))
-        cur.execute("DELETE FROM top_goal WHERE user_id = %s;", (user_uuid,))
-        cur.execute("DELETE FROM routines WHERE user_id = %s;", (user_uuid,))
-        # Note: 'routine_steps' and 'completed_steps' are cleared by CASCADE
-        
-        # --- NEW: Generate Routines and Steps ---
-        print(f"--- Generating {len(ROUTINES_TO_GENERATE)} routines and their steps ---")
-        
-        # This list will hold the generated steps to be used later
-        generated_steps_for_checkin = [] 
-
-        for routine in ROUTINES_TO_GENERATE:
-            # 1. Create the parent routine
-            routine_id = uuid.uuid4()
-            cur.execute(
-                "INSERT INTO routines (routine_id, user_id, routine_name) VALUES (%s, %s, %s);",
-                (routine_id, user_uuid, routine['routine_name'])
-            )
-            
-            # 2. Create the steps for this routine
-            steps_to_insert = []
-            for step in routine['steps']:
-                step_id = uuid.uuid4()
-                steps_to_insert.append((
-                    step_id,
-                    routine_id,
-                    step['step_name'],
-                    step['target_duration'],
-                    step['step_order']
-                ))
-                # Add to our list for later use
-                generated_steps_for_checkin.append({
-                    "step_id": str(step_id), # Store as string for easy comparison
-                    "target_duration": step['target_duration']
-                })
-            
-            execute_batch(cur, 
-                "INSERT INTO routine_steps (step_id, routine_id, step_name, target_duration, step_order) VALUES (%s, %s, %s, %s, %s);",
-                steps_to_insert
-            )
-        
-        print(f"--- Routines created. Total steps generated: {len(generated_steps_for_checkin)} ---")
-
-        # --- Generate Check-in Data (Main Loop) ---
-        print(f"--- Generating {NUMBER_OF_DAYS_TO_GENERATE} days of check-in data ---")
-        checkins_to_insert = []
-        metrics_to_insert = []
-        goals_to_insert = []
-        steps_to_insert = []
-
-        for i in range(NUMBER_OF_DAYS_TO_GENERATE):
-            current_date = today - timedelta(days=i)
-            
-            # --- 1. Create Daily Check-in ---
-            checkin_id = uuid.uuid4()
-            base_alignment = 8 - (i * 0.1) # Trends from ~2 (60 days ago) to 8 (today)
-            principle_alignment = max(1, min(10, int(base_alignment + random.uniform(-1, 1))))
-            
-            checkins_to_insert.append((
-                checkin_id, user_uuid, current_date,
-                f"Synthetic gratitude for {current_date}.",
-                principle_alignment, f"Synthetic note for {current_date}."
-            ))
-
-            # --- 2. Create Top Goal ---
-            goals_to_insert.append((
-                uuid.uuid4(), user_uuid, current_date,
-                f"Synthetic top goal for {current_date}",
-                random.choice([True, True, False])
-            ))
-
-            # --- 3. Create Daily Metrics ---
-            for metric_name in TIME_METRICS:
-                metrics_to_insert.append((
-                    uuid.uuid4(), checkin_id, 'Time Allocation', metric_name, random.randint(5, 25)
-                ))
-            for metric_name in RATING_METRICS:
-                metrics_to_insert.append((
-                    uuid.uuid4(), checkin_id, 'Daily Rating', metric_name, random.randint(4, 9)
-                ))
-
-            # --- 4. Create Completed Steps (using generated steps) ---
-            for step in generated_steps_for_checkin:
-                is_completed = random.choice([True, True, False])
-                actual_duration = None
-                if is_completed and step["target_duration"]:
-                    duration = step["target_duration"]
-                    actual_duration = max(5, random.randint(duration - 5, duration + 5))
-                
-                steps_to_insert.append((
-                    uuid.uuid4(), checkin_id, uuid.UUID(step["step_id"]), is_completed, actual_duration
-                ))
-
-        print(f"Generated data. Inserting into database...")
-
-        # --- Execute all inserts in batches ---
-        execute_batch(cur,
-            """
-            INSERT INTO daily_checkins (checkin_id, user_id, checkin_date, gratitude_entry, principle_alignment, principle_alignment_note)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """, 
-            checkins_to_insert
-        )
-        print(f"Inserted {len(checkins_to_insert)} daily_checkins.")
-
-        execute_batch(cur,
-            """
-            INSERT INTO top_goal (goal_id, user_id, goal_date, goal_description, is_completed)
-            VALUES (%s, %s, %s, %s, %s)
-            """, 
-            goals_to_insert
-        )
-        print(f"Inserted {len(goals_to_insert)} top_goals.")
-
-        execute_batch(cur, 
-            """
-            INSERT INTO daily_metrics (metric_id, checkin_id, metric_type, metric_name, value)
-            VALUES (%s, %s, %s, %s, %s)
-            """, 
-            metrics_to_insert
-        )
-        print(f"Inserted {len(metrics_to_insert)} daily_metrics.")
-        
-        execute_batch(cur, 
-            """
-            INSERT INTO completed_steps (completion_id, checkin_id, step_id, is_completed, actual_duration)
-            VALUES (%s, %s, %s, %s, %s)
-            """, 
-            steps_to_insert
-        )
-        print(f"Inserted {len(steps_to_insert)} completed_steps.")
-
-        # --- Commit all changes ---
-        conn.commit()
-        print("\n--- ✅ All data committed successfully! ---")
 
-    except Exception as e:
-        print(f"\n--- !!! AN ERROR OCCURRED !!! ---")
-        print(f"Error: {e}")
-        if conn:
+def _checkin_days(rng, days):
+    """Which of the days the user checked in on: a personal rate, plus
+    a few lapses (holidays, busy spells) with no check-ins at all."""
+    present = rng.random(days) < rng.beta(6, 2)
+    for _ in range(rng.poisson(days / 180)):
+        start = rng.integers(0, days)
+        present[start:start + rng.integers(3, 21)] = False
+    return np.flatnonzero(present)
+
+
+def generate_user(rng, out, user_id, first_day, days, principle_ids,
+                  new_user=None):
+    """
+    Appends one user's rows, in COPY text format, to the buffers in out.
+    new_user is (email, display_name, password_hash) to create the user
+    row too, or None to fill an existing account.
+    """
+    joined = _timestamp(first_day, int(rng.integers(8 * 60, 22 * 60)))
+    if new_user:
+        email, display_name, password_hash = new_user
+        out["users"].write(f"{user_id}\t{display_name}\t{email}\t"
+                           f"{password_hash}\tt\t{joined}\n")
+
+    # --- Who this user is ---
+    personality = {}
+    for order, (scale, high, low) in enumerate(PERSONALITY_SCALES, 1):
+        value = int(np.clip(rng.normal(50, 20), 0, 100))
+        trait, value = (high, value) if value >= 50 else (low, 100 - value)
+        personality[trait] = value
+        out["personality_traits"].write(
+            f"{user_id}\t{scale}\t{trait}\t{value}\t{order}\n")
+
+    # Popular principles get picked far more often than the long tail
+    popularity = 1 / np.arange(1, len(principle_ids) + 1) ** 0.8
+    picked = rng.choice(len(principle_ids), size=min(
+        int(rng.integers(3, 8)), len(principle_ids)), replace=False,
+        p=popularity / popularity.sum())
+    for rank, index in enumerate(picked, 1):
+        out["user_principles"].write(
+            f"{user_id}\t{principle_ids[index]}\t{rank}\n")
+
+    steps = []  # (step_id, target_duration, difficulty)
+    routines = [MORNING_ROUTINES[rng.integers(len(MORNING_ROUTINES))]]
+    if rng.random() < 0.6:
+        routines.append(EVENING_ROUTINES[rng.integers(len(EVENING_ROUTINES))])
+    for routine_name, routine_steps in routines:
+        routine_id, *step_ids = _uuids(rng, 1 + len(routine_steps))
+        out["routines"].write(
+            f"{routine_id}\t{user_id}\t{routine_name}\tt\t{joined}\n")
+        for order, ((step_name, target), step_id) in enumerate(
+                zip(routine_steps, step_ids), 1):
+            out["routine_steps"].write(
+                f"{step_id}\t{routine_id}\t{step_name}\t{target}\t{order}\n")
+            steps.append((step_id, target, rng.uniform(0.6, 1.0)))
+
+    # --- Their habits ---
+    adherence = rng.beta(5, 2)
+    gratitude_rate = rng.beta(2, 2)
+    note_rate = rng.beta(1, 4)
+    goal_rate = rng.beta(4, 2)
+    reflections_per_week = rng.gamma(1.0, 0.8)
+    alignment_base = rng.normal(6, 1.3)
+    # Points per year; most people improve a little, some slide
+    alignment_trend = rng.normal(0.4, 0.8)
+    time_weights = rng.lognormal(0, 0.25, len(TIME_METRICS))
+    time_concentration = rng.uniform(60, 200)
+    sociable = personality.get('Extraverted', 0) - \
+        personality.get('Introverted', 0)
+
+    # --- Their days ---
+    day_index = _checkin_days(rng, days)
+    n = len(day_index)
+    if n:
+        dates = [first_day + timedelta(days=int(i)) for i in day_index]
+        weekend = np.array([d.weekday() >= 5 for d in dates])
+        split = _split_percentages(rng, weekend, time_concentration,
+                                   time_weights)
+        years_in = day_index / 365
+        alignment = _rating(rng, alignment_base,
+                            alignment_trend * years_in, noise=1.0)
+        sleep_delta = (split[:, 4] - 33) / 5
+        productivity = _rating(rng, 5.5, (split[:, 0] - 30) / 10
+                               + (alignment - 6) / 3)
+        focus = _rating(rng, 6, sleep_delta)
+        fun = _rating(rng, 5.5, (split[:, 1] + split[:, 2] - 25) / 8
+                      + sociable / 60)
+
+        has_gratitude = rng.random(n) < gratitude_rate
+        has_note = rng.random(n) < note_rate
+        gratitude_pick = rng.integers(len(GRATITUDE), size=n)
+        note_pick = rng.integers(len(NOTES), size=n)
+        created_minute = rng.integers(19 * 60, 24 * 60, size=n)
+        checkin_ids = _uuids(rng, n)
+
+        checkins = out["daily_checkins"]
+        for i, (checkin_id, day) in enumerate(zip(checkin_ids, dates)):
+            gratitude = (f"Grateful for {GRATITUDE[gratitude_pick[i]]}."
+                         if has_gratitude[i] else NULL)
+            note = NOTES[note_pick[i]] if has_note[i] else NULL
+            checkins.write(
+                f"{checkin_id}\t{user_id}\t{day}\t{gratitude}\t"
+                f"{alignment[i]}\t{note}\t"
+                f"{_timestamp(day, int(created_minute[i]))}\n")
+
+        metric_values = np.column_stack(
+            [split, productivity, focus, fun]).tolist()
+        metric_ids = iter(_uuids(rng, n * len(METRIC_COLUMNS)))
+        out["daily_metrics"].write("".join(
+            f"{next(metric_ids)}\t{checkin_id}\t{metric}\t{value}\n"
+            for checkin_id, values in zip(checkin_ids, metric_values)
+            for metric, value in zip(METRIC_COLUMNS, values)))
+
+        # Routine steps: kept more often on good days, durations wander
+        completed = out["completed_steps"]
+        good_day = (alignment - 5) / 20
+        for step_id, target, difficulty in steps:
+            done = rng.random(n) < adherence * difficulty + good_day
+            duration = np.maximum(
+                1, np.rint(rng.normal(target, target * 0.25 + 1, n)))
+            completion_ids = _uuids(rng, n)
+            completed.write("".join(
+                f"{completion_ids[i]}\t{checkin_id}\t{step_id}\t"
+                f"{'t' if done[i] else 'f'}\t"
+                f"{int(duration[i]) if done[i] else NULL}\n"
+                for i, checkin_id in enumerate(checkin_ids)))
+
+        goal_rows = np.flatnonzero(rng.random(n) < goal_rate)
+        goal_done = rng.random(n) < 0.35 + productivity / 20
+        goal_pick = rng.integers(len(GOALS), size=n)
+        out["top_goal"].write("".join(
+            f"{user_id}\t{dates[i]}\t{GOALS[goal_pick[i]]}\t"
+            f"{'t' if goal_done[i] else 'f'}\t"
+            f"{_timestamp(dates[i], 7 * 60 + int(created_minute[i]) % 120)}\n"
+            for i in goal_rows))
+
+        # Roughly one insight a week, the recent ones still unread
+        insight_rows = np.flatnonzero(rng.random(n) < 0.15)
+        templates = rng.integers(len(INSIGHT_TEMPLATES), size=n)
+        out["insight"].write("".join(
+            f"{user_id}\tDaily Tidbit\t"
+            f"{INSIGHT_TEMPLATES[templates[i]].format(n=rng.integers(3, 40))}"
+            f"\t{_timestamp(dates[i], int(created_minute[i]))}\t"
+            f"{'f' if day_index[i] > days - 14 else 't'}\n"
+            for i in insight_rows))
+
+    # Reflections are written on any day, checked in or not
+    reflection_days = np.flatnonzero(
+        rng.random(days) < reflections_per_week / 7)
+    reflections = out["reflections"]
+    for i in reflection_days:
+        day = first_day + timedelta(days=int(i))
+        body = " ".join(REFLECTION_SENTENCES[j] for j in rng.choice(
+            len(REFLECTION_SENTENCES), size=int(rng.integers(2, 8))))
+        title = REFLECTION_TITLES[rng.integers(len(REFLECTION_TITLES))]
+        reflections.write(
+            f"{user_id}\t{title}\t{body}\t"
+            f"{_timestamp(day, int(rng.integers(6 * 60, 24 * 60)))}\n")
+
+    return n
+
+
+def seed_chunk(job):
+    """Generates and loads one chunk of users. Runs in a worker process."""
+    (users, days, end_date, principle_ids, password_hash, seed,
+     stream_bits) = job
+    rng = np.random.default_rng(seed)
+    _start_ids(end_date, 1 + seed[1], stream_bits)
+    first_day = end_date - timedelta(days=days - 1)
+    out = {table: io.StringIO() for table in COPY_COLUMNS}
+
+    checkins = 0
+    for user_id, new_user in users:
+        checkins += generate_user(
+            rng, out, user_id, first_day, days, principle_ids,
+            (*new_user, password_hash) if new_user else None)
+
+    user_ids = [uuid.UUID(user_id) for user_id, _ in users]
+    with db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            if not users[0][1]:
+                cur.execute(CLEAR_USER_SQL, {"user_ids": user_ids})
+            rows = 0
+            for table, columns in COPY_COLUMNS.items():
+                buffer = out.pop(table)
+                buffer.seek(0)
+                cur.copy_expert(
+                    f"COPY {table} ({columns}) FROM STDIN", buffer)
+                rows += cur.rowcount
+            rebuild_user_rollups(cur, user_ids)
+            conn.commit()
+        except Exception:
             conn.rollback()
-            print("--- Transaction rolled back. ---")
-    finally:
-        if cur:
+            raise
+        finally:
             cur.close()
-        if conn:
-            conn.close()
-        print("--- Database connection closed. ---")
+    return len(users), checkins, rows
+
+
+# -----------------------------------------------------------------
+# --- 3. ORCHESTRATION ---
+# -----------------------------------------------------------------
+
+def _prepare(prefix, reset):
+    """Returns the principle ids, after an optional --reset."""
+    with db_connection() as conn:
+        cur = conn.cursor()
+        if reset:
+            cur.execute("DELETE FROM users WHERE email LIKE %s;",
+                        (f"{prefix}-%@example.com",))
+            print(f"--- Removed {cur.rowcount} earlier '{prefix}' users ---")
+        cur.execute("SELECT principle_id FROM principles "
+                    "ORDER BY principle_id;")
+        principle_ids = [str(row[0]) for row in cur.fetchall()]
+        conn.commit()
+        cur.close()
+    return principle_ids
+
+
+def seed(users=0, years=1, user_ids=(), workers=None, chunk_size=50,
+         prefix="seed", password="password", reset=False, random_seed=0,
+         end_date=None):
+    """
+    Creates users new accounts (and/or fills the existing user_ids) with
+    years of history ending at end_date (default today). Returns
+    (users, checkins, rows) loaded.
+    """
+    workers = workers or os.cpu_count() or 1
+    days = int(round(years * 365))
+    end_date = end_date or date.today()
+
+    principle_ids = _prepare(prefix, reset)
+    if not principle_ids:
+        raise SystemExit("!!! The principles table is empty; load "
+                         "sql/personality.sql first.")
+
+    password_hash = pwd_context.hash(password)
+    rng = np.random.default_rng(random_seed)
+    stream_bits = _stream_bits(users, chunk_size, days)
+    _start_ids(end_date, 0, stream_bits)
+    new_users = [(user_id, (f"{prefix}-{n:06d}@example.com",
+                            f"Seed User {n}"))
+                 for n, user_id in enumerate(_uuids(rng, users))]
+    existing = [(str(user_id), None) for user_id in user_ids]
+
+    jobs = []
+    for group in (new_users, existing):
+        for i in range(0, len(group), chunk_size):
+            jobs.append((group[i:i + chunk_size], days, end_date,
+                         principle_ids, password_hash,
+                         [random_seed, len(jobs)], stream_bits))
+
+    print(f"--- Seeding {len(new_users) + len(existing)} users x {days} "
+          f"days ({len(jobs)} chunks, {workers} workers) ---")
+    started = time.monotonic()
+    done = [0, 0, 0]
+    # spawn, not fork: the parent already holds pooled connections
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=context) as pool:
+        for future in as_completed([pool.submit(seed_chunk, job)
+                                    for job in jobs]):
+            done = [a + b for a, b in zip(done, future.result())]
+            elapsed = time.monotonic() - started
+            print(f"--- {done[0]} users, {done[1]} check-ins, "
+                  f"{done[2]} rows ({done[2] / elapsed:,.0f} rows/s) ---")
+
+    with db_connection() as conn:
+        conn.autocommit = True
+        conn.cursor().execute("ANALYZE;")
+        conn.autocommit = False
+
+    elapsed = time.monotonic() - started
+    print(f"\n--- ✅ Seeded {done[0]} users ({done[2]} rows) in "
+          f"{elapsed:.1f}s ---")
+    return tuple(done)
+
 
-# --- Run the function when the script is executed ---
 if __name__ == "__main__":
-    generate_synthetic_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic users and history.")
+    parser.add_argument("--users", type=int, default=0,
+                        help="New users to create.")
+    parser.add_argument("--years", type=float, default=1,
+                        help="History per user, ending today.")
+    parser.add_argument("--user-id", action="append", type=uuid.UUID,
+                        default=[], help="Replace this existing user's "
+                        "data instead (repeatable).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=50,
+                        help="Users per COPY transaction.")
+    parser.add_argument("--prefix", default="seed",
+                        help="Email prefix of the new users.")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--reset", action="store_true",
+                        help="Delete earlier users with this prefix first.")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Random seed; the same seed and end date "
+                        "(today) give the same data, ids included.")
+    args = parser.parse_args()
+    if not args.users and not args.user_id:
+        parser.error("give --users and/or --user-id")
+    seed(args.users, args.years, args.user_id, args.workers,
+         args.chunk_size, args.prefix, args.password, args.reset, args.seed)
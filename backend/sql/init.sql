@@ -9,11 +9,18 @@ DROP TABLE IF EXISTS daily_checkins CASCADE;
 DROP TABLE IF EXISTS routines CASCADE;
 DROP TABLE IF EXISTS user_principles CASCADE;
 DROP TABLE IF EXISTS principles CASCADE;
+DROP TABLE IF EXISTS catalog_versions CASCADE;
 DROP TABLE IF EXISTS personality_traits CASCADE;
 DROP TABLE IF EXISTS reflections CASCADE;
+DROP TABLE IF EXISTS metric_rollups CASCADE;
+DROP TABLE IF EXISTS insight_jobs CASCADE;
 DROP TABLE IF EXISTS insight CASCADE;
+DROP TABLE IF EXISTS revoked_tokens CASCADE;
 DROP TABLE IF EXISTS users CASCADE;
 
+-- Lets the full-text GIN indexes lead with user_id (trusted since PG 13)
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
 -- User and Profile Tables
 CREATE TABLE users (
     user_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -21,7 +28,18 @@ CREATE TABLE users (
     email VARCHAR(255) UNIQUE NOT NULL,
     password_hash VARCHAR(255) NOT NULL,
     onboarding_complete BOOLEAN DEFAULT FALSE,
-    created_at TIMESTAMPTZ DEFAULT NOW()
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    -- Bumped by trigger whenever the user's data changes; the ETags of
+    -- the read endpoints are built from it (core/etags.py)
+    data_version BIGINT NOT NULL DEFAULT 0
+);
+
+-- Access tokens revoked by logout, kept until they would have expired
+CREATE TABLE revoked_tokens (
+    token_hash BYTEA PRIMARY KEY, -- SHA-256 of the token
+    user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    expires_at TIMESTAMPTZ NOT NULL,
+    revoked_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
 CREATE TABLE personality_traits (
@@ -39,6 +57,14 @@ CREATE TABLE principles (
     description TEXT
 );
 
+-- Version of shared reference data, bumped by trigger on every change
+-- (ETag of GET /api/principles)
+CREATE TABLE catalog_versions (
+    catalog VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO catalog_versions (catalog) VALUES ('principles');
+
 CREATE TABLE user_principles (
     user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
     principle_id UUID NOT NULL REFERENCES principles(principle_id) ON DELETE CASCADE,
@@ -72,10 +98,64 @@ CREATE TABLE daily_checkins (
     gratitude_entry TEXT,
     principle_alignment INTEGER CHECK (principle_alignment >= 1 AND principle_alignment <= 10),
     principle_alignment_note TEXT,
+    -- 1..n position among the user's non-empty gratitude entries, kept
+    -- dense and unique by the triggers below so the dashboard can sample
+    -- one in O(log n)
+    gratitude_seq INTEGER,
     created_at TIMESTAMPTZ DEFAULT NOW(),
+    -- Full-text search (GET /api/search); maintained by Postgres on write
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(gratitude_entry, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(principle_alignment_note, '')), 'B')
+    ) STORED,
     UNIQUE(user_id, checkin_date)
 );
 
+-- Writers of one user's sequence are serialised by a transaction-level
+-- advisory lock, so concurrent inserts cannot take the same number
+CREATE OR REPLACE FUNCTION assign_gratitude_seq() RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.gratitude_entry IS NULL OR NEW.gratitude_entry = '' THEN
+        -- A cleared entry leaves a gap, filled by fill_gratitude_seq_gap()
+        NEW.gratitude_seq := NULL;
+    ELSIF TG_OP = 'UPDATE' AND OLD.gratitude_seq IS NOT NULL THEN
+        NEW.gratitude_seq := OLD.gratitude_seq;
+    ELSE
+        PERFORM pg_advisory_xact_lock(hashtext(NEW.user_id::text));
+        SELECT COALESCE(MAX(gratitude_seq), 0) + 1 INTO NEW.gratitude_seq
+        FROM daily_checkins
+        WHERE user_id = NEW.user_id AND gratitude_seq IS NOT NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_daily_checkins_gratitude_seq
+BEFORE INSERT OR UPDATE OF gratitude_entry ON daily_checkins
+FOR EACH ROW EXECUTE FUNCTION assign_gratitude_seq();
+
+-- When an entry is cleared or deleted, the user's highest number moves
+-- into its slot, so the numbers stay 1..n
+CREATE OR REPLACE FUNCTION fill_gratitude_seq_gap() RETURNS TRIGGER AS $$
+BEGIN
+    IF OLD.gratitude_seq IS NULL
+       OR (TG_OP = 'UPDATE' AND NEW.gratitude_seq IS NOT NULL) THEN
+        RETURN NULL;
+    END IF;
+    PERFORM pg_advisory_xact_lock(hashtext(OLD.user_id::text));
+    UPDATE daily_checkins SET gratitude_seq = OLD.gratitude_seq
+    WHERE user_id = OLD.user_id
+      AND gratitude_seq > OLD.gratitude_seq
+      AND gratitude_seq = (SELECT MAX(gratitude_seq) FROM daily_checkins
+                           WHERE user_id = OLD.user_id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_daily_checkins_gratitude_seq_gap
+AFTER UPDATE OF gratitude_entry OR DELETE ON daily_checkins
+FOR EACH ROW EXECUTE FUNCTION fill_gratitude_seq_gap();
+
 CREATE TABLE daily_metrics (
     metric_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     checkin_id UUID NOT NULL REFERENCES daily_checkins(checkin_id) ON DELETE CASCADE,
@@ -103,6 +183,23 @@ CREATE TABLE top_goal (
     UNIQUE(user_id, goal_date)
 );
 
+-- Weekly/monthly aggregates of every daily metric and of
+-- principle_alignment, kept up to date by rollups.py so long-range
+-- charts never rescan the daily rows. metric is 'principle_alignment'
+-- or '<metric_type>:<metric_name>'.
+CREATE TABLE metric_rollups (
+    user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    granularity VARCHAR(5) NOT NULL CHECK (granularity IN ('week', 'month')),
+    period_start DATE NOT NULL,
+    metric VARCHAR(511) NOT NULL,
+    value_count INTEGER NOT NULL,
+    value_sum BIGINT NOT NULL,
+    value_min INTEGER NOT NULL,
+    value_max INTEGER NOT NULL,
+    value_mean NUMERIC GENERATED ALWAYS AS (value_sum::NUMERIC / NULLIF(value_count, 0)) STORED,
+    PRIMARY KEY (user_id, granularity, metric, period_start)
+);
+
 -- Insight Table (Generated coaching advice)
 CREATE TABLE insight (
     insight_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -113,6 +210,20 @@ CREATE TABLE insight (
     is_read BOOLEAN DEFAULT FALSE
 );
 
+-- Background insight generation queue (INSIGHT_QUEUE_BACKEND=postgres)
+CREATE TABLE insight_jobs (
+    job_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    insight_type VARCHAR(255) NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'done', 'failed')),
+    insight_id UUID REFERENCES insight(insight_id) ON DELETE SET NULL,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ
+);
+
 -- Focus Tracker Tables
 CREATE TABLE tasks (
     task_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -121,7 +232,7 @@ CREATE TABLE tasks (
     task_description TEXT NOT NULL,
     priority INTEGER, -- For the 1, 2, 3 weighting
     is_completed BOOLEAN DEFAULT FALSE,
-    created_at TIMESTPTZ DEFAULT NOW(),
+    created_at TIMESTAMPTZ DEFAULT NOW(),
     UNIQUE(user_id, task_date, task_description) -- Prevent duplicate tasks on the same day
 );
 
@@ -129,7 +240,7 @@ CREATE TABLE time_log_entries (
     entry_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     task_id UUID NOT NULL REFERENCES tasks(task_id) ON DELETE CASCADE,
     start_time TIMESTAMPTZ NOT NULL,
-    end_time TIMESTPTZ, -- Can be NULL if the timer is still running
+    end_time TIMESTAMPTZ, -- Can be NULL if the timer is still running
     distractions INTEGER DEFAULT 0 -- Counter for distractions
 );
 
@@ -139,22 +250,96 @@ CREATE TABLE reflections (
     user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
     title VARCHAR(255) NOT NULL,
     body TEXT NOT NULL,
-    created_at TIMESTAMPTZ DEFAULT NOW()
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    -- Full-text search (GET /api/search); maintained by Postgres on write
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', title), 'A') ||
+        setweight(to_tsvector('english', body), 'B')
+    ) STORED
 );
 
 -- Optional: Add Indexes
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_personality_traits_user ON personality_traits(user_id);
 CREATE INDEX idx_checkins_user_date ON daily_checkins(user_id, checkin_date);
+CREATE UNIQUE INDEX idx_checkins_gratitude_seq ON daily_checkins(user_id, gratitude_seq) WHERE gratitude_seq IS NOT NULL;
 CREATE INDEX idx_metrics_checkin ON daily_metrics(checkin_id);
 CREATE INDEX idx_routines_user ON routines(user_id);
 CREATE INDEX idx_routine_steps_routine ON routine_steps(routine_id);
 CREATE INDEX idx_completed_steps_checkin ON completed_steps(checkin_id);
 CREATE INDEX idx_top_goal_user_date ON top_goal(user_id, goal_date);
 CREATE INDEX idx_insight_user ON insight(user_id);
+-- At most one queued job per user; also the enqueue conflict target
+CREATE UNIQUE INDEX idx_insight_jobs_queued_user ON insight_jobs(user_id) WHERE status = 'queued';
+CREATE INDEX idx_insight_jobs_pending ON insight_jobs(created_at) WHERE status IN ('queued', 'running');
 CREATE INDEX idx_tasks_user_date ON tasks(user_id, task_date);
 CREATE INDEX idx_time_log_task ON time_log_entries(task_id);
 CREATE INDEX idx_reflections_user ON reflections(user_id, created_at);
+-- (user_id, search_vector) so a search only visits the user's own matches
+CREATE INDEX idx_reflections_search ON reflections USING GIN (user_id, search_vector);
+CREATE INDEX idx_checkins_search ON daily_checkins USING GIN (user_id, search_vector);
+
+-- Data versions for ETags. Statement-level triggers with transition
+-- tables, so a COPY or bulk import bumps each user once rather than once
+-- per row. TG_ARGV[0] selects the user ids of the "changed" rows.
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS TRIGGER AS $$
+BEGIN
+    EXECUTE format('UPDATE users SET data_version = data_version + 1
+                    WHERE user_id IN (%s)', TG_ARGV[0]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- A trigger with a transition table can only have one event, hence
+-- three per table
+DO $$
+DECLARE
+    source RECORD;
+    event TEXT;
+BEGIN
+    FOR source IN SELECT * FROM (VALUES
+        ('daily_checkins', 'SELECT user_id FROM changed'),
+        ('daily_metrics', 'SELECT dc.user_id FROM changed
+                           JOIN daily_checkins dc USING (checkin_id)'),
+        ('completed_steps', 'SELECT dc.user_id FROM changed
+                             JOIN daily_checkins dc USING (checkin_id)'),
+        ('top_goal', 'SELECT user_id FROM changed'),
+        ('metric_rollups', 'SELECT user_id FROM changed'),
+        ('insight', 'SELECT user_id FROM changed'),
+        ('routines', 'SELECT user_id FROM changed'),
+        ('routine_steps', 'SELECT r.user_id FROM changed
+                           JOIN routines r USING (routine_id)'),
+        ('personality_traits', 'SELECT user_id FROM changed'),
+        ('user_principles', 'SELECT user_id FROM changed')
+    ) AS t(table_name, user_ids)
+    LOOP
+        FOREACH event IN ARRAY ARRAY['INSERT', 'UPDATE', 'DELETE'] LOOP
+            EXECUTE format(
+                'CREATE TRIGGER %I AFTER %s ON %I
+                 REFERENCING %s TABLE AS changed
+                 FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version(%L)',
+                'trg_' || source.table_name || '_version_' || lower(event),
+                event, source.table_name,
+                CASE event WHEN 'DELETE' THEN 'OLD' ELSE 'NEW' END,
+                source.user_ids);
+        END LOOP;
+    END LOOP;
+END;
+$$;
+
+-- Also tells the app processes to reload their copy (core/catalog.py)
+CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE catalog_versions SET version = version + 1
+    WHERE catalog = TG_ARGV[0];
+    PERFORM pg_notify('catalog_changed', TG_ARGV[0]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_principles_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON principles
+FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version('principles');
 
 -- Enable UUID generation if not already enabled (Run once per database)
 -- CREATE EXTENSION IF NOT EXISTS "uuid-ossp"; -- Alternative UUID generation
@@ -0,0 +1,92 @@
+# /backend/tests/test_cache.py
+"""The in-process caches of core/cache.py."""
+import time
+import pytest
+from core.cache import SnapshotCache, TokenCache
+
+
+def test_snapshot_hit_and_miss():
+    cache = SnapshotCache(maxsize=10, ttl=60)
+    assert cache.get("user") is None
+    cache.set("user", {"a": 1}, cache.begin("user"))
+    assert cache.get("user") == {"a": 1}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_slow_read_cannot_undo_a_concurrent_invalidation():
+    cache = SnapshotCache(maxsize=10, ttl=60)
+    token = cache.begin("user")  # a read starts its queries...
+    cache.invalidate("user")     # ...a write lands meanwhile...
+    cache.set("user", "stale", token)  # ...and the read finishes
+    assert cache.get("user") is None
+
+    # A read that began after the write may store its snapshot
+    cache.set("user", "fresh", cache.begin("user"))
+    assert cache.get("user") == "fresh"
+
+
+def test_invalidating_another_key_does_not_drop_the_snapshot():
+    cache = SnapshotCache(maxsize=10, ttl=60)
+    token = cache.begin("user")
+    cache.invalidate("someone else")
+    cache.set("user", "snapshot", token)
+    assert cache.get("user") == "snapshot"
+
+
+def test_snapshot_of_another_version_is_a_miss():
+    cache = SnapshotCache(maxsize=10, ttl=60)
+    cache.set("user", "v1 data", cache.begin("user"), version="v1")
+    assert cache.get("user", "v1") == "v1 data"
+    assert cache.get("user", "v2") is None
+    # The outdated entry is dropped, not kept for v1 readers
+    assert cache.get("user", "v1") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces time.time() (TokenCache's timer) with a settable clock."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def test_revoked_token_is_not_cached_again(clock):
+    cache = TokenCache(maxsize=10, max_age=60)
+    key = TokenCache.key("token")
+    exp = clock[0] + 3600
+    cache.set(key, "user", exp)
+    assert cache.get(key) == ("user", exp)
+
+    cache.revoke(key, exp)
+    assert cache.get(key) is None
+    # A request that verified the token before the revocation finishes
+    cache.set(key, "user", exp)
+    assert cache.get(key) is None
+
+
+def test_entry_expires_after_max_age_when_exp_is_later(clock):
+    cache = TokenCache(maxsize=10, max_age=60)
+    key = TokenCache.key("token")
+    cache.set(key, "user", clock[0] + 3600)
+    clock[0] += 59
+    assert cache.get(key) is not None
+    clock[0] += 2
+    assert cache.get(key) is None
+
+
+def test_entry_expires_at_exp_when_that_is_sooner(clock):
+    cache = TokenCache(maxsize=10, max_age=60)
+    key = TokenCache.key("token")
+    cache.set(key, "user", clock[0] + 10)
+    clock[0] += 9
+    assert cache.get(key) is not None
+    clock[0] += 2
+    assert cache.get(key) is None
+
+
+def test_expired_token_is_not_cached(clock):
+    cache = TokenCache(maxsize=10, max_age=60)
+    key = TokenCache.key("token")
+    cache.set(key, "user", clock[0] - 1)
+    assert cache.get(key) is None
@@ -0,0 +1,139 @@
+# /backend/tests/test_checkins.py
+"""
+GET /api/checkins/today builds the whole nested check-in in one query,
+and POST /api/checkins/import reports invalid rows per line. The
+handlers run against a fake connection that records the statements and
+COPY rows, so no database is needed.
+"""
+import asyncio
+import json
+import uuid
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+import pytest
+from fastapi import HTTPException
+from routers import checkins
+
+
+class FakeCopy:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def write_row(self, row):
+        self.rows.append(row)
+
+
+class FakeCursor:
+    def __init__(self, row=None):
+        self.row = row
+        self.executed = []
+        self.copied = {}  # table -> rows
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, query, params=None):
+        self.executed.append((query, params))
+
+    async def fetchone(self):
+        return self.row
+
+    async def fetchall(self):
+        # The merges report no conflicts
+        return []
+
+    def copy(self, statement):
+        table = statement.split()[1]
+        return FakeCopy(self.copied.setdefault(table, []))
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+
+def use_cursor(monkeypatch, row=None):
+    cursor = FakeCursor(row)
+
+    @asynccontextmanager
+    async def fake_connection():
+        yield FakeConnection(cursor)
+
+    monkeypatch.setattr(checkins, "async_db_connection", fake_connection)
+    return cursor
+
+
+def test_todays_checkin_is_one_query(monkeypatch):
+    user_id = uuid.uuid4()
+    cursor = use_cursor(monkeypatch, {
+        "checkin_id": uuid.uuid4(), "checkin_date": date.today(),
+        "gratitude_entry": "Coffee", "principle_alignment": 7,
+        "principle_alignment_note": None,
+        "metrics": [{"metric_type": "Daily Rating", "metric_name": "Focus",
+                     "value": 8}],
+        "top_goal": {"goal_description": "Ship it", "is_completed": False},
+        "completed_steps": [],
+    })
+
+    response = asyncio.run(checkins.get_todays_checkin(user_id))
+
+    assert response.status_code == 200
+    assert len(cursor.executed) == 1
+    assert cursor.executed[0][1] == (user_id, date.today())
+
+
+def test_missing_checkin_is_one_query(monkeypatch):
+    cursor = use_cursor(monkeypatch, None)
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(checkins.get_todays_checkin(uuid.uuid4()))
+
+    assert raised.value.status_code == 404
+    assert len(cursor.executed) == 1
+
+
+class FakeRequest:
+    def __init__(self, body):
+        self.body = body
+
+    async def stream(self):
+        yield self.body
+
+
+def test_import_reports_out_of_range_rows_per_line(monkeypatch):
+    cursor = use_cursor(monkeypatch)
+    days = [(date.today() - timedelta(days=n)).isoformat()
+            for n in range(1, 5)]
+    lines = [
+        {"checkin_date": days[0], "principle_alignment": 7,
+         "metrics": [{"metric_type": "Daily Rating",
+                      "metric_name": "Focus", "value": 8}]},
+        {"checkin_date": days[1], "principle_alignment": 50},
+        {"checkin_date": days[2],
+         "metrics": [{"metric_type": "Time Allocation",
+                      "metric_name": "Work", "value": 150}]},
+        {"checkin_date": days[3], "principle_alignment": 3},
+    ]
+    body = "".join(json.dumps(line) + "\n" for line in lines).encode()
+
+    result = asyncio.run(checkins.import_checkins(
+        FakeRequest(body), fmt="ndjson", current_user_id=uuid.uuid4()))
+
+    assert result["status"] == "success"
+    assert result["received"] == 4
+    assert result["imported"] == 2
+    assert [error["line"] for error in result["errors"]] == [2, 3]
+    assert [row[0] for row in cursor.copied["import_checkins"]] == [1, 4]
+    assert len(cursor.copied["import_metrics"]) == 1
@@ -0,0 +1,44 @@
+# /backend/tests/test_downsampling.py
+"""LTTB downsampling of chart series (downsampling.py)."""
+from datetime import date, timedelta
+import numpy as np
+from downsampling import downsample_indices, lttb_indices
+
+# A fixed zig-zag with one spike, so the kept points are predictable
+X = list(range(20))
+Y = [0, 1, 0, 1, 0, 1, 0, 9, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 5]
+
+
+def test_keeps_first_and_last_points():
+    keep = lttb_indices(X, Y, 6)
+    assert keep[0] == 0
+    assert keep[-1] == len(X) - 1
+
+
+def test_output_has_max_points_sorted_indices():
+    for max_points in (3, 6, 10, 19):
+        keep = lttb_indices(X, Y, max_points)
+        assert len(keep) == max_points
+        assert list(keep) == sorted(set(keep))
+
+
+def test_keeps_the_spike():
+    assert 7 in lttb_indices(X, Y, 6)
+
+
+def test_short_input_is_unchanged():
+    for max_points in (len(X), len(X) + 5):
+        assert list(lttb_indices(X, Y, max_points)) == X
+    labels = [date(2026, 1, 1) + timedelta(days=i) for i in range(5)]
+    assert downsample_indices(labels, [[1, 2, 3, 4, 5]], 5) is None
+    assert downsample_indices(labels, [[1, 2, 3, 4, 5]], None) is None
+
+
+def test_series_gaps_are_skipped():
+    labels = [date(2026, 1, 1) + timedelta(days=i) for i in range(len(Y))]
+    values = [None if i % 2 else y for i, y in enumerate(Y)]
+    keep = downsample_indices(labels, [values], 4)
+    assert len(keep) == 4
+    assert all(values[i] is not None for i in keep)
+    assert keep[0] == 0 and keep[-1] == len(Y) - 2
+    assert isinstance(keep, np.ndarray)
@@ -0,0 +1,79 @@
+# /backend/tests/test_insights_engine.py
+"""
+The rule registry's EvaluationPlan: on a user's next call only the
+rules reading an input that changed are run again.
+"""
+from datetime import date, timedelta
+from insights_engine import (EvaluationPlan, Rule, build_history_frame,
+                             evaluate_rules)
+
+START = date(2026, 1, 1)
+
+
+def history(days=20, changes=None):
+    """days of check-ins, alignment 5 except for {day: alignment}."""
+    changes = changes or {}
+    return build_history_frame([
+        {"checkin_date": START + timedelta(days=day),
+         "principle_alignment": changes.get(day, 5), "has_gratitude": 1,
+         "metrics": {"Daily Rating:Focus": 6}}
+        for day in range(days)])
+
+
+def checkin(focus=6, alignment=5):
+    return {"principle_alignment": alignment,
+            "metrics": [{"metric_type": "Daily Rating",
+                         "metric_name": "Focus", "value": focus}]}
+
+
+TRAITS = [{"trait_name": "Introverted", "value": 70}]
+
+
+def make_plan(calls):
+    def recording(name):
+        def evaluate(inputs):
+            calls.append(name)
+            return name
+        return evaluate
+
+    declared = {
+        "alignment": [("checkin", "principle_alignment")],
+        "focus": [("metric", "Daily Rating", "Focus")],
+        "introvert": [("trait", "Introverted")],
+        "last_week": [("history", 7)],
+        "all_history": [("history", 0)],
+    }
+    return EvaluationPlan([Rule(name, recording(name), frozenset(inputs))
+                           for name, inputs in declared.items()])
+
+
+def test_only_rules_with_changed_inputs_rerun():
+    calls = []
+    plan = make_plan(calls)
+
+    def run(latest, frame, previous):
+        calls.clear()
+        facts, results = evaluate_rules(plan, TRAITS, [], latest, frame,
+                                        previous)
+        return sorted(calls), (facts, results)
+
+    ran, first = run(checkin(), history(), None)
+    assert ran == ["alignment", "all_history", "focus", "introvert",
+                   "last_week"]
+
+    ran, second = run(checkin(), history(), first)
+    assert ran == []
+    assert second[1] == first[1]
+
+    ran, _ = run(checkin(focus=2), history(), second)
+    assert ran == ["focus"]
+
+    # A change older than the 7-day window only reaches the full history
+    ran, _ = run(checkin(), history(changes={3: 9}), second)
+    assert ran == ["all_history"]
+
+    ran, _ = run(checkin(), history(changes={18: 9}), second)
+    assert ran == ["all_history", "last_week"]
+
+    ran, _ = run(checkin(alignment=8), history(days=21), second)
+    assert ran == ["alignment", "all_history", "last_week"]
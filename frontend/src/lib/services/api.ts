@@ -40,16 +40,16 @@ async function request(endpoint: string, options: RequestInit = {}) {
 		headers.set('Authorization', `Bearer ${token}`);
 	}
 
-	// Add cache-busting for GET requests
-	let url = `${BASE_URL}${endpoint}`;
-	if (options.method === 'GET' || !options.method) {
-		const cacheBuster = `_=${new Date().getTime()}`;
-		url += url.includes('?') ? `&${cacheBuster}` : `?${cacheBuster}`;
-	}
+	// GET responses carry an ETag. 'no-cache' makes the browser revalidate
+	// its copy with If-None-Match on every request, so unchanged data comes
+	// back as a bodyless 304 and is served from the browser cache.
+	const url = `${BASE_URL}${endpoint}`;
+	const isGet = options.method === 'GET' || !options.method;
 
 	// Perform the fetch request
 	try {
 		const response = await fetch(url, {
+			...(isGet ? { cache: 'no-cache' as RequestCache } : {}),
 			...options,
 			headers: headers
 		});